@@ -0,0 +1,86 @@
+// Clientside versions of the callbacks that switch between the options of graphs 1, 2 and 4 (see dash_app.py).
+// The figures are taken from the stores that are sent along with each page, so no request is made to the server.
+
+// Apply the (nested) changes of a delta to a copy of an object. A value of null means the property is removed
+function applyChanges(target, changes) {
+    const output = Object.assign({}, target);
+    Object.keys(changes).forEach(function (key) {
+        const value = changes[key];
+        if (value === null) {
+            delete output[key];
+        } else if (typeof value === 'object' && !Array.isArray(value)) {
+            output[key] = applyChanges(output[key] || {}, value);
+        } else {
+            output[key] = value;
+        }
+    });
+    return output;
+}
+
+// Obtain a figure from a store created by create_figures_store (variants are built from their base figure)
+function getFigure(store, name) {
+    if (!(name in store.deltas)) {
+        return store.figures[name];
+    }
+    const [baseName, delta] = store.deltas[name];
+    const base = store.figures[baseName];
+    return Object.assign({}, base, {data: [applyChanges(base.data[0], delta)].concat(base.data.slice(1))});
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    graphs: {
+        // Change graph_1 depending on the dropdown1 and chck1 options selected
+        modifyGraph1: function (dropdownValue, selectedChartOptions, figures) {
+            const options = selectedChartOptions || [];
+            const showPreferredGenres = options.includes('SPG');
+            const showErrorBars = options.includes('SEB');
+
+            if (dropdownValue === 'type1_2') {  // User has chosen Overall Revenue
+                return showPreferredGenres ? getFigure(figures, 'fig6') : getFigure(figures, 'fig5');
+            }
+            if (showPreferredGenres && showErrorBars) {
+                return getFigure(figures, 'fig2');
+            }
+            if (showPreferredGenres) {
+                return getFigure(figures, 'fig3');
+            }
+            if (showErrorBars) {
+                return getFigure(figures, 'fig4');
+            }
+            return getFigure(figures, 'fig1');  // User has chosen Mean Revenue and no additional checklist options
+        },
+
+        // Change graph_2 depending on the value selected on dropdown2 (and when the bins of the stored figures change)
+        modifyGraph2: function (value, figures) {
+            if (value === 'type2_1') {  // User has chosen Overall Revenue
+                return getFigure(figures, 'fig7');
+            }
+            if (value === 'type2_2') {  // User has chosen Mean Revenue
+                return getFigure(figures, 'fig8');
+            }
+            return getFigure(figures, 'fig9');  // User has chosen Number of Movies
+        },
+
+        // Modify the options of chck1 depending on the dropdown1 value
+        modifyChecklist1: function (dropdownValue) {
+            if (dropdownValue === 'type1_1') {  // User has chosen Mean Revenue
+                return [{label: 'Show Preferred Genres', value: 'SPG'}, {label: 'Show Error Bars', value: 'SEB'}];
+            }
+            return [{label: 'Show Preferred Genres', value: 'SPG'}];  // User has chosen Overall Revenue
+        },
+
+        // Show the row of the graph 4 page that corresponds to the dropdown4 value (and hide the other one)
+        modifyGraph4LayoutRow: function (dropdownValue) {
+            const hidden = {display: 'none'};
+            return dropdownValue === 'type4_1' ? [{}, hidden] : [hidden, {}];
+        },
+
+        // Change graph_4 depending on the selected value of chck4
+        modifyGraph4: function (checklistValue, figures) {
+            if (!checklistValue || checklistValue.length === 0) {  // Show Error Bars is not selected
+                return getFigure(figures, 'fig13');
+            }
+            return getFigure(figures, 'fig12');
+        }
+    }
+});
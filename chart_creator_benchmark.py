@@ -0,0 +1,215 @@
+import argparse
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# The genres and distribution companies of prepared_dataset.xlsx, used to generate the synthetic datasets
+_GENRES = ['Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family', 'Fantasy',
+           'History', 'Horror', 'Music', 'Mystery', 'Romance', 'Science Fiction', 'TV Movie', 'Thriller', 'War',
+           'Western']
+_DISTRIBUTORS = ['20th Century Fox', 'Altitude', 'Cinevents', 'Curzon', 'Disney', 'Dogwoof', 'Entertainment',
+                 'Fountain', 'Lionsgate', 'MUBI', 'Modern Films', 'National Amusements UK', 'Paramount', 'Phoenix',
+                 'Picture House Entertainment', 'Rising Star Entertainment', 'STX Entertainment',
+                 'Shear Entertainment', 'Signature Entertainment', 'Sky Cinema', 'Sony Pictures', 'StudioCanal',
+                 'Thunderbird', 'Trafalgar', 'Universal', 'Vertigo', 'Warner Bros', 'Wildcard', 'Yash Raj',
+                 'Zee Studios', 'eOne Films']
+
+
+def generate_dataset(number_of_rows, seed=0):
+    """
+    Generate a synthetic dataset with the same columns and types as prepared_dataset.xlsx. The same seed always
+    produces the same dataset.
+
+    Arguments
+    ---------
+    number_of_rows : int
+        The number of movies.
+    seed : int
+        The seed of the random number generator. Default is 0.
+
+    Returns
+    -------
+    pandas.core.frame.DataFrame
+        The generated dataset (the genres are lists in string format, e.g., "['Drama', 'Romance']").
+
+    """
+    rng = np.random.default_rng(seed)
+
+    # Each movie has between 1 and 4 different genres (the genres of a movie are a random sample without repetition)
+    number_of_genres = rng.integers(1, 5, number_of_rows)
+    genre_order = np.argsort(rng.random((number_of_rows, len(_GENRES))), axis=1)[:, :4]
+    genre_cells = [str([_GENRES[code] for code in codes[:length]])
+                   for codes, length in zip(genre_order.tolist(), number_of_genres.tolist())]
+
+    start_date = np.datetime64('2018-01-01')
+    release_days = rng.integers(0, (np.datetime64('2022-01-01') - start_date).astype(int), number_of_rows)
+    return pd.DataFrame({
+        'Unnamed: 0': np.arange(number_of_rows),
+        'Film': [f'Film {i}' for i in range(number_of_rows)],
+        'Distributor': np.array(_DISTRIBUTORS, dtype=object)[rng.integers(0, len(_DISTRIBUTORS), number_of_rows)],
+        'Rating': np.round(rng.uniform(4.0, 9.5, number_of_rows), 1),
+        'Runtime': rng.integers(57, 182, number_of_rows),
+        'Genres': genre_cells,
+        'Revenue': np.round(rng.lognormal(16.0, 2.0, number_of_rows)).astype(np.int64),
+        'Release Date': start_date + release_days.astype('timedelta64[D]'),
+    })
+
+
+def measure(stages, name, function):
+    """
+    Call a function and record its wall time and the peak memory allocated while it runs (measured with tracemalloc,
+    which includes the memory allocated by numpy and pandas).
+
+    Arguments
+    ---------
+    stages : dict
+        The dictionary in which the measurements are stored (under name).
+    name : str
+        The name of the stage.
+    function : callable
+        The function (without arguments) that is measured.
+
+    Returns
+    -------
+    object
+        The value returned by function.
+
+    """
+    tracemalloc.reset_peak()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    output = function()
+    seconds = time.perf_counter() - start
+    stages[name] = {'seconds': seconds, 'peak_bytes': tracemalloc.get_traced_memory()[1] - start_memory}
+    return output
+
+
+def run_benchmark(number_of_rows, dataset_dir, seed=0):
+    """
+    Measure each stage of ChartCreator for a synthetic dataset: loading the dataset, creating the specialized
+    dataframes, building each figure and serializing the figures. It is meant to be run in a new process, so that the
+    maximum resident memory corresponds to a single dataset size.
+
+    Arguments
+    ---------
+    number_of_rows : int
+        The number of movies of the synthetic dataset.
+    dataset_dir : str
+        The directory in which the synthetic dataset is written (as a CSV file).
+    seed : int
+        The seed of the synthetic dataset. Default is 0.
+
+    Returns
+    -------
+    dict
+        The time and peak memory of each stage, and the maximum resident memory of the process.
+
+    """
+    from chart_creator_module import ChartCreator
+
+    dataset_path = os.path.join(dataset_dir, f'synthetic_{number_of_rows}_{seed}.csv')
+    if not os.path.exists(dataset_path):
+        generate_dataset(number_of_rows, seed).to_csv(dataset_path, index=False)
+
+    tracemalloc.start()
+    stages = {}
+    chart_creator = measure(stages, 'init', lambda: ChartCreator(dataset_path))
+
+    # The stages of the constructor are measured again separately (on the instance that has already been created)
+    df, _ = measure(stages, 'load', chart_creator._ChartCreator__create_df)
+    genres = chart_creator._ChartCreator__genres_list
+    distributors = chart_creator._ChartCreator__distributors_list
+    measure(stages, 'genres_df', lambda: chart_creator._ChartCreator__create_specialized_df('Genres', genres,
+                                                                                            ['Revenue']))
+    measure(stages, 'dist_df', lambda: chart_creator._ChartCreator__create_specialized_df('Distributor',
+                                                                                          distributors, ['Revenue']))
+
+    # The first access to a base figure builds it (and the figures created alongside it), the variants are built next
+    for name in ['fig1', 'fig5', 'fig7', 'fig10', 'fig11', 'fig14']:
+        measure(stages, f'build_{name}', lambda: getattr(chart_creator, name))
+    measure(stages, 'build_variants', lambda: [getattr(chart_creator, f'fig{i}') for i in (2, 3, 4, 6, 12)])
+    measure(stages, 'serialize', lambda: [chart_creator.figure_json(f'fig{i}') for i in range(1, 15)])
+    tracemalloc.stop()
+
+    return {'rows': len(df.index), 'stages': stages,
+            'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+
+def git_commit():
+    """Obtain the hash of the current git commit (None if it cannot be obtained)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_results):
+    """
+    Print the ratio between the time of each stage and the time of the same stage in a previous run.
+
+    Arguments
+    ---------
+    results : dict
+        The results of the current run.
+    previous_results : dict
+        The results of the previous run (read from its JSON file).
+
+    """
+    for size, result in results['results'].items():
+        previous = previous_results['results'].get(size)
+        if previous is None:
+            continue
+        print(f'{size} rows (current vs {previous_results.get("commit") or "previous"}):')
+        for stage, measurement in result['stages'].items():
+            if stage in previous['stages']:
+                ratio = measurement['seconds'] / max(previous['stages'][stage]['seconds'], 1e-9)
+                print(f'  {stage:<16}{measurement["seconds"]:>10.3f} s {ratio:>8.2f}x')
+
+
+def main():
+    """Run the benchmark for each dataset size and write the results to a JSON file"""
+    parser = argparse.ArgumentParser(description='Measure the stages of ChartCreator on synthetic datasets.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 10000000],
+                        help='the sizes of the synthetic datasets (default: 1000 100000 10000000)')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the synthetic datasets (default: 0)')
+    parser.add_argument('--dataset-dir', default=os.path.join(tempfile.gettempdir(), 'chart_creator_benchmark'),
+                        help='the directory of the synthetic datasets (they are reused between runs)')
+    parser.add_argument('--output', default='benchmark_results.json', help='the JSON file with the results')
+    parser.add_argument('--compare', default=None, help='the JSON file of a previous run to compare with')
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.dataset_dir, exist_ok=True)
+    results = {'commit': git_commit(), 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+               'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+               'machine': platform.platform(), 'results': {}}
+    for number_of_rows in arguments.rows:
+        # Each size is measured in a new process (spawned, so that nothing is inherited from this one)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1,
+                                                    mp_context=multiprocessing.get_context('spawn')) as executor:
+            result = executor.submit(run_benchmark, number_of_rows, arguments.dataset_dir, arguments.seed).result()
+        results['results'][str(number_of_rows)] = result
+        print(f'{number_of_rows} rows: ' + ', '.join(f'{stage} {measurement["seconds"]:.3f} s'
+                                                     for stage, measurement in result['stages'].items())
+              + f', max RSS {result["max_rss_bytes"] / 2 ** 20:.0f} MiB')
+
+    with open(arguments.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,44 @@
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 import math
+import time
+import threading
+import collections
+import concurrent.futures
+import contextlib
 import copy
+import hashlib
+import json
+import sys
+from dataset_cache_module import DatasetCache
+from genres_parser_module import parse_genres, decode_genres, parse_genre_sets
+from genre_index_module import GenreIndex
+from downsampling_module import lttb_indices
+from running_stats_module import RunningStats, combine_statistics
+from histogram_module import bin_statistics, bin_counts_2d
+from filter_index_module import FilterIndex
+from ingestion_module import iter_dataset_chunks, FilmDeduplicator, downcast_numeric_columns
+
+try:
+    import orjson  # Optional. If it is installed, plotly also uses it to serialize the figures
+except ImportError:
+    orjson = None
+
+# The column of a specialized dataframe (see ChartCreator.__create_specialized_df) that contains each aggregation of a
+# numerical variable (metric)
+_AGGREGATION_COLUMNS = {'sum': '{metric}', 'mean': 'Mean {metric}', 'std': 'SD {metric}',
+                        'se': 'Standard Error ({metric})', 'count': 'Number of Movies'}
+
+# The label of the bucket that contains the distribution companies that are not among the top ones (see
+# ChartCreator.distributor_page)
+OTHER_DISTRIBUTORS = 'Other Distributors'
+
+# The base figure of each figure that is a variant of another figure (see ChartCreator.figure_delta)
+_FIGURE_BASES = {'fig2': 'fig1', 'fig3': 'fig1', 'fig4': 'fig1', 'fig6': 'fig5', 'fig12': 'fig13'}
+
+# The maximum number of filtered views (see ChartCreator.filtered) kept by each ChartCreator
+_MAX_FILTERED_VIEWS = 16
 
 
 class ChartCreator:
@@ -13,14 +48,59 @@ class ChartCreator:
     Arguments
     ---------
     dataset_path : str
-        The path to the file containing the dataset (prepared_dataset.xlsx).
+        The path to the file containing the dataset (prepared_dataset.xlsx). A CSV file with the same columns (.csv
+        extension) can also be used.
+    figure_cache_size : int
+        The maximum number of figures that will be kept in memory. When the cache is full, the least recently used
+        figure is evicted (and rebuilt the next time it is accessed). Default is None, which means no figure is evicted.
+    release_date_frequency : str
+        The period used to add up the revenue in the Revenue vs Date Area plot (i.e., graph 3): 'D' (day), 'W' (week) or
+        'M' (month). Default is 'D'.
+    graph3_max_points : int
+        The maximum number of points of the Revenue vs Date Area plot. Longer series are downsampled with the
+        Largest-Triangle-Three-Buckets algorithm. Default is 1000.
+    dataset_cache_dir : str
+        The directory of a binary columnar cache of the cleaned dataset (see DatasetCache). If the cache is still valid
+        for dataset_path, the dataset is loaded from it instead of parsing the spreadsheet. Default is None, which means
+        no cache is used.
+    build_workers : int
+        The number of worker processes used to build every figure when the class is created (see build_figures).
+        Default is None, which means the figures are built the first time they are accessed.
+    profiler : profiling_module.StageProfiler
+        A profiler that measures each stage (loading the dataset, creating the specialized dataframes, building and
+        serializing the figures). Default is None, which means nothing is measured.
+    preferred_genres : list
+        The genres whose bars are highlighted in the figures. Default is None, which means the preferred genres defined
+        in persona.png (History, Romance and Action) are used.
+    distributor_top_k : int
+        The maximum number of distribution companies displayed by the figures of graph 4 (the ones with the highest
+        overall revenue). The rest are combined into an "Other Distributors" bucket, whose members can be displayed by
+        clicking on it in the treemap (see distributor_treemap). Default is 50. None means every company is displayed.
+    chunk_size : int
+        The number of rows of the dataset file that are read and parsed at a time (see __create_df). Default is 100000.
+    webgl_threshold : int
+        The length of the series (before they are downsampled, see graph3_max_points) above which the line and area
+        traces (i.e., the Revenue vs Date Area plot) are rendered with WebGL (go.Scattergl) instead of SVG, so that long
+        series can still be panned and zoomed smoothly in the browser. Default is 5000. 0 means WebGL is always used,
+        and None means it is never used. The bar charts are always rendered with SVG (plotly has no WebGL bar trace),
+        since their number of bars is already bounded on the server (see runtime_histogram and distributor_page).
 
     Attributes
     ----------
     __df_file : str
         The dataset path introduced when creating the class.
+    __chunk_size : int
+        The chunk_size introduced when creating the class.
+    __profiler : profiling_module.StageProfiler
+        The profiler introduced when creating the class (None if no profiler was introduced).
+    __dataset_cache : dataset_cache_module.DatasetCache
+        The cache of the cleaned dataset (None if dataset_cache_dir was not introduced).
     __df : pandas.core.frame.DataFrame
-        The dataframe obtained by reading the dataset file.
+        The dataframe obtained by reading the dataset file. Genres and Distributor are dictionary-encoded (categorical,
+        the categories of Genres are tuples of genres) and the numerical columns are downcast (see memory_report).
+    __genre_index : genre_index_module.GenreIndex
+        A sparse films x genres membership matrix of __df['Genres'], used to calculate the statistics of each genre
+        (None if __df['Genres'] has changed since it was built).
     __genres_list : list
         A list containing each individual genre on __df['Genres'].
     __distributors_list : list
@@ -29,37 +109,104 @@ class ChartCreator:
         A dataframe containing information about each individual genre that appears on __genres_list.
     __dist_df : pandas.core.frame.DataFrame
         A dataframe containing information about each distribution company that appears on __distributors_list.
+    __running_stats : dict
+        The running statistics (see RunningStats) of the genres and distribution companies, which are used to update
+        __genres_df and __dist_df when movies are added or updated.
+    __release_date_frequency : str
+        The release_date_frequency introduced when creating the class.
+    __graph3_max_points : int
+        The graph3_max_points introduced when creating the class.
+    __webgl_threshold : int
+        The webgl_threshold introduced when creating the class.
+    __revenue_rollups : dict
+        The revenue per release period calculated by __rollup_revenue, for each frequency.
+    __runtime_histograms : dict
+        The bins of the runtime histograms calculated by __bin_runtime, for each (number_of_bins, bin_width) pair.
+    __revenue_rating_points : tuple
+        The rating and logarithm of the revenue of the movies of the density heatmap (None if they have not been
+        extracted yet, see __get_revenue_rating_points).
     __preferred_genres : list
-        A list containing the preferred genres of the user. In this case, the preferred genres defined in persona.png
-        will be utilized.
-    __fig1, __fig2, __fig3, __fig4 : plotly.graph_objs._figure.Figure
-        Different options for the Mean Revenue vs Genre bar chart (i.e., graph 1).
-    __fig5, __fig6 : plotly.graph_objs._figure.Figure
-        Different options for the Overall Revenue vs Genre bar plot (i.e., graph 1).
-    __fig7, __fig8, __fig9 : plotly.graph_objs._figure.Figure
-        Different options for the Runtime histograms (i.e., graph 2).
-    __fig10 : plotly.graph_objs._figure.Figure
-        Revenue before, during and after lockdown Area plot (i.e., graph 3).
-    __fig11 : plotly.graph_objs._figure.Figure
-        Revenue by distribution company Treemap (i.e., graph 4).
-    __fig12, __fig13 : plotly.graph_objs._figure.Figure
-        Different options for the Distribution Company vs Mean Revenue bar plot (i.e., graph 4).
+        A list containing the preferred genres of the user (by default, the preferred genres defined in persona.png).
+    __specialized_dfs : dict
+        The specialized dataframes calculated by stats for each (by, metric) pair other than those of __genres_df and
+        __dist_df.
+    __stats_results : dict
+        The results of stats, for each combination of its arguments.
+    __distributor_top_k : int
+        The distributor_top_k introduced when creating the class.
+    __distributor_pages : dict
+        The dataframes calculated by distributor_page, for each level.
+    __mask : numpy.ndarray
+        The boolean mask of the movies of __df that are taken into account by the statistics and figures of a filtered
+        view (None if the instance is not a filtered view, see filtered).
+    __filter_index : filter_index_module.FilterIndex
+        The index used to resolve the filters into masks (None if it has not been built yet).
+    __genre_set_totals : dict
+        The statistics of each distinct list of genres (see GenreIndex.set_statistics) over every movie, for each
+        numerical variable. They are shared with the filtered views, which only gather the movies that they exclude
+        when most of the movies are selected (see GenreIndex.statistics).
+    __filtered_views : collections.OrderedDict
+        The filtered views that have been created, ordered from least to most recently used.
+    __figure_builders : dict
+        A dictionary that maps the name of each base figure (e.g., 'fig1') to the method that creates it and to the
+        names of all the figures created by that same method.
+    __figure_columns : dict
+        A dictionary that maps the name of each base figure to the columns of __df it depends on.
+    __figure_deltas : dict
+        A dictionary that maps the name of each base figure with variants (fig1, fig5 and fig13) to the changes to its
+        trace that produce each of its variants (e.g., fig2). The changes are calculated when they are first needed.
+    __figure_cache : collections.OrderedDict
+        The figures that have already been built, ordered from least to most recently used. The figures are:
+        fig1, fig2, fig3 and fig4 (different options for the Mean Revenue vs Genre bar chart, i.e., graph 1),
+        fig5 and fig6 (different options for the Overall Revenue vs Genre bar plot, i.e., graph 1), fig7, fig8 and fig9
+        (different options for the Runtime histograms, i.e., graph 2), fig10 (Revenue before, during and after lockdown
+        Area plot, i.e., graph 3), fig11 (Revenue by distribution company Treemap, i.e., graph 4), fig12 and fig13
+        (different options for the Distribution Company vs Mean Revenue bar plot, i.e., graph 4) and fig14 (Revenue vs
+        Rating density heatmap, i.e., graph 5).
+    __figure_cache_size : int
+        The maximum number of figures kept in __figure_cache (None means there is no limit).
+    __figure_json : dict
+        The JSON-compatible dictionary and version (ETag) of the figures in __figure_cache that have been serialized.
+    __figure_cache_stats : dict
+        The number of cache hits, misses and evictions, and the total time (in seconds) spent building figures.
+    __figure_lock : threading.RLock
+        A lock that prevents several threads from building the same figures at the same time.
 
     Methods
     -------
+    __getstate__, __setstate__
+        Pickle the instance without its figure cache and lock (e.g., to send it to a worker process).
+    __create_figure_builders
+        Produce the dictionary that maps each base figure to the method that creates it.
+    __profile
+        Obtain a context manager that measures a stage with __profiler.
     __create_df
-        Read prepared_dataset.xlsx and convert to a dataframe.
+        Read prepared_dataset.xlsx (or its cache) in chunks and convert to a dataframe.
     __create_specialized_df
         Generate a dataframe containing information (overall, mean, standard deviation and standard error) about each
         element in a categorical column in __df (e.g., Genres, Distributors) with regards to different numerical
         variables (e.g., Revenue, Rating).
+    __add_standard_errors
+        Include the Standard Error columns in a dataframe containing the standard deviation of each element.
     --extract_sms
-        Create a list containing information (overall, mean and standard deviation) about each element in a categorical
-        column in __df (e.g., Genres, Distributors) with regards to different numerical variables (e.g., Revenue,
-        Rating).
+        Create a dataframe containing information (overall, mean and standard deviation) about each element in a
+        categorical column in __df (e.g., Genres, Distributors) with regards to different numerical variables (e.g.,
+        Revenue, Rating).
+    __get_specialized_df
+        Obtain the specialized dataframe of a categorical column with regards to a numerical variable.
+    stats
+        Obtain (memoized) aggregations of a numerical variable for each element of a categorical column.
+    stats_figure
+        Create a bar chart of one of the aggregations calculated by stats.
+    distributor_page
+        Obtain the statistics of a page of the top distribution companies, with the rest combined into a bucket.
+    __scatter_trace
+        Obtain the scatter trace type (SVG or WebGL) used to display a number of points.
     __produce_color_lists
         Produce a couple of lists comprised of the colors for the bars of a bar chart. One of the lists will be
         monochromatic and the other will have a different color for the bars representing the preferred user genres.
+    __create_figure_deltas
+        Produce the changes to the trace of fig1, fig5 or fig13 that create the rest of the options of graphs 1 and 4.
     __create_barchart
         Create a vertical bar chart figure for a specific set of data.
     __create_horizontal_barchart
@@ -67,49 +214,267 @@ class ChartCreator:
     __add_labels
         Add the labels and any other additional options to one or more figures.
     __create_graph1_figs_mean_revenue
-        Generate __fig1, __fig2, __fig3 and __fig4.
+        Generate fig1 (fig2, fig3 and fig4 are variants of it).
     __create_graph1_figs_overall_revenue
-        Produce __fig5 and __fig6.
+        Produce fig5 (fig6 is a variant of it).
+    __bin_runtime
+        Calculate the number of movies and the overall and mean revenue of each runtime bin.
+    runtime_histogram
+        Obtain the data of the trace of fig7, fig8 or fig9 for a given number of bins or bin width.
     __create_graph2_figs
-        Create __fig7, __fig8 and __fig9.
+        Create fig7, fig8 and fig9.
+    __rollup_revenue
+        Add up the revenue of the movies released on each day, week or month.
+    graph3_series
+        Obtain the (downsampled) series of the Revenue vs Date Area plot, optionally restricted to a date range.
     __create_graph3_fig
-        Generate __fig10.
+        Generate fig10.
+    __create_treemap
+        Create a treemap of the overall revenue of some distribution companies.
+    distributor_treemap
+        Produce the treemap of a page of the top distribution companies (fig11 is the first page).
     __create_graph4_figs
-        Create __fig11, __fig12 and __fig13.
-    fig1, fig2, fig3, fig4, fig5, fig6, fig7, fig8, fig9, fig10, fig11, fig12, fig13
-        Getter methods to obtain the private figures.
+        Create fig11 and fig13 (fig12 is a variant of fig13).
+    __get_revenue_rating_points
+        Obtain the rating and the logarithm of the revenue of the movies of the density heatmap.
+    revenue_rating_density
+        Obtain the data of the trace of fig14 (number of movies per rating and revenue cell) for some ranges.
+    __create_graph5_fig
+        Generate fig14.
+    __store_figures
+        Store a set of figures in __figure_cache, evicting the least recently used ones if necessary.
+    __run_builder
+        Create a set of figures with the method that builds them, in the form in which they are serialized.
+    __get_figure
+        Obtain a figure from __figure_cache, building it (and the figures created alongside it) if necessary.
+    figure_delta
+        Obtain the base figure of a figure and the changes to its trace that produce the figure.
+    fig1, fig2, fig3, fig4, fig5, fig6, fig7, fig8, fig9, fig10, fig11, fig12, fig13, fig14
+        Getter methods to obtain the private figures. Each figure is built the first time it is accessed.
+    figure_json
+        Obtain a figure as a JSON-compatible dictionary (serialized only once) together with its version.
+    __prepare_rows
+        Convert a batch of movies into a dataframe with the same columns and types as __df.
+    __concat
+        Concatenate several dataframes, keeping the categorical columns of __df categorical.
+    __get_genre_index
+        Obtain __genre_index, rebuilding it if necessary.
+    __get_filter_index
+        Obtain __filter_index, building it if necessary.
+    __get_genre_set_totals
+        Obtain the statistics of each distinct list of genres over every movie, calculating them if necessary.
+    filter_options
+        Obtain the values that can be selected on each filter.
+    filtered
+        Obtain a view whose statistics and figures only take into account the movies that satisfy some filters.
+    memory_report
+        Obtain the memory used by each column of the dataset before and after compacting it.
+    __apply_changes
+        Update the statistics of the genres and distributors and invalidate the affected figures after a change.
+    append
+        Add new movies to the dataset, updating only the affected statistics and figures.
+    update
+        Replace (or add) movies of the dataset, updating only the affected statistics and figures.
+    build_figures
+        Build every base figure in parallel, on a pool of worker processes.
+    figure_cache_info
+        Getter method to obtain the statistics of the figure cache.
 
 
     """
 
-    def __init__(self, dataset_path):
+    def __init__(self, dataset_path, figure_cache_size=None, release_date_frequency='D', graph3_max_points=1000,
+                 dataset_cache_dir=None, build_workers=None, profiler=None, preferred_genres=None,
+                 distributor_top_k=50, chunk_size=100000, webgl_threshold=5000):
         """Create an instance of the class"""
+        if release_date_frequency not in ('D', 'W', 'M'):
+            raise ValueError(f"release_date_frequency must be 'D', 'W' or 'M', not {release_date_frequency!r}")
+        self.__profiler = profiler
+        self.__mask = None  # The instance is not a filtered view (see filtered)
+        self.__filter_index = None
+        self.__genre_set_totals = {}
+        self.__filtered_views = collections.OrderedDict()
+        self.__release_date_frequency = release_date_frequency
+        self.__graph3_max_points = graph3_max_points
+        self.__webgl_threshold = webgl_threshold
+        self.__revenue_rollups = {}
+        self.__runtime_histograms = {}
+        self.__revenue_rating_points = None
         self.__df_file = dataset_path
-        self.__df = self.__create_df()
+        self.__chunk_size = chunk_size
+        self.__dataset_cache = DatasetCache(dataset_path, dataset_cache_dir) if dataset_cache_dir else None
+        with self.__profile('ChartCreator.__create_df'):
+            self.__df, running_stats = self.__create_df()
 
-        # Get the each genre without repetition. As the Genres column contains lists, a list of lists must be converted
-        # to a simple list before using set()
-        self.__genres_list = list(set([genre for column_data in self.__df['Genres'] for genre in column_data]))
+        # Build the genre membership index once. Its columns are each genre without repetition
+        with self.__profile('ChartCreator.GenreIndex'):
+            self.__genre_index = GenreIndex.from_genre_sets(self.__df['Genres'])
+        self.__genres_list = self.__genre_index.genres
 
         # Get a list of distributors without repetition
         self.__distributors_list = list(set([element for element in self.__df['Distributor']]))
 
-        self.__genres_df = self.__create_specialized_df('Genres', self.__genres_list, ['Revenue'])
-        self.__dist_df = self.__create_specialized_df('Distributor', self.__distributors_list, ['Revenue'])
-        self.__preferred_genres = ['History', 'Romance', 'Action']  # Taken from persona.png
-        self.__fig1, self.__fig2, self.__fig3, self.__fig4 = self.__create_graph1_figs_mean_revenue()
-        self.__fig5, self.__fig6 = self.__create_graph1_figs_overall_revenue()
-        self.__fig7, self.__fig8, self.__fig9 = self.__create_graph2_figs()
-        self.__fig10 = self.__create_graph3_fig()
-        self.__fig11, self.__fig12, self.__fig13 = self.__create_graph4_figs()
+        if running_stats is None:  # The dataframe was loaded from the cache, so the statistics are calculated here
+            with self.__profile('ChartCreator.__create_specialized_df(Genres)'):
+                self.__genres_df = self.__create_specialized_df('Genres', self.__genres_list, ['Revenue'])
+            with self.__profile('ChartCreator.__create_specialized_df(Distributor)'):
+                self.__dist_df = self.__create_specialized_df('Distributor', self.__distributors_list, ['Revenue'])
+            running_stats = {column: RunningStats.from_specialized_df(specialized_df, column, ['Revenue'])
+                             for column, specialized_df in (('Genres', self.__genres_df),
+                                                            ('Distributor', self.__dist_df))}
+        else:  # The statistics were folded chunk by chunk while reading the file
+            self.__genres_df, self.__dist_df = (
+                self.__add_standard_errors(running_stats[column].to_specialized_df().set_index(column).loc[elements]
+                                           .reset_index(), ['Revenue'])
+                for column, elements in (('Genres', self.__genres_list), ('Distributor', self.__distributors_list)))
+        self.__running_stats = running_stats
+        self.__preferred_genres = list(preferred_genres) if preferred_genres is not None \
+            else ['History', 'Romance', 'Action']  # Taken from persona.png
+        self.__specialized_dfs = {}
+        self.__stats_results = {}
+        self.__distributor_top_k = distributor_top_k
+        self.__distributor_pages = {}
+
+        # The figures are not created here. Each one is built the first time its getter method is called. The options
+        # of graphs 1 and 4 that only differ in the colors or error bars of the bars are built from a base figure
+        self.__figure_builders = self.__create_figure_builders()
+
+        # The columns of __df each base figure depends on (used to invalidate only the affected figures)
+        self.__figure_columns = {
+            'fig1': ('Genres', 'Revenue'), 'fig5': ('Genres', 'Revenue'),
+            'fig7': ('Runtime', 'Revenue'), 'fig8': ('Runtime', 'Revenue'), 'fig9': ('Runtime',),
+            'fig10': ('Release Date', 'Revenue'),
+            'fig11': ('Distributor', 'Revenue'), 'fig13': ('Distributor', 'Revenue'),
+            'fig14': ('Rating', 'Revenue'),
+        }
+        self.__figure_deltas = {}
+        self.__figure_cache = collections.OrderedDict()
+        self.__figure_cache_size = figure_cache_size
+        self.__figure_json = {}
+        self.__figure_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'build_time': 0.0}
+        self.__figure_lock = threading.RLock()
+        if build_workers is not None:
+            self.build_figures(build_workers)
+
+    def __getstate__(self):
+        """Obtain the state of the instance to be pickled (e.g., to send it to a worker process of build_figures). The
+        figure cache and the lock are not included"""
+        state = self.__dict__.copy()
+        state['_ChartCreator__figure_cache'] = collections.OrderedDict()
+        state['_ChartCreator__figure_json'] = {}
+        state['_ChartCreator__profiler'] = None  # The sinks are not shared with other processes
+        state['_ChartCreator__filter_index'] = None  # It is rebuilt if necessary
+        state['_ChartCreator__filtered_views'] = collections.OrderedDict()
+        del state['_ChartCreator__figure_lock'], state['_ChartCreator__figure_builders']  # They cannot be pickled
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state of a pickled instance, creating a new lock"""
+        self.__dict__.update(state)
+        self.__figure_builders = self.__create_figure_builders()
+        self.__figure_lock = threading.RLock()
+
+    def __create_figure_builders(self):
+        """
+        Produce the dictionary that maps the name of each base figure to the method that creates it and to the names of
+        all the figures created by that same method.
+
+        Returns
+        -------
+        dict
+            The dictionary that was created (see __figure_builders).
+
+        """
+        figure_groups = [
+            (self.__create_graph1_figs_mean_revenue, ('fig1',)),
+            (self.__create_graph1_figs_overall_revenue, ('fig5',)),
+            (self.__create_graph2_figs, ('fig7', 'fig8', 'fig9')),
+            (self.__create_graph3_fig, ('fig10',)),
+            (self.__create_graph4_figs, ('fig11', 'fig13')),
+            (self.__create_graph5_fig, ('fig14',)),
+        ]
+        return {name: group for group in figure_groups for name in group[1]}
+
+    def __profile(self, stage):
+        """
+        Obtain a context manager that measures a stage with __profiler (it does nothing if there is no profiler).
+
+        Arguments
+        ---------
+        stage : str
+            The name of the stage (e.g., 'ChartCreator.__create_graph2_figs').
+
+        Returns
+        -------
+        contextlib.AbstractContextManager
+            The context manager.
+
+        """
+        if self.__profiler is None:
+            return contextlib.nullcontext()
+        return self.__profiler.profile(stage)
 
     def __create_df(self):
-        """Create a pandas dataframe containing the information from prepared_dataset.xlsx"""
-        df = pd.read_excel(self.__df_file, engine='openpyxl')
-        df.drop(['Unnamed: 0'], axis=1, inplace=True)  # Drop the unnamed column that is generated when reading the file
-        df['Genres'] = df['Genres'].apply(eval)  # Convert the genres column to list (it is in string format initially)
-        df.drop_duplicates(subset=['Film'], inplace=True)
-        return df
+        """
+        Create a pandas dataframe containing the information from prepared_dataset.xlsx. If a dataset cache is being
+        used and it is still valid, the dataframe is loaded from it. Otherwise, the file is streamed in chunks of
+        __chunk_size rows (see ingestion_module), and the cache is updated. The rows of each chunk are parsed, the films
+        that have already appeared (in the same chunk or in a previous one) are dropped and the chunk is folded into the
+        running statistics of the genres and distributors as it arrives, so the memory needed to parse the file depends
+        on the size of the chunks rather than on the size of the file.
+
+        Returns
+        -------
+        df : pandas.core.frame.DataFrame
+            The dataframe that was created.
+        running_stats : dict
+            The running statistics (see RunningStats) of the Genres and Distributor columns (None if the dataframe was
+            loaded from the cache).
+
+        Raises
+        ------
+        ValueError
+            If the file does not contain any movie, or a genres cell cannot be parsed.
+
+        """
+        if self.__dataset_cache is not None:
+            df = self.__dataset_cache.load()
+            if df is not None:
+                return df, None
+
+        deduplicator = FilmDeduplicator()
+        running_stats = {column: RunningStats.empty(column, ['Revenue']) for column in ('Genres', 'Distributor')}
+        chunks = []
+        for chunk in iter_dataset_chunks(self.__df_file, self.__chunk_size):
+            # Drop the unnamed index column (only written by pandas exports with the index, e.g., the original
+            # spreadsheet) and the films that already appeared
+            chunk = chunk.drop(columns=['Unnamed: 0'], errors='ignore')
+            chunk = chunk[deduplicator.first_appearances(chunk['Film'])]
+
+            # Dictionary-encode the genres (they are in string format initially): each distinct list of genres is
+            # parsed once (without eval()) and stored as a tuple, and each movie only stores the code of its list
+            chunk['Genres'] = parse_genre_sets(chunk['Genres'])
+            chunk = downcast_numeric_columns(chunk)
+            for stats in running_stats.values():
+                stats.add(chunk)
+
+            # Dictionary-encode the distributors (each movie only stores the code of its distributor)
+            chunk['Distributor'] = chunk['Distributor'].astype('category')
+            chunks.append(chunk)
+        if not chunks:
+            raise ValueError(f'The dataset file {self.__df_file!r} does not contain any movie')
+
+        # The categories of the chunks are merged, so that the genres and distributors of the whole dataframe share
+        # them (the integer columns take the dtype of the chunk with the widest range)
+        for column, sort_categories in (('Genres', False), ('Distributor', True)):
+            categories = pd.api.types.union_categoricals([chunk[column] for chunk in chunks],
+                                                         sort_categories=sort_categories).categories
+            chunks = [chunk.assign(**{column: chunk[column].cat.set_categories(categories)}) for chunk in chunks]
+        df = pd.concat(chunks)
+
+        if self.__dataset_cache is not None:
+            self.__dataset_cache.store(df)
+        return df, running_stats
 
     def __create_specialized_df(self, column, column_elements, list_of_variables):
         """
@@ -133,21 +498,35 @@ class ChartCreator:
             The dataframe that was created.
 
         """
-        info = self.__extract_sms(column, column_elements, list_of_variables)
-        dataframe_columns = [column]  # Initialize the names of the columns that will appear on the dataframe
+        specialized_df = self.__extract_sms(column, column_elements, list_of_variables)
+        if self.__mask is not None:  # Filtered views only include the elements of the selected movies
+            specialized_df = specialized_df[specialized_df['Number of Movies'] > 0].reset_index(drop=True)
+        return self.__add_standard_errors(specialized_df, list_of_variables)
 
-        # Include the additional column names
-        for variable in list_of_variables:
-            dataframe_columns.extend([variable, f'Mean {variable}', f'SD {variable}'])
-        dataframe_columns.append('Number of Movies')
+    @staticmethod
+    def __add_standard_errors(specialized_df, list_of_variables):
+        """
+        Include additional columns containing the Standard Error of the variables in a dataframe produced by
+        __extract_sms (or by RunningStats.to_specialized_df). The formula is SE = SD / sqrt(n of samples).
+
+        Arguments
+        ---------
+        specialized_df : pandas.core.frame.DataFrame
+            The dataframe containing the standard deviation and number of movies of each element.
+        list_of_variables : list
+            The names of the numerical variables (e.g., Revenue, Rating).
 
-        specialized_df = pd.DataFrame(info, columns=dataframe_columns)  # Create the dataframe
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The same dataframe, including the Standard Error columns.
 
-        # Include additional columns containing the Standard Error of the variables
-        # (the formula is SE = SD / sqrt(n of samples))
+        """
         for variable in list_of_variables:
-            specialized_df[f'Standard Error ({variable})'] = specialized_df.apply(
-                lambda x: round(x[f'SD {variable}'] / math.sqrt(x['Number of Movies']), 2), axis=1)
+            standard_error = specialized_df[f'SD {variable}'] / np.sqrt(specialized_df['Number of Movies'])
+
+            # Python's round() is applied to each element (one per category, not per row) to keep its exact rounding
+            specialized_df[f'Standard Error ({variable})'] = [round(value, 2) for value in standard_error]
 
         return specialized_df
 
@@ -158,6 +537,10 @@ class ChartCreator:
         will be used inside __create_specialized_df to extract the information that will be later introduced into a
         dataframe.
 
+        The statistics of the genres are obtained from __genre_index. Any other multi-valued column (i.e., a column
+        containing lists) is exploded once, so that every film appears in one row per element, and the statistics of all
+        the elements are then obtained with a single groupby.
+
         Arguments
         ---------
         column : str
@@ -170,36 +553,275 @@ class ChartCreator:
 
         Returns
         -------
-        list
-            A list containing the extracted information.
+        pandas.core.frame.DataFrame
+            A dataframe containing the extracted information (one row per element in column_elements).
+
+        """
+        if column == 'Genres':  # Genre statistics are sparse matrix-vector products on the genre index
+            genre_codes = {genre: code for code, genre in enumerate(self.__get_genre_index().genres)}
+            positions = [genre_codes[genre] for genre in column_elements]
+            overall, mean, sd = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+            if self.__mask is not None:  # The entries of the selected films are only gathered once per variable
+                for variable in list_of_variables:
+                    counts, sums, stds = self.__get_genre_index().statistics(
+                        self.__df[variable].to_numpy(), self.__mask, self.__get_genre_set_totals(variable))
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        overall[variable], mean[variable] = sums[positions], (sums / counts)[positions]
+                    sd[variable] = stds[positions]
+                number_of_movies = pd.Series(counts[positions])
+            else:
+                for variable in list_of_variables:
+                    values = self.__df[variable].to_numpy()
+                    overall[variable] = self.__get_genre_index().sums(values)[positions]
+                    mean[variable] = self.__get_genre_index().means(values)[positions]
+                    sd[variable] = self.__get_genre_index().stds(values)[positions]
+                number_of_movies = pd.Series(self.__get_genre_index().counts()[positions])
+        elif self.__mask is not None and isinstance(self.__df[column].dtype, pd.CategoricalDtype):
+            # The statistics of the selected movies are obtained from the codes of the categories with np.bincount
+            categories = self.__df[column].cat.categories
+            codes = self.__df[column].cat.codes.to_numpy()[self.__mask]
+            is_valid = codes >= 0  # Missing values have the code -1
+            codes = codes[is_valid]
+            positions = categories.get_indexer(column_elements)
+            counts = np.bincount(codes, minlength=len(categories))
+            overall, mean, sd = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for variable in list_of_variables:
+                    values = self.__df[variable].to_numpy(dtype=np.float64)[self.__mask][is_valid]
+                    sums = np.bincount(codes, weights=values, minlength=len(categories))
+                    means = sums / counts
+                    squared_deviations = np.bincount(codes, weights=(values - means[codes]) ** 2,
+                                                     minlength=len(categories))
+                    overall[variable] = sums[positions]
+                    mean[variable] = means[positions]
+                    sd[variable] = np.sqrt(squared_deviations / counts)[positions]
+            number_of_movies = pd.Series(counts[positions])
+        else:
+            long_df = self.__df[[column] + list_of_variables]
+            if self.__mask is not None:
+                long_df = long_df[self.__mask]
+            if len(long_df.index) and isinstance(long_df[column].iloc[0], list):  # The column contains lists
+                long_df = long_df.explode(column)
+
+            grouped = long_df.groupby(column, sort=False)[list_of_variables]
+            overall = grouped.sum().reindex(column_elements)
+            number_of_movies = grouped.size().reindex(column_elements)
+            mean = overall.div(number_of_movies, axis=0)
+
+            # np.std() uses the population standard deviation (i.e., ddof=0): SD = sqrt(sum((x - mean)^2) / n)
+            squared_deviations = (long_df[list_of_variables] - grouped.transform('mean')) ** 2
+            sd = np.sqrt(squared_deviations.groupby(long_df[column], sort=False).sum().reindex(column_elements).div(
+                number_of_movies, axis=0))
+
+        output_df = pd.DataFrame({column: column_elements})
+        for variable in list_of_variables:
+            output_df[variable] = overall[variable].to_numpy()
+            output_df[f'Mean {variable}'] = mean[variable].to_numpy()
+            output_df[f'SD {variable}'] = sd[variable].to_numpy()
+        output_df['Number of Movies'] = number_of_movies.to_numpy()
+
+        return output_df
+
+    def __get_specialized_df(self, by, metric):
+        """
+        Obtain the specialized dataframe (see __create_specialized_df) of a categorical column with regards to a
+        numerical variable. The dataframes of the revenue of the genres and distributors are __genres_df and __dist_df
+        (except for filtered views), and the rest are calculated the first time they are needed.
+
+        Arguments
+        ---------
+        by : str
+            The name of the categorical column (e.g., 'Genres', 'Distributor').
+        metric : str
+            The name of the numerical column (e.g., 'Revenue', 'Rating').
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The specialized dataframe.
 
         """
-        output_list = []
-        for element in column_elements:  # Go through each element in the column
-            output_list.append([element])
-            for variable in list_of_variables:
-                values = []  # Initialize a list containing the values of the numerical column (for each column element)
+        if metric == 'Revenue' and by in ('Genres', 'Distributor') and self.__mask is None:
+            return self.__genres_df if by == 'Genres' else self.__dist_df
+
+        if (by, metric) not in self.__specialized_dfs:
+            if by == 'Genres':
+                elements = self.__genres_list
+            elif by == 'Distributor':
+                elements = self.__distributors_list
+            else:
+                elements = self.__df[by].drop_duplicates().tolist()
+            self.__specialized_dfs[(by, metric)] = self.__create_specialized_df(by, elements, [metric])
+        return self.__specialized_dfs[(by, metric)]
+
+    def stats(self, by='Genres', metric='Revenue', agg=('mean', 'se'), sort='desc', top_k=None):
+        """
+        Obtain aggregations (e.g., mean and standard error) of a numerical variable for each element of a categorical
+        column. The results are stored for each combination of arguments, so repeating a query does not recalculate it.
+        They are recalculated after the columns they depend on change (see append and update).
+
+        Arguments
+        ---------
+        by : str
+            The name of the categorical column: 'Genres', 'Distributor' or any other column of the dataset (e.g.,
+            'Rating'). Default is 'Genres'.
+        metric : str
+            The name of the numerical column (e.g., 'Revenue', 'Rating', 'Runtime'). Default is 'Revenue'.
+        agg : list
+            The aggregations: 'sum', 'mean', 'std' (population standard deviation), 'se' (standard error) and 'count'
+            (number of movies). Default is ('mean', 'se').
+        sort : str
+            'desc' or 'asc' to sort the elements by the first aggregation, or None to keep the order of the dataset.
+            Default is 'desc'.
+        top_k : int
+            The number of elements returned (the first ones after sorting). Default is None, which means every element
+            is returned.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            A dataframe containing the element (by column) and the aggregations of each element. The aggregation
+            columns are named like those of __genres_df (e.g., 'Mean Revenue', 'Standard Error (Revenue)').
 
-                # Go through each row and append the numerical value if element appears in the row
-                for index, row in self.__df.iterrows():
-                    if element in row[column]:
-                        values.append(row[variable])
+        """
+        agg = [agg] if isinstance(agg, str) else list(agg)
+        unknown = [name for name in agg if name not in _AGGREGATION_COLUMNS]
+        if unknown or not agg:
+            raise ValueError(f'agg must contain some of {list(_AGGREGATION_COLUMNS)}, not {agg!r}')
+        if sort not in ('desc', 'asc', None):
+            raise ValueError(f"sort must be 'desc', 'asc' or None, not {sort!r}")
+        if by not in self.__df.columns or metric not in self.__df.columns:
+            raise ValueError(f'by and metric must be columns of the dataset, not {by!r} and {metric!r}')
+
+        key = (by, metric, tuple(agg), sort, top_k)
+        if key not in self.__stats_results:
+            columns = list(dict.fromkeys(_AGGREGATION_COLUMNS[name].format(metric=metric) for name in agg))
+            result = self.__get_specialized_df(by, metric)[[by] + columns]
+            if sort is not None:
+                result = result.sort_values(by=[columns[0]], ascending=sort == 'asc')
+            if top_k is not None:
+                result = result.head(top_k)
+            self.__stats_results[key] = result.reset_index(drop=True)
+        return self.__stats_results[key].copy()
+
+    def stats_figure(self, by='Genres', metric='Revenue', agg='mean', sort='asc', top_k=None, error_bars=False,
+                     highlight_preferred_genres=False):
+        """
+        Create a bar chart of one of the aggregations calculated by stats (e.g., the Mean Rating vs Genre bar chart).
+        The figure is created when it is requested and is not stored, since only the statistics are costly to
+        calculate.
 
-                output_list[-1].append(sum(values))  # Append the summation value
-                output_list[-1].append(sum(values) / len(values))  # Append the mean value
-                output_list[-1].append(np.std(values))  # Append the standard deviation value
+        Arguments
+        ---------
+        by : str
+            The name of the categorical column. Default is 'Genres'.
+        metric : str
+            The name of the numerical column. Default is 'Revenue'.
+        agg : str
+            The aggregation displayed by the bars: 'sum', 'mean', 'std', 'se' or 'count'. Default is 'mean'.
+        sort : str
+            The order of the bars ('asc', 'desc' or None). Default is 'asc'.
+        top_k : int
+            The number of bars displayed. Default is None, which means every element is displayed.
+        error_bars : bool
+            Whether the standard error is displayed as error bars. Default is False.
+        highlight_preferred_genres : bool
+            Whether the bars of the preferred genres are highlighted. Default is False.
 
-            output_list[-1].append(len(values))  # Append the number of movies that contained element
+        Returns
+        -------
+        plotly.graph_objs._figure.Figure
+            The bar chart.
 
-        return output_list
+        """
+        statistics = self.stats(by, metric, [agg, 'count', 'se'], sort, top_k)
+        column = _AGGREGATION_COLUMNS[agg].format(metric=metric)
+        monochromatic_list, pg_highlighted = self.__produce_color_lists(statistics[by], 'lightslategray', 'crimson')
+
+        custom_df = np.stack((statistics[column], statistics['Number of Movies']), axis=-1)
+        hovertemplate = f'{column}: %{{customdata[0]:.2f}} <br><b>Number of Movies: %{{customdata[1]:.0f}}'
+        fig = self.__create_barchart(statistics[by].astype(str), statistics[column],
+                                     pg_highlighted if highlight_preferred_genres else monochromatic_list, custom_df,
+                                     hovertemplate, statistics[f'Standard Error ({metric})'] if error_bars else None)
+        self.__add_labels([fig], [f'{column} per {by}'], [None], [column])
+        return fig
 
-    def __produce_color_lists(self, base_color, secondary_color):
+    def distributor_page(self, level=0):
+        """
+        Obtain the statistics of the revenue of the distribution companies ranked from level * distributor_top_k + 1
+        to (level + 1) * distributor_top_k by overall revenue. The companies ranked below them are combined into an
+        "Other Distributors" bucket (its mean, standard deviation and standard error are those of all their movies
+        together). The companies are selected with a partial sort (np.argpartition), so only the companies of the page
+        are sorted. The result is stored for each level.
+
+        Arguments
+        ---------
+        level : int
+            The page (0 contains the top companies, 1 the ones in the "Other Distributors" bucket of page 0, etc.).
+            Default is 0.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            A dataframe with the columns of __dist_df, containing the companies of the page (in the order of __dist_df)
+            followed by the "Other Distributors" bucket if there are companies below them.
+
+        """
+        if level not in self.__distributor_pages:
+            dist_df = self.__get_specialized_df('Distributor', 'Revenue')
+            top_k = self.__distributor_top_k if self.__distributor_top_k is not None else len(dist_df.index)
+            first, last = level * top_k, (level + 1) * top_k
+            revenue = dist_df['Revenue'].to_numpy()
+            if last < len(revenue):
+                above = np.argpartition(-revenue, last - 1)[:last]  # The companies ranked above last (unordered)
+                below = np.setdiff1d(np.arange(len(revenue)), above, assume_unique=True)
+                page = np.sort(above[np.argsort(-revenue[above], kind='stable')[first:]])
+            else:
+                page = np.sort(np.argsort(-revenue, kind='stable')[first:])
+                below = np.array([], dtype=np.int64)
+
+            page_df = dist_df.iloc[page].astype({'Distributor': object}).reset_index(drop=True)
+            if len(below):
+                tail_df = dist_df.iloc[below]
+                count, total, mean, sd = combine_statistics(tail_df['Number of Movies'], tail_df['Revenue'],
+                                                            tail_df['SD Revenue'])
+                other = pd.DataFrame({'Distributor': [OTHER_DISTRIBUTORS], 'Revenue': [total],
+                                      'Mean Revenue': [mean], 'SD Revenue': [sd], 'Number of Movies': [count]})
+                other = self.__add_standard_errors(other, ['Revenue'])
+                page_df = pd.concat([page_df, other[page_df.columns]], ignore_index=True)
+            self.__distributor_pages[level] = page_df
+        return self.__distributor_pages[level]
+
+    def __scatter_trace(self, number_of_points):
+        """
+        Obtain the scatter trace type used to display a series: go.Scattergl (WebGL) if it is longer than
+        __webgl_threshold, and go.Scatter (SVG) otherwise. Both accept the same properties (e.g., fill,
+        hovertemplate) and are displayed above the shapes of the layout (e.g., the lockdown regions).
+
+        Arguments
+        ---------
+        number_of_points : int
+            The number of points of the whole series (i.e., before it is downsampled).
+
+        Returns
+        -------
+        type
+            The trace type (go.Scattergl or go.Scatter).
+
+        """
+        if self.__webgl_threshold is not None and number_of_points > self.__webgl_threshold:
+            return go.Scattergl
+        return go.Scatter
+
+    def __produce_color_lists(self, genres, base_color, secondary_color):
         """
         Create a couple of lists comprised of the colors for the bars of a bar chart. One of the lists will be
         monochromatic and the other will have a different color for the bars representing the preferred user genres.
 
         Arguments
         ---------
+        genres : pandas.core.series.Series
+            The genre represented by each bar (in the order in which the bars are displayed).
         base_color : str
             A string representing the base color for the bars.
         secondary_color : str
@@ -213,22 +835,58 @@ class ChartCreator:
             A list containing the secondary colors for the preferred genres and the base colors for the rest.
 
         """
-        monochromatic_list = [base_color] * len(self.__genres_df.index)  # Base color for each genre
-        pg_highlighted = copy.copy(monochromatic_list)
-        genres_list = self.__genres_df['Genres'].tolist()
+        monochromatic_list = [base_color] * len(genres)  # Base color for each genre
 
-        # Find the position of the bars that contain the preferred genres
-        preferred_genres_pos = []
-        for i in range(len(genres_list)):
-            if genres_list[i] in self.__preferred_genres:
-                preferred_genres_pos.append(i)
-
-        # Chane the color of the preferred genres bars to the secondary color
-        for genre_pos, color in zip(preferred_genres_pos, pg_highlighted):
-            pg_highlighted[genre_pos] = secondary_color
+        # Change the color of the preferred genres bars to the secondary color
+        is_preferred = np.isin(genres.to_numpy(), self.__preferred_genres)
+        pg_highlighted = np.where(is_preferred, secondary_color, base_color).tolist()
 
         return monochromatic_list, pg_highlighted
 
+    def __create_figure_deltas(self, base_name):
+        """
+        Produce the changes to the trace of a base figure that create each of the figures that are variants of it. The
+        options of graph 1 (fig1 to fig4 and fig5 and fig6) only differ in the colors of the bars and the error bars,
+        and the same happens with fig12 and fig13. Hence, only fig1, fig5 and fig13 are built from the data.
+
+        The changes of every figure with the same base figure modify the same properties, so the changes of a figure can
+        be applied to any of the figures with the same base figure. A value of None means the property is removed.
+
+        Arguments
+        ---------
+        base_name : str
+            The name of the base figure: 'fig1', 'fig5' or 'fig13'. Only the statistics needed by its variants are
+            calculated.
+
+        Returns
+        -------
+        dict
+            A dictionary that maps the name of each figure with that base figure (including itself) to the changes.
+
+        """
+        if base_name == 'fig1':
+            mean_sorted = self.stats('Genres', 'Revenue', ['mean', 'se'], sort='asc')
+            mean_monochromatic, mean_highlighted = self.__produce_color_lists(mean_sorted['Genres'], 'lightslategray',
+                                                                              'crimson')
+            genres_error = mean_sorted['Standard Error (Revenue)'].to_numpy()
+            return {
+                'fig1': {'marker': {'color': mean_monochromatic}, 'error_y': {'array': None}},
+                'fig2': {'marker': {'color': mean_highlighted}, 'error_y': {'array': genres_error}},
+                'fig3': {'marker': {'color': mean_highlighted}, 'error_y': {'array': None}},
+                'fig4': {'marker': {'color': mean_monochromatic}, 'error_y': {'array': genres_error}},
+            }
+
+        if base_name == 'fig5':
+            overall_sorted = self.stats('Genres', 'Revenue', ['sum'], sort='asc')
+            overall_monochromatic, overall_highlighted = self.__produce_color_lists(overall_sorted['Genres'],
+                                                                                    'lightslategray', 'crimson')
+            return {'fig5': {'marker': {'color': overall_monochromatic}},
+                    'fig6': {'marker': {'color': overall_highlighted}}}
+
+        dist_sorted = self.distributor_page().sort_values(by=['Mean Revenue'])
+        dist_error = dist_sorted['Standard Error (Revenue)'].to_numpy()
+        return {'fig12': {'error_x': {'array': dist_error}}, 'fig13': {'error_x': {'array': None}}}
+
     @staticmethod
     def __create_barchart(data_x, data_y, bar_colors, customdata, hovertemplate, error=None):
         """
@@ -270,12 +928,16 @@ class ChartCreator:
 
         return fig
 
-    def __create_horizontal_barchart(self, error=None):
+    @staticmethod
+    def __create_horizontal_barchart(dist_df, error=None):
         """
         Generate a horizontal bar plot to explain the Distributor vs Mean Revenue relationship.
 
         Arguments
         ---------
+        dist_df : pandas.core.frame.DataFrame
+            The dataframe containing the information about each distribution company (sorted in the order in which the
+            bars are displayed).
         error : pandas.core.series.Series
             The dataframe column that contains the standard error information. It is none by default, which means the
             error bars are not included.
@@ -288,7 +950,7 @@ class ChartCreator:
         """
         fig = go.Figure(layout=go.Layout(bargap=0.3))
         fig.add_trace(go.Bar(
-            y=self.__dist_df['Distributor'], x=self.__dist_df['Mean Revenue'], marker_color='lightslategray',
+            y=dist_df['Distributor'], x=dist_df['Mean Revenue'], marker_color='lightslategray',
             error_x=dict(type='data', array=error), orientation='h'))
         fig.update_xaxes(type='log')
         fig.update_yaxes(tickfont_size=9)
@@ -326,83 +988,132 @@ class ChartCreator:
 
     def __create_graph1_figs_mean_revenue(self):
         """
-        Create the four different figures that showcase the Mean Revenue vs Genre relationship.
+        Create the base figure that showcases the Mean Revenue vs Genre relationship. The other three options (fig2,
+        fig3 and fig4) are obtained by applying the changes in __figure_deltas to it.
 
         Returns
         -------
-        fig1 : plotly.graph_objs._figure.Figure
-            Mean Revenue vs Genre bar plot (monochromatic and no error bars).
-        fig2 : plotly.graph_objs._figure.Figure
-            Mean Revenue vs Genre bar plot (preferred genres highlighted and error bars).
-        fig3 : plotly.graph_objs._figure.Figure
-            Mean Revenue vs Genre bar plot (preferred genres highlighted and no error bars).
-        fig4 : plotly.graph_objs._figure.Figure
-            Mean Revenue vs Genre bar plot (monochromatic and error bars).
+        plotly.graph_objs._figure.Figure
+            Mean Revenue vs Genre bar plot (monochromatic and no error bars), i.e., fig1.
 
         """
-        self.__genres_df.sort_values(by=['Mean Revenue'], inplace=True)
-        monochromatic_list, pg_highlighted = self.__produce_color_lists('lightslategray', 'crimson')
+        genres_df = self.stats('Genres', 'Revenue', ['mean', 'count'], sort='asc')
+        # The base figure is monochromatic (the preferred genres are highlighted by the deltas of its variants)
+        monochromatic_list = ['lightslategray'] * len(genres_df.index)
 
         # Introduce custom_df and hovertemplate (they will be used to define the hover value of the figures)
-        custom_df = np.stack((self.__genres_df['Mean Revenue'], self.__genres_df['Number of Movies']), axis=-1)
+        custom_df = np.stack((genres_df['Mean Revenue'], genres_df['Number of Movies']), axis=-1)
         hovertemplate = 'Mean Revenue: %{customdata[0]:.0f} (USD) <br><b>Number of Movies: %{customdata[1]:.0f}'
 
-        # Create the four different figures
-        fig1 = self.__create_barchart(self.__genres_df['Genres'], self.__genres_df['Mean Revenue'],
-                                      monochromatic_list, custom_df, hovertemplate)
-        fig2 = self.__create_barchart(self.__genres_df['Genres'], self.__genres_df['Mean Revenue'],
-                                      pg_highlighted, custom_df, hovertemplate,
-                                      self.__genres_df['Standard Error (Revenue)'])
-        fig3 = self.__create_barchart(self.__genres_df['Genres'], self.__genres_df['Mean Revenue'],
-                                      pg_highlighted, custom_df, hovertemplate)
-        fig4 = self.__create_barchart(self.__genres_df['Genres'], self.__genres_df['Mean Revenue'],
-                                      monochromatic_list, custom_df, hovertemplate,
-                                      self.__genres_df['Standard Error (Revenue)'])
-
-        # Include the labels for the figures
-        titles = ['Average Revenue for Movies Containing Elements of Each Main Genre'] * 4
-        xlabels = [None] * 4
-        ylabels = ['Revenue ($)'] * 4
-        self.__add_labels([fig1, fig2, fig3, fig4], titles, xlabels, ylabels)
-
-        return fig1, fig2, fig3, fig4
+        # Create the figure
+        fig1 = self.__create_barchart(genres_df['Genres'], genres_df['Mean Revenue'], monochromatic_list, custom_df,
+                                      hovertemplate)
+
+        # Include the labels for the figure
+        self.__add_labels([fig1], ['Average Revenue for Movies Containing Elements of Each Main Genre'], [None],
+                          ['Revenue ($)'])
+
+        return fig1
 
     def __create_graph1_figs_overall_revenue(self):
         """
-        Create the two figures that describe the Overall Revenue vs Genre relationship.
+        Create the base figure that describes the Overall Revenue vs Genre relationship. The other option (fig6) is
+        obtained by applying the changes in __figure_deltas to it.
 
         Returns
         -------
-        fig5 : plotly.graph_objs._figure.Figure
-            Overall Revenue vs Genre bar plot (monochromatic).
-        fig6 : plotly.graph_objs._figure.Figure
-            Overall Revenue vs Genre bar plot (preferred genres highlighted).
+        plotly.graph_objs._figure.Figure
+            Overall Revenue vs Genre bar plot (monochromatic), i.e., fig5.
 
         """
-        self.__genres_df.sort_values(by=['Revenue'], inplace=True)
-        monochromatic_list, pg_highlighted = self.__produce_color_lists('lightslategray', 'crimson')
+        genres_df = self.stats('Genres', 'Revenue', ['sum', 'count'], sort='asc')
+        # The base figure is monochromatic (the preferred genres are highlighted by the deltas of its variants)
+        monochromatic_list = ['lightslategray'] * len(genres_df.index)
 
         # Introduce custom_df and hovertemplate (they will be used to define the hover value of the figures)
-        custom_df = np.stack((self.__genres_df['Revenue'], self.__genres_df['Number of Movies']), axis=-1)
+        custom_df = np.stack((genres_df['Revenue'], genres_df['Number of Movies']), axis=-1)
         hovertemplate = 'Overall Revenue: %{customdata[0]:.0f} (USD) <br><b>Number of Movies: %{customdata[1]:.0f}'
 
-        # Create both figures
-        fig5 = self.__create_barchart(self.__genres_df['Genres'], self.__genres_df['Revenue'],
-                                      monochromatic_list, custom_df, hovertemplate)
-        fig6 = self.__create_barchart(self.__genres_df['Genres'], self.__genres_df['Revenue'],
-                                      pg_highlighted, custom_df, hovertemplate)
+        # Create the figure
+        fig5 = self.__create_barchart(genres_df['Genres'], genres_df['Revenue'], monochromatic_list, custom_df,
+                                      hovertemplate)
 
-        # Include the labels for the figures
-        titles = ['Overall Revenue for Movies Containing Elements of Each Main Genre'] * 2
-        xlabels = [None] * 2
-        ylabels = ['Revenue ($)'] * 2
-        self.__add_labels([fig5, fig6], titles, xlabels, ylabels)
+        # Include the labels for the figure
+        self.__add_labels([fig5], ['Overall Revenue for Movies Containing Elements of Each Main Genre'], [None],
+                          ['Revenue ($)'])
 
-        return fig5, fig6
+        return fig5
+
+    def __bin_runtime(self, number_of_bins, bin_width):
+        """
+        Split the runtime of the movies into bins and calculate the number of movies and the overall and mean revenue
+        of each bin in a single pass (see bin_statistics). The result is stored, so each binning is only calculated
+        once.
+
+        Arguments
+        ---------
+        number_of_bins : int
+            The approximate number of bins (the bin width is rounded).
+        bin_width : float
+            The width of the bins, in minutes (None means it is obtained from number_of_bins).
+
+        Returns
+        -------
+        dict
+            The edges of the bins and the number of movies ('count') and overall ('sum') and mean ('mean') revenue of
+            each bin.
+
+        """
+        key = (number_of_bins, bin_width)
+        if key not in self.__runtime_histograms:
+            runtime = self.__df['Runtime'].to_numpy(dtype=np.float64)
+            revenue = self.__df['Revenue'].to_numpy(dtype=np.float64)
+            if self.__mask is not None:
+                runtime, revenue = runtime[self.__mask], revenue[self.__mask]
+            self.__runtime_histograms[key] = bin_statistics(runtime, revenue, number_of_bins, bin_width)
+        return self.__runtime_histograms[key]
+
+    def runtime_histogram(self, name, number_of_bins=8, bin_width=None):
+        """
+        Obtain the data of the trace of one of the runtime histograms (fig7, fig8 or fig9) for a given number of bins or
+        bin width. The bins are calculated on the server, so the size of the data only depends on the number of bins
+        (not on the number of movies), and changing the bins only requires replacing these properties of the trace.
+
+        Arguments
+        ---------
+        name : str
+            The name of the histogram: 'fig7' (overall revenue), 'fig8' (mean revenue) or 'fig9' (number of movies).
+        number_of_bins : int
+            The approximate number of bins (the bin width is rounded to 1, 2, 2.5 or 5 times a power of 10). Default is
+            8.
+        bin_width : float
+            The width of the bins, in minutes. If it is introduced, number_of_bins is ignored. Default is None.
+
+        Returns
+        -------
+        dict
+            The x (center of each bin), y, width and customdata (start, end and number of movies of each bin)
+            properties of the bar trace.
+
+        """
+        statistics = {'fig7': 'sum', 'fig8': 'mean', 'fig9': 'count'}
+        if name not in statistics:
+            raise ValueError(f"name must be 'fig7', 'fig8' or 'fig9', not {name!r}")
+
+        bins = self.__bin_runtime(number_of_bins, bin_width)
+        edges = bins['edges']
+        y = bins[statistics[name]].astype(np.float64)
+        return {
+            'x': ((edges[:-1] + edges[1:]) / 2).tolist(),
+            'y': [None if math.isnan(value) else value for value in y.tolist()],  # Empty bins have no mean revenue
+            'width': (np.diff(edges) * 0.98).tolist(),  # Spacing between the bars has been included
+            'customdata': np.stack((edges[:-1], edges[1:], bins['count']), axis=-1).tolist(),
+        }
 
     def __create_graph2_figs(self):
         """
-        Create the four figures that display the information about runtime.
+        Create the four figures that display the information about runtime. The bins are calculated on the server (see
+        runtime_histogram), so each figure only contains one bar per bin.
 
         Returns
         -------
@@ -414,41 +1125,121 @@ class ChartCreator:
             Count vs Runtime Histogram.
 
         """
+        hovertemplates = {
+            'fig7': 'Runtime: %{customdata[0]}-%{customdata[1]} minutes<br>Overall Revenue: %{y:.0f} (USD)'
+                    '<br>Number of Movies: %{customdata[2]}<extra></extra>',
+            'fig8': 'Runtime: %{customdata[0]}-%{customdata[1]} minutes<br>Mean Revenue: %{y:.0f} (USD)'
+                    '<br>Number of Movies: %{customdata[2]}<extra></extra>',
+            'fig9': 'Runtime: %{customdata[0]}-%{customdata[1]} minutes<br>Number of Movies: %{y}<extra></extra>',
+        }
+
         # Create the figures
-        fig7 = px.histogram(self.__df, x='Runtime', y='Revenue', log_y=True, nbins=8,
-                            color_discrete_sequence=['lightslategray'], template='plotly_white')
-        fig8 = px.histogram(self.__df, x='Runtime', y='Revenue', histfunc='avg', log_y=True, nbins=8,
-                            color_discrete_sequence=['lightslategray'], template='plotly_white')
-        fig9 = px.histogram(self.__df, x='Runtime', nbins=8, color_discrete_sequence=['lightslategray'],
-                            template='plotly_white')
-
-        # Include the labels. Spacing between the bars has been included
+        layout = go.Layout(template='plotly_white')
+        fig7, fig8, fig9 = [go.Figure(go.Bar(marker_color='lightslategray', hovertemplate=hovertemplates[name],
+                                             **self.runtime_histogram(name)), layout=layout)
+                            for name in ('fig7', 'fig8', 'fig9')]
+        fig7.update_yaxes(type='log')
+        fig8.update_yaxes(type='log')
+
+        # Include the labels
         titles = ['Overall Revenue per Runtime', 'Mean Revenue per Runtime', 'Movies per Runtime']
         xlabels = ['Runtime (minutes)'] * 3
         ylabels = ['Revenue ($)', 'Revenue ($)', 'Number of Movies']
-        self.__add_labels([fig7, fig8, fig9], titles, xlabels, ylabels, {'bargap': 0.02})
+        self.__add_labels([fig7, fig8, fig9], titles, xlabels, ylabels)
 
         return fig7, fig8, fig9
 
+    def __rollup_revenue(self, frequency):
+        """
+        Add up the revenue of the movies released on each period (day, week or month) in a single pass: the start day
+        of the period of each release is obtained with date arithmetic and the revenue is added up per day with
+        np.bincount. The result is stored, so it is only calculated once for each frequency.
+
+        Arguments
+        ---------
+        frequency : str
+            The length of the periods: 'D' (day), 'W' (week) or 'M' (month). Each period is represented by the date on
+            which it starts.
+
+        Returns
+        -------
+        pandas.core.series.Series
+            The summation of the revenue of the movies released on each period, indexed by the start date of the
+            period (only periods containing at least one release are included, in ascending order).
+
+        """
+        if frequency not in self.__revenue_rollups:
+            dates = self.__df['Release Date'].to_numpy()
+            revenue = self.__df['Revenue'].to_numpy()
+            if self.__mask is not None:
+                dates, revenue = dates[self.__mask], revenue[self.__mask]
+            is_valid = ~np.isnat(dates)  # Movies without a release date are not included
+            dates, revenue = dates[is_valid], revenue[is_valid]
+
+            # The start day of the period of each release, as the number of days since 1970-01-01 (a Thursday)
+            if frequency == 'M':
+                days = dates.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+            else:
+                days = dates.astype('datetime64[D]').astype(np.int64)
+                if frequency == 'W':
+                    days -= (days + 3) % 7  # The weeks start on Monday
+            first_day = days.min() if len(days) else 0
+            releases = np.bincount(days - first_day)
+            totals = np.bincount(days - first_day, weights=revenue)
+            periods = np.flatnonzero(releases)
+            # The revenue may be stored in a narrow dtype (see downcast_numeric_columns), but its summations are not
+            totals = totals[periods]
+            self.__revenue_rollups[frequency] = pd.Series(
+                totals.astype(np.result_type(revenue.dtype, np.int64)) if revenue.dtype.kind in 'iu' else totals,
+                index=pd.DatetimeIndex((periods + first_day).astype('datetime64[D]').astype('datetime64[ns]')))
+        return self.__revenue_rollups[frequency]
+
+    def graph3_series(self, start=None, end=None):
+        """
+        Obtain the dates and revenue displayed on the Revenue vs Date Area plot. If there are more than
+        graph3_max_points dates between start and end, the series is downsampled with the Largest-Triangle-Three-Buckets
+        algorithm. Hence, narrowing the date range (e.g., zooming in) gives a finer resolution.
+
+        Arguments
+        ---------
+        start : str
+            The first date of the range (e.g., '2020-03-15'). Default is None, which means the range is not limited.
+        end : str
+            The last date of the range. Default is None, which means the range is not limited.
+
+        Returns
+        -------
+        dates : list
+            The dates of the selected points. The closest dates outside the range are included, so that the area
+            reaches the edges of the range.
+        revenue : list
+            The revenue of the selected points.
+
+        """
+        rollup = self.__rollup_revenue(self.__release_date_frequency)
+        dates = rollup.index
+        first = 0 if start is None else max(dates.searchsorted(pd.Timestamp(start), side='left') - 1, 0)
+        last = len(dates) if end is None else min(dates.searchsorted(pd.Timestamp(end), side='right') + 1, len(dates))
+        dates, revenue = dates[first:last], rollup.to_numpy()[first:last]
+
+        selected = lttb_indices(dates.asi8, revenue, self.__graph3_max_points)
+        return dates[selected].tolist(), revenue[selected].tolist()
+
     def __create_graph3_fig(self):
         """Produce the Revenue vs Date Area plot figure"""
 
-        # Get each date in the in the Release Date column of self.__df
-        dates = []
-        for index, row in self.__df.iterrows():
-            if row['Release Date'] not in dates:  # If the date has not already been included
-                dates.append(row['Release Date'])
-
-        # Get the summation of revenues of movies that came out on each date in dates
-        revenue = []
-        for date in dates:
-            revenue.append(sum([row['Revenue'] for index, row in self.__df.iterrows() if date == row['Release Date']]))
+        # Get the summation of revenues of movies that came out on each date (or week or month), downsampled if there
+        # are too many dates
+        dates, revenue = self.graph3_series()
 
-        # Define the figure
+        # Define the figure. Long series are rendered with WebGL: the whole series is compared with the threshold, since
+        # the downsampled one never has more than graph3_max_points (zooming in only replaces the points of the trace,
+        # see graph3_series, so the trace type is kept)
         layout = go.Layout(template='plotly_white')
         fig10 = go.Figure(layout=layout)
         fig10.add_trace(
-            go.Scatter(x=dates, y=revenue, fill='tonexty'))
+            self.__scatter_trace(len(self.__rollup_revenue(self.__release_date_frequency)))(x=dates, y=revenue,
+                                                                                            fill='tonexty'))
 
         # Add a green region (pre-lockdown)
         fig10.add_vrect(
@@ -482,100 +1273,809 @@ class ChartCreator:
 
         return fig10
 
+    @staticmethod
+    def __create_treemap(dist_df, root_label):
+        """
+        Create a treemap of the overall revenue of some distribution companies, colored by their number of movies.
+
+        Arguments
+        ---------
+        dist_df : pandas.core.frame.DataFrame
+            The dataframe containing the information about each distribution company.
+        root_label : str
+            The label of the rectangle that contains every company.
+
+        Returns
+        -------
+        plotly.graph_objs._figure.Figure
+            The created treemap.
+
+        """
+        import plotly.express as px  # Imported when it is first needed, since importing it is slow
+
+        return px.treemap(dist_df, path=[px.Constant(root_label), 'Distributor'],
+                          values='Revenue',
+                          color='Number of Movies',  # Add a color scale for the number of movies
+                          color_continuous_scale='RdBu',
+                          color_continuous_midpoint=np.average(dist_df['Number of Movies'], weights=dist_df['Revenue'])
+                          if dist_df['Revenue'].sum() > 0 else None)
+
+    def distributor_treemap(self, level=0):
+        """
+        Produce the treemap of a page of the top distribution companies (see distributor_page). The treemap of level 0
+        is fig11. Clicking on the "Other Distributors" rectangle of a treemap displays the treemap of the next level,
+        whose root rectangle is also labelled "Other Distributors".
+
+        Arguments
+        ---------
+        level : int
+            The page of distribution companies. Default is 0.
+
+        Returns
+        -------
+        plotly.graph_objs._figure.Figure
+            The treemap.
+
+        """
+        fig = self.__create_treemap(self.distributor_page(level),
+                                    'Distribution Companies' if level == 0 else OTHER_DISTRIBUTORS)
+        self.__add_labels([fig], ['Distributor Revenue'], [None], [None])
+        return fig
+
     def __create_graph4_figs(self):
         """
-        Produce the three figures that describe the relationship between Distributor and Revenue.
+        Produce the two base figures that describe the relationship between Distributor and Revenue. The other option
+        (fig12) is obtained by applying the changes in __figure_deltas to fig13. Only the top distributor_top_k
+        companies are displayed (the rest are combined, see distributor_page).
 
         Returns
         -------
         fig11 :  plotly.graph_objs._figure.Figure
             A treemap containing the Overall Revenue for each of the different Distributors.
-        fig12 : plotly.graph_objs._figure.Figure
-            A horizontal bar chart that showcases Distributor vs Mean Revenue (error bars included).
         fig13 : plotly.graph_objs._figure.Figure
             A horizontal bar chart that showcases Distributor vs Mean Revenue (no error bars).
 
         """
         # Define the figures
-        fig11 = px.treemap(self.__dist_df, path=[px.Constant("Distribution Companies"), 'Distributor'],
-                           values='Revenue',
-                           color='Number of Movies',  # Add a color scale for the number of movies
-                           color_continuous_scale='RdBu',
-                           color_continuous_midpoint=np.average(self.__dist_df['Number of Movies'],
-                                                                weights=self.__dist_df['Revenue']))
-        self.__dist_df.sort_values(by=['Mean Revenue'], inplace=True)  # Sort by ascending Mean Revenue
-        fig12 = self.__create_horizontal_barchart(self.__dist_df['Standard Error (Revenue)'])
-        fig13 = self.__create_horizontal_barchart()
+        fig11 = self.distributor_treemap()
+        dist_df = self.distributor_page().sort_values(by=['Mean Revenue'])  # Sort by ascending Mean Revenue
+        fig13 = self.__create_horizontal_barchart(dist_df)
+
+        # Include the labels
+        self.__add_labels([fig13], ['Mean Distributor Revenue'], ['Revenue ($)'], [None])
+
+        return fig11, fig13
+
+    def __get_revenue_rating_points(self):
+        """
+        Obtain the rating and the logarithm (base 10) of the revenue of the movies that can be placed on the Revenue vs
+        Rating density heatmap (i.e., those with a rating and a positive revenue). The arrays are only extracted once.
+
+        Returns
+        -------
+        rating : numpy.ndarray
+            The rating of each movie.
+        log_revenue : numpy.ndarray
+            The logarithm of the revenue of each movie.
+
+        """
+        if self.__revenue_rating_points is None:
+            rating = self.__df['Rating'].to_numpy(dtype=np.float64)
+            revenue = self.__df['Revenue'].to_numpy(dtype=np.float64)
+            if self.__mask is not None:
+                rating, revenue = rating[self.__mask], revenue[self.__mask]
+            is_valid = ~np.isnan(rating) & (revenue > 0)  # The revenue is displayed on a logarithmic axis
+            self.__revenue_rating_points = rating[is_valid], np.log10(revenue[is_valid])
+        return self.__revenue_rating_points
+
+    def revenue_rating_density(self, rating_range=None, log_revenue_range=None, number_of_bins=(40, 40)):
+        """
+        Obtain the data of the trace of the Revenue vs Rating density heatmap (fig14). The movies are counted on a grid
+        of rating x log(revenue) cells on the server (see histogram_module.bin_counts_2d), so the size of the data only
+        depends on the number of cells (not on the number of movies). The grid spans the introduced ranges, so
+        narrowing them (e.g., zooming in) gives a finer resolution with the same number of cells.
+
+        Arguments
+        ---------
+        rating_range : tuple
+            The minimum and maximum rating of the grid. Default is None, which means the range of the movies.
+        log_revenue_range : tuple
+            The minimum and maximum logarithm (base 10) of the revenue of the grid, which is the range of a logarithmic
+            axis in plotly. Default is None, which means the range of the movies.
+        number_of_bins : tuple
+            The number of cells along the rating and revenue axes. Default is (40, 40).
+
+        Returns
+        -------
+        dict
+            The x (edges of the rating cells), y (edges of the revenue cells, in dollars), z (number of movies of each
+            cell, None for the empty ones) and customdata (rating and revenue range of each cell) properties of the
+            heatmap trace.
+
+        """
+        rating, log_revenue = self.__get_revenue_rating_points()
+        bins = bin_counts_2d(rating, log_revenue, rating_range, log_revenue_range, number_of_bins)
+        x_edges, y_edges = bins['x_edges'].round(6), (10 ** bins['y_edges']).round()  # Shorter JSON numbers
+        ranges = np.stack(np.broadcast_arrays(x_edges[:-1], x_edges[1:], y_edges[:-1, np.newaxis],
+                                              y_edges[1:, np.newaxis]), axis=-1)
+        return {
+            'x': x_edges.tolist(),
+            'y': y_edges.tolist(),
+            'z': np.where(bins['count'] > 0, bins['count'], None).tolist(),  # The empty cells are not colored
+            'customdata': ranges.tolist(),
+        }
+
+    def __create_graph5_fig(self):
+        """
+        Produce the Revenue vs Rating density heatmap figure, i.e., fig14. The movies are binned on the server (see
+        revenue_rating_density), so the figure only contains one value per cell.
+
+        Returns
+        -------
+        plotly.graph_objs._figure.Figure
+            The heatmap of the number of movies per rating and revenue.
+
+        """
+        hovertemplate = ('Rating: %{customdata[0]:.2f}-%{customdata[1]:.2f}<br>'
+                         'Revenue: %{customdata[2]:.0f}-%{customdata[3]:.0f} (USD)<br>'
+                         'Number of Movies: %{z}<extra></extra>')
+        layout = go.Layout(template='plotly_white')
+        fig14 = go.Figure(go.Heatmap(colorscale='Viridis', colorbar_title_text='Number of Movies',
+                                     hovertemplate=hovertemplate, hoverongaps=False,
+                                     **self.revenue_rating_density()), layout=layout)
+        fig14.update_yaxes(type='log')
 
         # Include the labels
-        titles = ['Distributor Revenue', 'Mean Distributor Revenue', 'Mean Distributor Revenue']
-        xlabels = [None, 'Revenue ($)', 'Revenue ($)']
-        ylabels = [None] * 3
-        self.__add_labels([fig11, fig12, fig13], titles, xlabels, ylabels)
+        self.__add_labels([fig14], ['Number of Movies per Rating and Revenue'], ['Rating'], ['Revenue ($)'])
+
+        return fig14
+
+    def __store_figures(self, built, name):
+        """
+        Store a set of figures in the figure cache. The least recently used figures are evicted when the cache exceeds
+        its maximum size.
+
+        Arguments
+        ---------
+        built : dict
+            A dictionary that maps the name of each figure to the figure.
+        name : str
+            The name of the figure that has been requested. It is stored last, so that it is the last one to be evicted.
+
+        """
+        for figure_name in [n for n in built if n != name] + [name]:
+            self.__figure_cache[figure_name] = built[figure_name]
+            self.__figure_cache.move_to_end(figure_name)
+
+        while self.__figure_cache_size is not None and len(self.__figure_cache) > max(self.__figure_cache_size, 1):
+            evicted_name, _ = self.__figure_cache.popitem(last=False)  # Remove the least recently used figure
+            self.__figure_json.pop(evicted_name, None)
+            self.__figure_cache_stats['evictions'] += 1
+
+    def __run_builder(self, builder, names):
+        """
+        Create a set of figures with the method that builds them. Each figure is copied with go.Figure, which orders the
+        keys of its properties like the figures received from the worker processes of build_figures (pickling a figure
+        also rebuilds it from its properties). Hence, every figure is serialized (and hashed, see figure_json) in the
+        same way regardless of whether it was built on demand, by build_figures or by a worker process.
+
+        Arguments
+        ---------
+        builder : method
+            The method that creates the figures (see __create_figure_builders).
+        names : tuple
+            The names of the figures created by builder.
+
+        Returns
+        -------
+        list
+            The figures, in the same order as names.
+
+        """
+        with self.__profile(f'ChartCreator.{builder.__name__}'):
+            figures = builder()
+        if len(names) == 1:  # Builders that create a single figure do not return a tuple
+            figures = (figures,)
+        return [go.Figure(figure) for figure in figures]
+
+    def __get_figure(self, name):
+        """
+        Obtain a figure from the figure cache. If the figure is not in the cache, the method that creates it is called
+        and every figure produced by that method is stored. If the figure is a variant of a base figure, the changes in
+        __figure_deltas are applied to a copy of the base figure.
+
+        Arguments
+        ---------
+        name : str
+            The name of the figure (e.g., 'fig1').
+
+        Returns
+        -------
+        plotly.graph_objs._figure.Figure
+            The requested figure.
+
+        """
+        with self.__figure_lock:
+            if name in self.__figure_cache:
+                self.__figure_cache_stats['hits'] += 1
+                self.__figure_cache.move_to_end(name)  # Mark the figure as the most recently used
+                return self.__figure_cache[name]
+
+            base_name, delta = self.figure_delta(name)
+            if base_name != name:  # The figure is a variant of a base figure
+                base = self.__get_figure(base_name)
+                self.__figure_cache_stats['misses'] += 1
+                start = time.perf_counter()
+                with self.__profile(f'ChartCreator.variant({name})'):
+                    figure = go.Figure(base)
+                    figure.update_traces(delta)
+                self.__figure_cache_stats['build_time'] += time.perf_counter() - start
+                self.__store_figures({name: figure}, name)
+                return figure
+
+            self.__figure_cache_stats['misses'] += 1
+            builder, names = self.__figure_builders[name]
+            start = time.perf_counter()
+            built = dict(zip(names, self.__run_builder(builder, names)))
+            self.__figure_cache_stats['build_time'] += time.perf_counter() - start
+            self.__store_figures(built, name)
+            return built[name]
+
+    def figure_delta(self, name):
+        """
+        Obtain the base figure of a figure and the changes to the trace of the base figure that produce the figure. The
+        changes of all the figures with the same base figure modify the same properties, so they can be used to switch
+        between those figures (e.g., with a dash.Patch) instead of replacing the whole figure.
 
-        return fig11, fig12, fig13
+        Arguments
+        ---------
+        name : str
+            The name of the figure (e.g., 'fig2').
+
+        Returns
+        -------
+        base_name : str
+            The name of the base figure (name itself if the figure is not a variant of another figure).
+        delta : dict
+            The changes to the properties of the trace (a value of None means the property is removed). It is empty if
+            the figure has no variants.
+
+        """
+        base_name = _FIGURE_BASES.get(name, name)
+        if base_name not in _FIGURE_BASES.values():
+            return name, {}
+        if base_name not in self.__figure_deltas:  # The changes are calculated the first time they are needed
+            self.__figure_deltas[base_name] = self.__create_figure_deltas(base_name)
+        return base_name, self.__figure_deltas[base_name][name]
+
+    def figure_json(self, name):
+        """
+        Obtain a figure as a JSON-compatible dictionary. Each figure is serialized only once (with orjson if it is
+        installed), so the dictionary can be returned by the Dash callbacks without serializing the figure again.
+
+        Arguments
+        ---------
+        name : str
+            The name of the figure (e.g., 'fig1').
+
+        Returns
+        -------
+        figure : dict
+            The serialized figure. It must not be modified, as it is shared by every caller.
+        version : str
+            A hash of the serialized figure (i.e., an ETag). It only changes when the figure changes.
+
+        """
+        with self.__figure_lock:
+            figure = self.__get_figure(name)
+            if name not in self.__figure_json:
+                with self.__profile('ChartCreator.figure_json'):
+                    json_text = figure.to_json()
+                    self.__figure_json[name] = (orjson.loads(json_text) if orjson else json.loads(json_text),
+                                                hashlib.sha1(json_text.encode()).hexdigest())
+            return self.__figure_json[name]
+
+    def __prepare_rows(self, rows):
+        """
+        Convert a batch of movies into a dataframe with the same columns and types as __df. The genres may be introduced
+        either as lists or in the string format of the spreadsheet (e.g., "['Drama', 'Romance']"), and they are
+        converted into tuples. Missing cells are considered to be empty lists, like when the dataset is read.
+
+        Arguments
+        ---------
+        rows : pandas.core.frame.DataFrame or list
+            The movies (a dataframe or a list of dictionaries, one per movie).
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The prepared movies (only the first one of each film is kept).
+
+        Raises
+        ------
+        ValueError
+            If the movies do not contain every column of __df, or a genres cell cannot be parsed.
+
+        """
+        rows_df = pd.DataFrame(rows)
+        missing_columns = [column for column in self.__df.columns if column not in rows_df.columns]
+        if missing_columns:
+            raise ValueError(f"The rows do not contain the columns: {', '.join(missing_columns)}")
+        rows_df = rows_df[list(self.__df.columns)].drop_duplicates(subset=['Film'])
+
+        # Parse the genres that are in string format (the rest must already be lists or tuples, or be missing)
+        genres = [() if pd.api.types.is_scalar(cell) and pd.isna(cell) else cell for cell in rows_df['Genres']]
+        string_positions = [position for position, cell in enumerate(genres) if isinstance(cell, str)]
+        parsed = decode_genres(*parse_genres([genres[position] for position in string_positions]))
+        for position, cell in zip(string_positions, parsed):
+            genres[position] = cell
+        rows_df['Genres'] = pd.Series([tuple(cell) for cell in genres], index=rows_df.index, dtype=object)
+
+        # The categorical columns are kept as objects until the rows are added to __df (see __concat), since the
+        # rows may contain new categories. The numerical columns of __df are downcast (see downcast_numeric_columns),
+        # so they are widened if the new values do not fit in them
+        dtypes = {}
+        for column, dtype in self.__df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtypes[column] = object
+            elif pd.api.types.is_numeric_dtype(dtype) and pd.api.types.is_numeric_dtype(rows_df[column].dtype):
+                dtypes[column] = np.promote_types(dtype, downcast_numeric_columns(rows_df[[column]])[column].dtype)
+            else:
+                dtypes[column] = dtype
+        rows_df = rows_df.astype(dtypes)
+        first_index = self.__df.index.max() + 1 if len(self.__df.index) else 0
+        return rows_df.set_axis(pd.RangeIndex(first_index, first_index + len(rows_df.index)))
+
+    def __concat(self, frames):
+        """
+        Concatenate several dataframes with the columns of __df, keeping the categorical columns of __df categorical
+        (their categories are extended with the new elements).
+
+        Arguments
+        ---------
+        frames : list
+            The dataframes.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The concatenated dataframe.
+
+        """
+        df = pd.concat(frames)
+        for column, dtype in self.__df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        return df
+
+    def __get_genre_index(self):
+        """
+        Obtain __genre_index, rebuilding it if __df has been modified since it was last built.
+
+        Returns
+        -------
+        genre_index_module.GenreIndex
+            The genre membership index of __df['Genres'].
+
+        """
+        if self.__genre_index is None:
+            self.__genre_index = GenreIndex.from_genre_sets(self.__df['Genres'])
+        return self.__genre_index
+
+    def __get_filter_index(self):
+        """
+        Obtain the index that resolves the filters into masks (see FilterIndex), building it if it has not been built
+        since the dataset was loaded or last modified.
+
+        Returns
+        -------
+        filter_index_module.FilterIndex
+            The index of __df.
+
+        """
+        if self.__filter_index is None:
+            with self.__profile('ChartCreator.FilterIndex'):
+                self.__filter_index = FilterIndex.from_df(self.__df, self.__get_genre_index())
+        return self.__filter_index
+
+    def __get_genre_set_totals(self, variable):
+        """
+        Obtain the statistics of a numerical variable for each distinct list of genres over every movie (see
+        GenreIndex.set_statistics), calculating them if they have not been calculated since the dataset was loaded or
+        last modified. The dictionary that stores them is shared with the filtered views.
+
+        Arguments
+        ---------
+        variable : str
+            The name of the numerical column (e.g., Revenue).
+
+        Returns
+        -------
+        tuple
+            The number of movies, summation and sum of squared deviations of the variable for each list.
+
+        """
+        if variable not in self.__genre_set_totals:
+            self.__genre_set_totals[variable] = self.__get_genre_index().set_statistics(self.__df[variable].to_numpy())
+        return self.__genre_set_totals[variable]
+
+    def filter_options(self):
+        """
+        Obtain the values that can be selected on each filter (see filtered). The indexes used to apply the filters are
+        built here if necessary, so that the first filter selected on a graph page does not have to wait for them.
+
+        Returns
+        -------
+        dict
+            The genres, distributors, first and last release dates (in ISO format) and minimum and maximum runtime of
+            the movies of the dataset.
+
+        """
+        if self.__mask is None:
+            self.__get_filter_index()
+            self.__get_genre_set_totals('Revenue')
+        dates = self.__df['Release Date']
+        return {'genres': sorted(self.__genres_list), 'distributors': sorted(str(element) for element in
+                                                                            self.__distributors_list),
+                'first_date': dates.min().date().isoformat(), 'last_date': dates.max().date().isoformat(),
+                'runtime_range': [int(self.__df['Runtime'].min()), int(self.__df['Runtime'].max())]}
+
+    def filtered(self, start_date=None, end_date=None, genres=None, distributors=None, runtime_range=None):
+        """
+        Obtain a view of the ChartCreator whose statistics and figures only take into account the movies that satisfy
+        every introduced filter. The filters are resolved into a boolean mask with the precomputed FilterIndex, and the
+        view calculates the statistics of the genres and distributors over the masked movies (the runtime histograms
+        and the revenue per release date are calculated when their figures are first requested). The view shares the
+        dataset with the ChartCreator, but has its own figure cache. The latest views are stored, so applying the same
+        filters again returns the same view.
+
+        Arguments
+        ---------
+        start_date : str
+            The first release date (e.g., '2020-03-23'). Default is None, which means there is no lower limit.
+        end_date : str
+            The last release date. Default is None, which means there is no upper limit.
+        genres : list
+            The movies must contain at least one of these genres. Default is None (no genre filter).
+        distributors : list
+            The movies must be distributed by one of these companies. Default is None (no distributor filter).
+        runtime_range : list
+            The minimum and maximum runtime, in minutes. Default is None (no runtime filter).
+
+        Returns
+        -------
+        ChartCreator
+            The filtered view (the instance itself if no filter was introduced). Its movies cannot be modified.
+
+        """
+        if self.__mask is not None:
+            raise ValueError('A filtered view cannot be filtered again (filter the ChartCreator instead)')
+        filters = {'start_date': start_date, 'end_date': end_date, 'genres': genres, 'distributors': distributors,
+                   'runtime_range': runtime_range}
+        if all(value is None for value in filters.values()):
+            return self
+
+        key = tuple(tuple(value) if isinstance(value, list) else value for value in filters.values())
+        with self.__figure_lock:
+            if key in self.__filtered_views:
+                self.__filtered_views.move_to_end(key)
+                return self.__filtered_views[key]
+
+            with self.__profile('ChartCreator.filtered'):
+                view = copy.copy(self)
+                view.__mask = self.__get_filter_index().mask(**filters)
+                view.__running_stats = None  # The view cannot be modified
+                view.__filtered_views = collections.OrderedDict()
+                view.__revenue_rollups, view.__runtime_histograms = {}, {}
+                view.__revenue_rating_points = None
+                view.__specialized_dfs, view.__stats_results, view.__distributor_pages = {}, {}, {}
+                view.__genres_df = view.__dist_df = None  # Calculated when they are needed (see __get_specialized_df)
+                view.__figure_builders = view.__create_figure_builders()
+                view.__figure_deltas = {}
+                view.__figure_cache = collections.OrderedDict()
+                view.__figure_json = {}
+                view.__figure_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'build_time': 0.0}
+                view.__figure_lock = threading.RLock()
+
+            self.__filtered_views[key] = view
+            while len(self.__filtered_views) > _MAX_FILTERED_VIEWS:
+                self.__filtered_views.popitem(last=False)
+            return view
+
+    def memory_report(self):
+        """
+        Obtain the memory used by each column of the dataset in the compact representation of __df (dictionary-encoded
+        genres and distributors and downcast numerical columns, see __create_df) and the memory the same column would
+        use if the file was read directly (each cell of Genres as a list of strings, each distributor as a string and
+        the numerical and date columns as 64-bit values). The size of the Python objects is measured with sys.getsizeof,
+        like DataFrame.memory_usage(deep=True) does.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The bytes of each column (and their total) before and after compacting them, and the ratio between them.
+
+        """
+        after = self.__df.memory_usage(index=False, deep=True)
+        before = {}
+        for column, dtype in self.__df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                # Each movie would hold a pointer to its own list or string (missing values would be NaN)
+                codes = self.__df[column].cat.codes.to_numpy()
+                counts = np.bincount(codes[codes >= 0], minlength=len(dtype.categories))
+                object_sizes = np.array([sys.getsizeof(list(category) if isinstance(category, tuple) else category)
+                                         for category in dtype.categories], dtype=np.int64)
+                before[column] = 8 * len(codes) + int(counts @ object_sizes) + int(np.sum(codes < 0)) * sys.getsizeof(
+                    np.nan)
+            elif pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+                before[column] = 8 * len(self.__df.index)
+            else:  # The rest of the columns (e.g., Film) are not compacted
+                before[column] = after[column]
+
+        report = pd.DataFrame({'Before (bytes)': pd.Series(before), 'After (bytes)': after})
+        report.loc['Total'] = report.sum()
+        report['Ratio'] = (report['Before (bytes)'] / report['After (bytes)']).round(2)
+        return report
+
+    def __apply_changes(self, added, removed, changed_columns):
+        """
+        Update the aggregated data after some movies have been added to (or removed from) __df. The statistics of the
+        genres and distributors are updated by merging the running statistics with those of the changed movies, and only
+        the figures that depend on the changed columns are removed from the figure cache.
+
+        Arguments
+        ---------
+        added : pandas.core.frame.DataFrame
+            The movies that have been added to __df.
+        removed : pandas.core.frame.DataFrame
+            The movies that have been removed from __df.
+        changed_columns : set
+            The columns whose values have changed.
+
+        Returns
+        -------
+        list
+            The names of the figures that have been invalidated.
+
+        """
+        for column, stats in self.__running_stats.items():
+            if changed_columns & {column, 'Revenue'}:
+                stats.remove(removed)
+                stats.add(added)
+        self.__genres_df = self.__add_standard_errors(self.__running_stats['Genres'].to_specialized_df(), ['Revenue'])
+        self.__dist_df = self.__add_standard_errors(self.__running_stats['Distributor'].to_specialized_df(),
+                                                    ['Revenue'])
+        self.__distributor_pages = {}
+        self.__genres_list = self.__genres_df['Genres'].tolist()
+        self.__distributors_list = self.__dist_df['Distributor'].tolist()
+        self.__specialized_dfs = {key: specialized_df for key, specialized_df in self.__specialized_dfs.items()
+                                  if not changed_columns.intersection(key)}
+        self.__stats_results = {key: result for key, result in self.__stats_results.items()
+                                if not changed_columns.intersection(key[:2])}
+        self.__figure_deltas = {}
+        if 'Genres' in changed_columns:
+            self.__genre_index = None  # Rebuilt the next time it is needed
+        self.__filter_index = None
+        self.__genre_set_totals = {}  # A new dictionary, since the views that are being used share the previous one
+        self.__filtered_views.clear()  # The views that are being used keep the previous movies
+        if changed_columns & {'Release Date', 'Revenue'}:
+            self.__revenue_rollups = {}
+        if changed_columns & {'Runtime', 'Revenue'}:
+            self.__runtime_histograms = {}
+        if changed_columns & {'Rating', 'Revenue'}:
+            self.__revenue_rating_points = None
+
+        invalidated_bases = {name for name, columns in self.__figure_columns.items()
+                             if changed_columns.intersection(columns)}
+        invalidated = [name for name in self.__figure_cache if self.figure_delta(name)[0] in invalidated_bases]
+        for name in invalidated:
+            del self.__figure_cache[name]
+            self.__figure_json.pop(name, None)
+        return invalidated
+
+    def append(self, rows):
+        """
+        Add new movies to the dataset without recomputing the statistics of the rest of the movies. The movies whose
+        film already appears on the dataset are ignored (i.e., the first appearance of each film is kept, like when
+        the dataset is read).
+
+        Arguments
+        ---------
+        rows : pandas.core.frame.DataFrame or list
+            The movies (a dataframe or a list of dictionaries, one per movie), with the same columns as the dataset.
+
+        Returns
+        -------
+        list
+            The names of the figures that have been invalidated (they are rebuilt the next time they are accessed).
+
+        """
+        if self.__mask is not None:
+            raise ValueError('The movies of a filtered view cannot be modified (modify the ChartCreator instead)')
+        with self.__figure_lock:
+            rows_df = self.__prepare_rows(rows)
+            rows_df = rows_df[~rows_df['Film'].isin(self.__df['Film'])]
+            if rows_df.empty:
+                return []
+
+            self.__df = self.__concat([self.__df, rows_df])
+            return self.__apply_changes(rows_df, rows_df.iloc[:0], set(self.__df.columns))
+
+    def update(self, rows):
+        """
+        Replace the movies of the dataset that have the same film as the introduced movies (the rest of the introduced
+        movies are added). Only the figures that depend on the columns whose values have changed are invalidated.
+
+        Arguments
+        ---------
+        rows : pandas.core.frame.DataFrame or list
+            The movies (a dataframe or a list of dictionaries, one per movie), with the same columns as the dataset.
+
+        Returns
+        -------
+        list
+            The names of the figures that have been invalidated (they are rebuilt the next time they are accessed).
+
+        """
+        if self.__mask is not None:
+            raise ValueError('The movies of a filtered view cannot be modified (modify the ChartCreator instead)')
+        with self.__figure_lock:
+            rows_df = self.__prepare_rows(rows)
+            is_replaced = self.__df['Film'].isin(rows_df['Film'])
+            removed = self.__df[is_replaced]
+
+            # Compare the old and new values of each film to find out which columns have changed
+            new_values = rows_df.set_index('Film').loc[removed['Film']]
+            old_values = removed.set_index('Film')
+            # The categorical columns of __df are compared with the (object) columns of the new movies as objects
+            changed_columns = {column for column in old_values.columns
+                               if not old_values[column].astype(object).equals(new_values[column].astype(object))}
+            if (~rows_df['Film'].isin(removed['Film'])).any():
+                changed_columns = set(self.__df.columns)  # Some movies are new
+            if not changed_columns:
+                return []
+
+            # The replaced movies keep their position (and index) in __df, and the new ones are added at the end
+            replacements = new_values.reset_index().set_axis(removed.index)[self.__df.columns]
+            added = pd.concat([replacements, rows_df[~rows_df['Film'].isin(removed['Film'])]])
+            self.__df = self.__concat([self.__df[~is_replaced], added]).sort_index()
+            return self.__apply_changes(added, removed, changed_columns)
 
     @property
     def fig1(self):
-        """Getter method to obtain __fig1"""
-        return self.__fig1
+        """Getter method to obtain fig1"""
+        return self.__get_figure('fig1')
 
     @property
     def fig2(self):
-        """Getter method to obtain __fig2"""
-        return self.__fig2
+        """Getter method to obtain fig2"""
+        return self.__get_figure('fig2')
 
     @property
     def fig3(self):
-        """Getter method to obtain __fig3"""
-        return self.__fig3
+        """Getter method to obtain fig3"""
+        return self.__get_figure('fig3')
 
     @property
     def fig4(self):
-        """Getter method to obtain __fig4"""
-        return self.__fig4
+        """Getter method to obtain fig4"""
+        return self.__get_figure('fig4')
 
     @property
     def fig5(self):
-        """Getter method to obtain __fig5"""
-        return self.__fig5
+        """Getter method to obtain fig5"""
+        return self.__get_figure('fig5')
 
     @property
     def fig6(self):
-        """Getter method to obtain __fig6"""
-        return self.__fig6
+        """Getter method to obtain fig6"""
+        return self.__get_figure('fig6')
 
     @property
     def fig7(self):
-        """Getter method to obtain __fig7"""
-        return self.__fig7
+        """Getter method to obtain fig7"""
+        return self.__get_figure('fig7')
 
     @property
     def fig8(self):
-        """Getter method to obtain __fig8"""
-        return self.__fig8
+        """Getter method to obtain fig8"""
+        return self.__get_figure('fig8')
 
     @property
     def fig9(self):
-        """Getter method to obtain __fig9"""
-        return self.__fig9
+        """Getter method to obtain fig9"""
+        return self.__get_figure('fig9')
 
     @property
     def fig10(self):
-        """Getter method to obtain __fig10"""
-        return self.__fig10
+        """Getter method to obtain fig10"""
+        return self.__get_figure('fig10')
 
     @property
     def fig11(self):
-        """Getter method to obtain __fig11"""
-        return self.__fig11
+        """Getter method to obtain fig11"""
+        return self.__get_figure('fig11')
 
     @property
     def fig12(self):
-        """Getter method to obtain __fig12"""
-        return self.__fig12
+        """Getter method to obtain fig12"""
+        return self.__get_figure('fig12')
 
     @property
     def fig13(self):
         """Getter method to obtain fig13"""
-        return self.__fig13
+        return self.__get_figure('fig13')
+
+    @property
+    def fig14(self):
+        """Getter method to obtain fig14"""
+        return self.__get_figure('fig14')
+
+    def build_figures(self, max_workers=None):
+        """
+        Build every base figure that is not in the figure cache (the variants are still built from them when they are
+        accessed). The methods that create the figures only read the aggregated data, so they are independent of each
+        other and are run in parallel on a pool of worker processes. The figures are stored in the same order
+        regardless of the number of workers and of the order in which they finish, so the result is deterministic.
+
+        Arguments
+        ---------
+        max_workers : int
+            The number of worker processes. Default is None, which means the number of processors of the machine. If it
+            is 1, the figures are built in the current process.
+
+        Returns
+        -------
+        list
+            The names of the figures that have been built.
+
+        """
+        with self.__figure_lock:
+            groups = []
+            for builder, names in self.__figure_builders.values():
+                if (builder, names) not in groups and any(name not in self.__figure_cache for name in names):
+                    groups.append((builder, names))
+
+            start = time.perf_counter()
+            if max_workers == 1 or len(groups) < 2:
+                results = [self.__run_builder(builder, names) for builder, names in groups]
+            else:
+                with self.__profile('ChartCreator.build_figures'), \
+                        concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(_build_figure_group, [self] * len(groups),
+                                                [names for _, names in groups]))
+            self.__figure_cache_stats['build_time'] += time.perf_counter() - start
+            self.__figure_cache_stats['misses'] += len(groups)
+
+            built = {}
+            for (_, names), figures in zip(groups, results):
+                built.update(zip(names, figures))
+                self.__store_figures(dict(zip(names, figures)), names[0])
+            return list(built)
+
+    @property
+    def figure_cache_info(self):
+        """Getter method to obtain the hits, misses, evictions, build time and size of the figure cache"""
+        with self.__figure_lock:
+            return dict(self.__figure_cache_stats, size=len(self.__figure_cache), maxsize=self.__figure_cache_size)
+
+
+def _build_figure_group(chart_creator, figure_names):
+    """
+    Build a set of figures of a ChartCreator. This is a module-level function so that it can be sent to the worker
+    processes of ChartCreator.build_figures.
+
+    Arguments
+    ---------
+    chart_creator : ChartCreator
+        The ChartCreator (a copy of it, in a worker process).
+    figure_names : tuple
+        The names of the figures, which are created by the same method (e.g., ('fig7', 'fig8', 'fig9')).
+
+    Returns
+    -------
+    list
+        The figures, in the same order as figure_names.
+
+    """
+    return [getattr(chart_creator, name) for name in figure_names]
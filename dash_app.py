@@ -1,10 +1,20 @@
 import dash
 from dash import html
 from dash import dcc
+from dash import Patch
+from dash import no_update
+from dash import ctx
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from dash.dependencies import Output, Input
-from chart_creator_module import ChartCreator
+from dash.dependencies import Output, Input, State, ClientsideFunction
+import flask
+from dataset_watcher_module import DatasetWatcher
+from profiling_module import StageProfiler, HistogramSink, RequestProfiler
 import collections
+import functools
+
+# The initial bins of the runtime histograms of graph 2 (see parse_runtime_bins)
+DEFAULT_RUNTIME_BINS = 'count_8'
 
 
 def create_graph_card(image_source, description, question, button_url):
@@ -77,158 +87,505 @@ def create_checklist_card(checklist_id, checklist_options):
     return card
 
 
-cc = ChartCreator('prepared_dataset.xlsx')  # Generate all the charts
-
-# Define the layout of the main page of the app
-main_page_layout = html.Div([
-    html.Br(),
-    html.H1(children='Film Dashboard', style={'textAlign': 'center'}),
-    html.Br(),
-    html.Div(id='main_page_content'),
-
-    # This row will contain the 4 image cards
-    dbc.Row([
-        dbc.Col([create_graph_card('assets/graph1.png',
-                                   "Discover how much revenue (overall and average) each main genre made",
-                                   "Which Movie Genres are more Popular?", 'graph-page-1')], width=3),
-        dbc.Col([create_graph_card('assets/graph2.png',
-                                   "Learn about the number of films, overall and average revenue for different lengths",
-                                   "What are the Most Popular Runtimes?", 'graph-page-2')], width=3),
-        dbc.Col([create_graph_card('assets/graph3.png',
-                                   "Understand the impact that COVID-19 has had on film revenue",
-                                   "How much are Top Movies Making?", 'graph-page-3')], width=3),
-        dbc.Col([create_graph_card('assets/graph4.png',
-                                   "Find out how much money distributors made overall and on average",
-                                   "How much are Distributors Making?", 'graph-page-4')], width=3),
-    ]),
-])
-
-# Define the layout of the graph 1 page
-graph1_layout = html.Div([
-    html.H1(children='Which Movie Genres are more Popular?', style={'textAlign': 'center'}),
-    html.Div(),
-    dbc.Row([
-        dbc.Col([
-            dcc.Dropdown(
-                id='dropdown1',
-                options=[{'label': 'Mean Revenue', 'value': 'type1_1'},
-                         {'label': 'Overall Revenue', 'value': 'type1_2'}],
-                value='type1_1',  # Initial value of the dropdown
-                className='dropdown_list',
-                clearable=False  # Do not allow the dropdown value to be None
-            ),
-        ], width={"size": 6, "offset": 3})
-    ]),
-    dbc.Row([
-        dbc.Col([
-            html.Div([html.Br()], style={'height': '25vh'}),
-            create_checklist_card('chck1', [{'label': 'Show Preferred Genres', 'value': 'SPG'},
-                                            {'label': 'Show Error Bars', 'value': 'SEB'}])
-        ], width={"size": 2, "offset": 1}),
-        dbc.Col([dcc.Graph(figure=cc.fig1, id='graph_1', style={'height': '75vh'})], width=8)
-    ]),
-    dbc.Row([
-        dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
-                width={"size": 4, "offset": 8})
+def get_chart_creator():
+    """
+    Obtain the ChartCreator of the latest version of the dataset of the app that is serving the request (see
+    create_app). The same ChartCreator is returned during the whole request, even if the dataset is reloaded in the
+    meantime, so every figure sent in a response comes from the same version of the dataset. If the callback uses the
+    filters of the filter bar (see use_filters), the filtered view of the ChartCreator is returned (see
+    ChartCreator.filtered).
+
+    Returns
+    -------
+    chart_creator_module.ChartCreator
+        The ChartCreator.
+
+    """
+    if 'chart_creator' not in flask.g:
+        chart_creator = flask.current_app.config['DATASET_WATCHER'].current
+        filters = flask.g.get('filters')
+        flask.g.chart_creator = chart_creator.filtered(**filters) if filters else chart_creator
+    return flask.g.chart_creator
+
+
+def use_filters(callback):
+    """
+    Decorator for the callbacks whose last argument is the value of the filters store (see update_filters). The
+    filters are applied to the ChartCreator obtained with get_chart_creator during the request, so the callback displays
+    the films selected on the filter bar, and they are not passed to the callback.
+
+    Arguments
+    ---------
+    callback : callable
+        The callback.
+
+    Returns
+    -------
+    callable
+        The wrapped callback.
+
+    """
+    @functools.wraps(callback)
+    def wrapper(*args):
+        """Store the filters in the context of the request and call the callback with the rest of the arguments"""
+        flask.g.filters = args[-1]
+        return callback(*args[:-1])
+    return wrapper
+
+
+def describe_figure(figure_name):
+    """
+    Obtain the information that identifies a figure of the ChartCreator once it is displayed on a graph: its name, the
+    name of its base figure and the version of the base figure (see ChartCreator.figure_delta and
+    ChartCreator.figure_json).
+
+    Arguments
+    ---------
+    figure_name : str
+        The name of the figure (e.g., 'fig1').
+
+    Returns
+    -------
+    dict
+        The name, base figure and version of the figure.
+
+    """
+    base_name, _ = get_chart_creator().figure_delta(figure_name)
+    return {'figure': figure_name, 'base': base_name, 'version': get_chart_creator().figure_json(base_name)[1]}
+
+
+def create_versioned_graph(figure_name, graph_id):
+    """
+    Create a graph that displays one of the pre-serialized figures of the ChartCreator, together with a store
+    containing the information about the displayed figure (see describe_figure). The store allows the callbacks to
+    avoid sending a figure that is already being displayed, and to only send the changes to its trace when possible.
+
+    Arguments
+    ---------
+    figure_name : str
+        The name of the figure that is initially displayed (e.g., 'fig1').
+    graph_id : str
+        The id of the graph. The id of the store will be graph_id + '_displayed'.
+
+    Returns
+    -------
+    list
+        The graph (dash.dcc.Graph) and the store (dash.dcc.Store).
+
+    """
+    figure = get_chart_creator().figure_json(figure_name)[0]
+    return [dcc.Graph(figure=figure, id=graph_id, style={'height': '75vh'}),
+            dcc.Store(id=f'{graph_id}_displayed', data=describe_figure(figure_name))]
+
+
+def create_trace_patch(delta):
+    """
+    Convert the changes to the trace of a figure (see ChartCreator.figure_delta) into a dash.Patch, so that only the
+    changed properties are sent to the browser.
+
+    Arguments
+    ---------
+    delta : dict
+        The changes to the properties of the trace (a value of None means the property is removed).
+
+    Returns
+    -------
+    dash.Patch
+        The patch that applies the changes to the first trace of the displayed figure.
+
+    """
+    def apply_changes(location, changes):
+        """Apply the (nested) changes to a location of the patch"""
+        for key, value in changes.items():
+            if isinstance(value, dict):
+                apply_changes(location[key], value)
+            elif value is None:
+                del location[key]
+            else:
+                location[key] = value
+
+    patch = Patch()
+    apply_changes(patch['data'][0], delta)
+    return patch
+
+
+def send_figure(figure_name, displayed_figure):
+    """
+    Obtain the output of a callback that displays one of the pre-serialized figures of the ChartCreator. If the figure
+    is already being displayed, nothing is sent. If the displayed figure has the same base figure (e.g., fig1 and fig2),
+    only the changes to its trace are sent. Otherwise, the whole figure is sent (e.g., after the dataset is reloaded,
+    the version of the base figure changes).
+
+    Arguments
+    ---------
+    figure_name : str
+        The name of the figure to be displayed (e.g., 'fig1').
+    displayed_figure : dict
+        The information about the figure that is currently being displayed (see describe_figure).
+
+    Returns
+    -------
+    figure : dict or dash.Patch
+        The serialized figure or the changes to the displayed figure (dash.no_update if it is already displayed).
+    displayed_figure : dict
+        The information about the figure (dash.no_update if it is already displayed).
+
+    """
+    description = describe_figure(figure_name)
+    if description == displayed_figure:
+        return no_update, no_update
+
+    _, delta = get_chart_creator().figure_delta(figure_name)
+    if delta and displayed_figure is not None and all(
+            displayed_figure.get(key) == description[key] for key in ('base', 'version')):
+        return create_trace_patch(delta), description
+    return get_chart_creator().figure_json(figure_name)[0], description
+
+
+def collect_figures(figure_names):
+    """
+    Obtain the data of a store of pre-serialized figures (see create_figures_store). Figures that are variants of a base
+    figure (see ChartCreator.figure_delta) are stored as the changes to the trace of the base figure.
+
+    Arguments
+    ---------
+    figure_names : list
+        The names of the figures that will be included in the store (e.g., ['fig7', 'fig8', 'fig9']).
+
+    Returns
+    -------
+    dict
+        The serialized base figures ('figures') and the base figure and changes of each variant ('deltas').
+
+    """
+    figures, deltas = {}, {}
+    for name in figure_names:
+        base_name, delta = get_chart_creator().figure_delta(name)
+        figures[base_name] = get_chart_creator().figure_json(base_name)[0]
+        if delta:
+            deltas[name] = [base_name, delta]
+    return {'figures': figures, 'deltas': deltas}
+
+
+def create_figures_store(store_id, figure_names):
+    """
+    Create a store containing several pre-serialized figures of the ChartCreator, so that the browser can switch
+    between them with clientside callbacks (i.e., without sending requests to the server). The store is only created
+    when the figures are switched in the browser (see create_app), and its figures are replaced when the filters change
+    (see refilter_graph_1_figures).
+
+    Arguments
+    ---------
+    store_id : str
+        The id of the store.
+    figure_names : list
+        The names of the figures that will be included in the store (e.g., ['fig7', 'fig8', 'fig9']).
+
+    Returns
+    -------
+    list
+        A list containing the store (dash.dcc.Store). It is empty if the figures are switched on the server.
+
+    """
+    if not flask.current_app.config['CLIENTSIDE_SWITCHING']:
+        return []
+    return [dcc.Store(id=store_id, data=collect_figures(figure_names))]
+
+
+def create_filter_bar():
+    """
+    Create the filter bar, which is displayed above every graph page. The films selected on it (release date range,
+    genres, distributors and runtime range) are the ones used by all the graphs (see update_filters). Its options are
+    filled in when a graph page is visited (see populate_filter_bar), so the dataset is not loaded on the main page.
+
+    Returns
+    -------
+    dash.html.Div.Div
+        The filter bar (initially hidden).
+
+    """
+    return html.Div(id='filter_bar', style={'display': 'none'}, children=[
+        html.Br(),
+        dbc.Row([
+            dbc.Col([dcc.DatePickerRange(id='filter_dates', clearable=True, start_date_placeholder_text='First release',
+                                         end_date_placeholder_text='Last release')], width={"size": 3, "offset": 1}),
+            dbc.Col([dcc.Dropdown(id='filter_genres', multi=True, placeholder='All genres',
+                                  className='dropdown_list')], width=2),
+            dbc.Col([dcc.Dropdown(id='filter_distributors', multi=True, placeholder='All distributors',
+                                  className='dropdown_list')], width=3),
+            dbc.Col([html.Label('Runtime (minutes)'),
+                     dcc.RangeSlider(id='filter_runtime', min=0, max=1, step=1, allowCross=False, marks=None,
+                                     tooltip={'placement': 'bottom'})], width=2)
+        ]),
+        html.Br()
     ])
-])
 
-# Define the layout of the graph 2 page
-graph2_layout = html.Div([
-    html.H1(children='What are the Most Popular Runtimes?', style={'textAlign': 'center'}),
-    html.Div(),
-    dbc.Row([
-        dbc.Col([
-            dcc.Dropdown(
-                id='dropdown2',
-                options=[{'label': 'Overall Revenue', 'value': 'type2_1'},
-                         {'label': 'Mean Revenue', 'value': 'type2_2'},
-                         {'label': 'Number of Movies', 'value': 'type2_3'}],
-                value='type2_1',  # Initial value of the dropdown
-                className='dropdown_list',
-                clearable=False  # Do not allow the dropdown value to be None
-            ),
-        ], width={"size": 6, "offset": 3})
-    ]),
-    dbc.Row([
-        dbc.Col([dcc.Graph(figure=cc.fig7, id='graph_2', style={'height': '75vh'})], width={"size": 8, "offset": 2})
-    ]),
-    dbc.Row([
-        dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
-                width={"size": 4, "offset": 8})
+
+def create_main_page_layout():
+    """
+    Create the layout of the main page of the app, which does not need any figure.
+
+    Returns
+    -------
+    dash.html.Div.Div
+        The layout of the main page.
+
+    """
+    return html.Div([
+        html.Br(),
+        html.H1(children='Film Dashboard', style={'textAlign': 'center'}),
+        html.Br(),
+        html.Div(id='main_page_content'),
+
+        # This row will contain the 5 image cards (a fifth of the row each, as 12 columns cannot be split in 5)
+        dbc.Row([
+            dbc.Col([create_graph_card('assets/graph1.png',
+                                       "Discover how much revenue (overall and average) each main genre made",
+                                       "Which Movie Genres are more Popular?", 'graph-page-1')]),
+            dbc.Col([create_graph_card('assets/graph2.png',
+                                       "Learn about the number of films, overall and average revenue for different "
+                                       "lengths",
+                                       "What are the Most Popular Runtimes?", 'graph-page-2')]),
+            dbc.Col([create_graph_card('assets/graph3.png',
+                                       "Understand the impact that COVID-19 has had on film revenue",
+                                       "How much are Top Movies Making?", 'graph-page-3')]),
+            dbc.Col([create_graph_card('assets/graph4.png',
+                                       "Find out how much money distributors made overall and on average",
+                                       "How much are Distributors Making?", 'graph-page-4')]),
+            dbc.Col([create_graph_card('assets/graph5_heatmap.png',
+                                       "Explore how the movies are distributed across ratings and revenues",
+                                       "How much do Ratings Determine Revenue?", 'graph-page-5')]),
+        ], className='row-cols-5'),
     ])
-])
-
-# Define the layout of the graph 3 page
-graph3_layout = html.Div([
-    html.H1(children='How much are Top Movies Making?', style={'textAlign': 'center'}),
-    html.Div(),
-    dbc.Row([
-        dbc.Col([dcc.Graph(figure=cc.fig10, style={'height': '75vh'})], width={"size": 8, "offset": 2})
-    ]),
-    dbc.Row([
-        dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
-                width={"size": 4, "offset": 8})
+
+
+def create_graph1_layout():
+    """
+    Create the layout of the graph 1 page. The figures are only built the first time this page is visited.
+
+    Returns
+    -------
+    dash.html.Div.Div
+        The layout of the graph 1 page.
+
+    """
+    return html.Div([
+        html.H1(children='Which Movie Genres are more Popular?', style={'textAlign': 'center'}),
+        html.Div(),
+        dbc.Row([
+            dbc.Col([
+                dcc.Dropdown(
+                    id='dropdown1',
+                    options=[{'label': 'Mean Revenue', 'value': 'type1_1'},
+                             {'label': 'Overall Revenue', 'value': 'type1_2'}],
+                    value='type1_1',  # Initial value of the dropdown
+                    className='dropdown_list',
+                    clearable=False  # Do not allow the dropdown value to be None
+                ),
+            ], width={"size": 6, "offset": 3})
+        ]),
+        dbc.Row([
+            dbc.Col([
+                html.Div([html.Br()], style={'height': '25vh'}),
+                create_checklist_card('chck1', [{'label': 'Show Preferred Genres', 'value': 'SPG'},
+                                                {'label': 'Show Error Bars', 'value': 'SEB'}])
+            ], width={"size": 2, "offset": 1}),
+            dbc.Col(create_versioned_graph('fig1', 'graph_1'), width=8)
+        ]),
+        *create_figures_store('graph_1_figures', ['fig1', 'fig2', 'fig3', 'fig4', 'fig5', 'fig6']),
+        dbc.Row([
+            dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
+                    width={"size": 4, "offset": 8})
+        ])
+    ])
+
+
+def create_graph2_layout():
+    """
+    Create the layout of the graph 2 page. The figures are only built the first time this page is visited.
+
+    Returns
+    -------
+    dash.html.Div.Div
+        The layout of the graph 2 page.
+
+    """
+    return html.Div([
+        html.H1(children='What are the Most Popular Runtimes?', style={'textAlign': 'center'}),
+        html.Div(),
+        dbc.Row([
+            dbc.Col([
+                dcc.Dropdown(
+                    id='dropdown2',
+                    options=[{'label': 'Overall Revenue', 'value': 'type2_1'},
+                             {'label': 'Mean Revenue', 'value': 'type2_2'},
+                             {'label': 'Number of Movies', 'value': 'type2_3'}],
+                    value='type2_1',  # Initial value of the dropdown
+                    className='dropdown_list',
+                    clearable=False  # Do not allow the dropdown value to be None
+                ),
+            ], width={"size": 4, "offset": 2}),
+            dbc.Col([
+                dcc.Dropdown(
+                    id='bins2',
+                    options=[{'label': f'{number} bins', 'value': f'count_{number}'} for number in (4, 8, 16, 32)]
+                    + [{'label': f'{width} minute bins', 'value': f'width_{width}'} for width in (5, 10, 15, 30)],
+                    value=DEFAULT_RUNTIME_BINS,
+                    className='dropdown_list',
+                    clearable=False
+                ),
+            ], width={"size": 4})
+        ]),
+        dbc.Row([
+            dbc.Col(create_versioned_graph('fig7', 'graph_2'), width={"size": 8, "offset": 2})
+        ]),
+        *create_figures_store('graph_2_figures', ['fig7', 'fig8', 'fig9']),
+        dbc.Row([
+            dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
+                    width={"size": 4, "offset": 8})
+        ])
+    ])
+
+
+def create_graph3_layout():
+    """
+    Create the layout of the graph 3 page, together with a store containing the date range of the displayed area plot
+    (see zoom_graph_3). The figure is only built the first time this page is visited.
+
+    Returns
+    -------
+    dash.html.Div.Div
+        The layout of the graph 3 page.
+
+    """
+    return html.Div([
+        html.H1(children='How much are Top Movies Making?', style={'textAlign': 'center'}),
+        html.Div(),
+        dbc.Row([
+            dbc.Col([dcc.Graph(figure=get_chart_creator().figure_json('fig10')[0], id='graph_3',
+                               style={'height': '75vh'}),
+                     dcc.Store(id='graph_3_range', data=[None, None])],
+                    width={"size": 8, "offset": 2})
+        ]),
+        dbc.Row([
+            dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
+                    width={"size": 4, "offset": 8})
+        ])
     ])
-])
+
+
+def create_graph5_layout():
+    """
+    Create the layout of the graph 5 page, together with a store containing the ranges of the axes of the displayed
+    heatmap (see zoom_graph_5). The figure is only built the first time this page is visited.
+
+    Returns
+    -------
+    dash.html.Div.Div
+        The layout of the graph 5 page.
+
+    """
+    return html.Div([
+        html.H1(children='How much do Ratings Determine Revenue?', style={'textAlign': 'center'}),
+        html.Div(),
+        dbc.Row([
+            dbc.Col([dcc.Graph(figure=get_chart_creator().figure_json('fig14')[0], id='graph_5',
+                               style={'height': '75vh'}),
+                     dcc.Store(id='graph_5_ranges', data={'rating_range': None, 'log_revenue_range': None})],
+                    width={"size": 8, "offset": 2})
+        ]),
+        dbc.Row([
+            dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
+                    width={"size": 4, "offset": 8})
+        ])
+    ])
+
 
 # Depending on the dropdown option selected (type4_1 or type4_2) one of the rows within the graph 4 layout will be
-# different. Hence, define both rows
-type4_1_row = dbc.Row([dbc.Col([dcc.Graph(figure=cc.fig11, style={'height': '75vh'})],
-                               width={"size": 8, "offset": 2})], id='type4_1_layout')
-type4_2_row = dbc.Row([
-    dbc.Col([
-        html.Div([html.Br()], style={'height': '30vh'}),
-        create_checklist_card('chck4', [{'label': 'Show Error Bars', 'value': 'SEB'}])
-    ], width={"size": 2, "offset": 1}),
-    dbc.Col([dcc.Graph(figure=cc.fig13, id='graph_4', style={'height': '75vh'})], width=8)
-], id='type4_2_layout')
-
-# Define the layout of the graph 4 page
-graph4_layout = html.Div([
-    html.H1(children='How much are Distributors Making?', style={'textAlign': 'center'}),
-    html.Div(),
-    dbc.Row([
+# different. Hence, define a function for each row
+def create_type4_1_row():
+    """
+    Create the row of the graph 4 page that contains the treemap (i.e., the Overall Revenue option), together with a
+    store containing the level of the displayed treemap (see drill_down_graph_4).
+
+    Returns
+    -------
+    dash_bootstrap_components._components.Row.Row
+        The created row.
+
+    """
+    return dbc.Row([dbc.Col([dcc.Graph(figure=get_chart_creator().figure_json('fig11')[0], id='graph_4_treemap',
+                                       style={'height': '75vh'}),
+                             dcc.Store(id='graph_4_treemap_level', data=0)],
+                            width={"size": 8, "offset": 2})], id='type4_1_layout')
+
+
+def create_type4_2_row(style=None):
+    """
+    Create the row of the graph 4 page that contains the horizontal bar chart (i.e., the Mean Revenue option).
+
+    Arguments
+    ---------
+    style : dict
+        The style of the row (e.g., {'display': 'none'} to hide it). Default is None.
+
+    Returns
+    -------
+    dash_bootstrap_components._components.Row.Row
+        The created row.
+
+    """
+    return dbc.Row([
         dbc.Col([
-            dcc.Dropdown(
-                id='dropdown4',
-                options=[{'label': 'Overall Revenue', 'value': 'type4_1'},
-                         {'label': 'Mean Revenue', 'value': 'type4_2'}],
-                value='type4_1',  # Initial value of the dropdown
-                className='dropdown_list',
-                clearable=False  # Do not allow the dropdown value to be None
-            ),
-        ], width={"size": 6, "offset": 3})
-    ]),
-    # This is the row that will be modified depending on the value of the dropdown
-    dbc.Row(children=type4_1_row, id='modifiable_row'),
-    dbc.Row([
-        dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
-                width={"size": 4, "offset": 8})
-    ])
-])
+            html.Div([html.Br()], style={'height': '30vh'}),
+            create_checklist_card('chck4', [{'label': 'Show Error Bars', 'value': 'SEB'}])
+        ], width={"size": 2, "offset": 1}),
+        dbc.Col(create_versioned_graph('fig13', 'graph_4'), width=8)
+    ], id='type4_2_layout', style=style)
 
-# Select the style sheet and define the app
-external_stylesheets = [dbc.themes.LUX]
-app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
-# This is necessary because there are callbacks for elements that do not initially appear on the app
-app.config['suppress_callback_exceptions'] = True
+def create_graph4_layout():
+    """
+    Create the layout of the graph 4 page. The figures are only built the first time this page is visited.
 
-# Define the layout of the app
-app.layout = html.Div([
-    dcc.Location(id='url', refresh=False),
-    html.Div(id='page-content', children=[main_page_layout])
-])
+    Returns
+    -------
+    dash.html.Div.Div
+        The layout of the graph 4 page.
+
+    """
+    return html.Div([
+        html.H1(children='How much are Distributors Making?', style={'textAlign': 'center'}),
+        html.Div(),
+        dbc.Row([
+            dbc.Col([
+                dcc.Dropdown(
+                    id='dropdown4',
+                    options=[{'label': 'Overall Revenue', 'value': 'type4_1'},
+                             {'label': 'Mean Revenue', 'value': 'type4_2'}],
+                    value='type4_1',  # Initial value of the dropdown
+                    className='dropdown_list',
+                    clearable=False  # Do not allow the dropdown value to be None
+                ),
+            ], width={"size": 6, "offset": 3})
+        ]),
+        # This is the row that will be modified depending on the value of the dropdown. When the figures are switched
+        # in the browser, both rows are included and the one that is not selected is hidden
+        dbc.Row(children=[create_type4_1_row(), create_type4_2_row({'display': 'none'})]
+                if flask.current_app.config['CLIENTSIDE_SWITCHING'] else create_type4_1_row(), id='modifiable_row'),
+        *create_figures_store('graph_4_figures', ['fig12', 'fig13']),
+        dbc.Row([
+            dbc.Col([dbc.Button("Go back to main page", color='primary', href='main-page')],
+                    width={"size": 4, "offset": 8})
+        ])
+    ])
 
 
-# Define a series of callbacks to allow the user to interact with the page
-@app.callback(Output('page-content', 'children'),
-              Input('url', 'pathname')
-              )
 def navigate_pages(pathname):
     """
-    Navigate through the different pages of the app.
+    Navigate through the different pages of the app. The layout of a page is only created when the page is visited: a
+    change of the filters only replaces the figures of the displayed page (see refilter_graph_1_figures), so the
+    options selected on the page are kept.
 
     Arguments
     ---------
@@ -242,25 +599,89 @@ def navigate_pages(pathname):
 
     """
     if pathname == '/graph-page-1':
-        return graph1_layout
+        return create_graph1_layout()
 
     if pathname == '/graph-page-2':
-        return graph2_layout
+        return create_graph2_layout()
 
     if pathname == '/graph-page-3':
-        return graph3_layout
+        return create_graph3_layout()
 
     if pathname == '/graph-page-4':
-        return graph4_layout
+        return create_graph4_layout()
+
+    if pathname == '/graph-page-5':
+        return create_graph5_layout()
 
     else:
-        return main_page_layout
+        return create_main_page_layout()
 
 
-@app.callback(Output('graph_1', 'figure'),
-              Input('dropdown1', 'value'),
-              Input('chck1', 'value'))
-def modify_graph_1(dropdown_value, selected_chart_options):
+def populate_filter_bar(pathname, runtime_range):
+    """
+    Display the filter bar on the graph pages and fill in its options with the genres, distributors, release dates and
+    runtimes of the dataset. The filter bar is hidden on the main page.
+
+    Arguments
+    ---------
+    pathname : str
+        The path to the page that is displayed.
+    runtime_range : list
+        The selected value of filter_runtime (it is kept if it has already been selected).
+
+    Returns
+    -------
+    tuple
+        The style of filter_bar, the options of filter_genres and filter_distributors, the first and last dates that can
+        be selected on filter_dates and the minimum, maximum and value of filter_runtime (dash.no_update on the main
+        page).
+
+    """
+    if pathname not in ('/graph-page-1', '/graph-page-2', '/graph-page-3', '/graph-page-4', '/graph-page-5'):
+        return ({'display': 'none'},) + (no_update,) * 7
+
+    options = get_chart_creator().filter_options()
+    minimum, maximum = options['runtime_range']
+    return ({'display': 'block'}, options['genres'], options['distributors'], options['first_date'],
+            options['last_date'], minimum, maximum, runtime_range if runtime_range else [minimum, maximum])
+
+
+def update_filters(start_date, end_date, genres, distributors, runtime_range, minimum_runtime, maximum_runtime):
+    """
+    Store the filters selected on the filter bar (the arguments of ChartCreator.filtered). The filters that do not
+    exclude any film (e.g., an empty list of genres or the whole runtime range) are not stored.
+
+    Arguments
+    ---------
+    start_date : str
+        The selected start date of filter_dates.
+    end_date : str
+        The selected end date of filter_dates.
+    genres : list
+        The selected values of filter_genres.
+    distributors : list
+        The selected values of filter_distributors.
+    runtime_range : list
+        The selected value of filter_runtime.
+    minimum_runtime : int
+        The minimum of filter_runtime.
+    maximum_runtime : int
+        The maximum of filter_runtime.
+
+    Returns
+    -------
+    dict
+        The selected filters.
+
+    """
+    filters = {'start_date': start_date, 'end_date': end_date, 'genres': genres or None,
+               'distributors': distributors or None}
+    if runtime_range and list(runtime_range) != [minimum_runtime, maximum_runtime]:
+        filters['runtime_range'] = list(runtime_range)
+    return {key: value for key, value in filters.items() if value is not None}
+
+
+def modify_graph_1(dropdown_value, selected_chart_options, displayed_figure):
     """
     Change graph_1 depending on the dropdown1 and chck1 options selected.
 
@@ -271,11 +692,16 @@ def modify_graph_1(dropdown_value, selected_chart_options):
     selected_chart_options : str
         The selected checklist value. Available options: Show Preferred Genres, Show Error Bars (when Mean Revenue is
         chosen) and Show Error Bars (when Overall Genre Revenue is chosen).
+    displayed_figure : dict
+        The information about the figure that graph_1 is currently displaying (see describe_figure).
 
     Returns
     -------
-    plotly.graph_objs._figure.Figure
-        The figure that corresponds to the chosen dropdown1 and chck1 options.
+    dict or dash.Patch
+        The serialized figure that corresponds to the chosen dropdown1 and chck1 options, or the changes to the
+        displayed figure (dash.no_update if it is already displayed).
+    dict
+        The information about the figure (dash.no_update if it is already displayed).
 
     """
     # If selected_chart_options is None, convert to an empty list to avoid exception 'NoneType' is not iterable
@@ -284,56 +710,244 @@ def modify_graph_1(dropdown_value, selected_chart_options):
 
     # User has chosen Overall Revenue and Show Preferred Genres is not selected
     if dropdown_value == 'type1_2' and 'SPG' not in selected_chart_options:
-        return cc.fig5
+        figure_name = 'fig5'
 
     # User has chosen Overall Revenue and Show Preferred Genres
     elif dropdown_value == 'type1_2':
-        return cc.fig6
+        figure_name = 'fig6'
 
     # User has chosen Mean Revenue and Show Preferred Genres
     elif dropdown_value == 'type1_1' and selected_chart_options == ['SPG']:
-        return cc.fig3
+        figure_name = 'fig3'
 
     # User has chosen Mean Revenue and Show Error Bars
     elif dropdown_value == 'type1_1' and selected_chart_options == ['SEB']:
-        return cc.fig4
+        figure_name = 'fig4'
 
     # User has chosen Mean Revenue, Show Error Bars and Show Preferred Genres
     elif dropdown_value == 'type1_1' and collections.Counter(selected_chart_options) == collections.Counter(
             ['SEB', 'SPG']):
-        return cc.fig2
+        figure_name = 'fig2'
 
     else:  # User has chosen Mean Revenue and no additional checklist options
-        return cc.fig1
+        figure_name = 'fig1'
+
+    return send_figure(figure_name, displayed_figure)
+
+
+def parse_runtime_bins(bins_value):
+    """
+    Convert a value of the bins2 dropdown into the arguments of ChartCreator.runtime_histogram.
+
+    Arguments
+    ---------
+    bins_value : str
+        The selected value of bins2: 'count_<number of bins>' or 'width_<bin width in minutes>'.
+
+    Returns
+    -------
+    dict
+        The number_of_bins or bin_width argument.
+
+    """
+    kind, number = bins_value.split('_')
+    return {'number_of_bins': int(number)} if kind == 'count' else {'bin_width': float(number)}
 
 
-@app.callback(Output('graph_2', 'figure'),
-              [Input('dropdown2', 'value')])
-def modify_graph_2(value):
+def modify_graph_2(value, bins_value, displayed_figure):
     """
-    Change graph 2 depending on the value selected on the dropdown bar.
+    Change graph 2 depending on the values selected on the dropdown bars. When only the bins change, only the data of
+    the bars is sent (the bins are calculated on the server, so its size does not depend on the number of movies).
 
     Arguments
     ---------
     value : str
         The selected value of dropdown2.
+    bins_value : str
+        The selected value of bins2 (see parse_runtime_bins).
+    displayed_figure : dict
+        The information about the figure that graph_2 is currently displaying (see describe_figure), together with its
+        bins.
 
     Returns
     -------
-    plotly.graph_objs._figure.Figure
-        The figure that corresponds to the selected dropdown option.
+    dict or dash.Patch
+        The serialized figure that corresponds to the selected dropdown options, or the changes to the
+        displayed figure (dash.no_update if it is already displayed).
+    dict
+        The information about the figure (dash.no_update if it is already displayed).
 
     """
     if value == 'type2_1':  # User has chosen Overall Revenue
-        return cc.fig7
+        figure_name = 'fig7'
     elif value == 'type2_2':  # User has chosen Mean Revenue
-        return cc.fig8
+        figure_name = 'fig8'
     else:  # User has chosen Number of Movies
-        return cc.fig9
+        figure_name = 'fig9'
+
+    description = dict(describe_figure(figure_name), bins=bins_value)
+    if displayed_figure is not None:
+        displayed_figure = dict(displayed_figure, bins=displayed_figure.get('bins', DEFAULT_RUNTIME_BINS))
+    if description == displayed_figure:
+        return no_update, no_update
+
+    trace = get_chart_creator().runtime_histogram(figure_name, **parse_runtime_bins(bins_value))
+    if displayed_figure is not None and all(displayed_figure[key] == description[key] for key in ('figure', 'version')):
+        return create_trace_patch(trace), description  # Only the bins have changed
+    figure = get_chart_creator().figure_json(figure_name)[0]
+    if bins_value != DEFAULT_RUNTIME_BINS:
+        figure = dict(figure, data=[dict(figure['data'][0], **trace)] + figure['data'][1:])
+    return figure, description
+
+
+def refilter_graph_1_figures():
+    """
+    Replace the figures stored in graph_1_figures with those of the films selected on the filter bar (used when the
+    figures are switched in the browser, which displays the updated figure with the selected options).
+
+    Returns
+    -------
+    dict
+        The data of the store (see collect_figures).
+
+    """
+    return collect_figures(['fig1', 'fig2', 'fig3', 'fig4', 'fig5', 'fig6'])
+
+
+def refilter_graph_4_figures():
+    """
+    Replace the figures stored in graph_4_figures with those of the films selected on the filter bar (used when the
+    figures are switched in the browser).
+
+    Returns
+    -------
+    dict
+        The data of the store (see collect_figures).
+
+    """
+    return collect_figures(['fig12', 'fig13'])
+
+
+def rebin_graph_2_figures(bins_value):
+    """
+    Replace the bins of the runtime histograms stored in graph_2_figures (used when the figures are switched in the
+    browser, which displays the updated figure). When the filters change, the whole figures are replaced (with the
+    selected bins).
+
+    Arguments
+    ---------
+    bins_value : str
+        The selected value of bins2 (see parse_runtime_bins).
+
+    Returns
+    -------
+    dash.Patch or dict
+        The new data of the bars of fig7, fig8 and fig9, or the data of the store if the filters have changed.
+
+    """
+    if ctx.triggered_id == 'filters':
+        data = collect_figures(['fig7', 'fig8', 'fig9'])
+        for figure_name, figure in data['figures'].items():
+            trace = get_chart_creator().runtime_histogram(figure_name, **parse_runtime_bins(bins_value))
+            figure['data'] = [dict(figure['data'][0], **trace)] + figure['data'][1:]
+        return data
+
+    patch = Patch()
+    for figure_name in ('fig7', 'fig8', 'fig9'):
+        trace = patch['figures'][figure_name]['data'][0]
+        for key, value in get_chart_creator().runtime_histogram(figure_name, **parse_runtime_bins(bins_value)).items():
+            trace[key] = value
+    return patch
+
+
+def zoom_graph_3(relayout_data, date_range):
+    """
+    Re-sample the data of graph_3 when the user zooms in or out, so that a narrower date range is displayed with a
+    finer resolution, or when the filters change (the displayed date range is kept). Only the data of the trace is sent
+    (the layout, including the lockdown regions, is kept).
+
+    Arguments
+    ---------
+    relayout_data : dict
+        The changes made to the layout of graph_3 (e.g., {'xaxis.range[0]': ..., 'xaxis.range[1]': ...} after zooming
+        in or {'xaxis.autorange': True} after resetting the axes).
+    date_range : list
+        The first and last dates of the displayed area plot (None means the range is not limited).
+
+    Returns
+    -------
+    dash.Patch
+        The new x and y values of the area plot.
+    list
+        The new date range (dash.no_update if it has not changed).
+
+    """
+    if ctx.triggered_id == 'filters':  # The same range is displayed with the selected films
+        start, end = date_range
+    elif relayout_data is None:
+        raise PreventUpdate
+    elif 'xaxis.range[0]' in relayout_data:  # User has zoomed in or panned
+        start, end = relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']
+    elif 'xaxis.range' in relayout_data:
+        start, end = relayout_data['xaxis.range']
+    elif relayout_data.get('xaxis.autorange'):  # User has reset the axes
+        start, end = None, None
+    else:  # The x range has not changed (e.g., only the y axis has been modified)
+        raise PreventUpdate
+
+    dates, revenue = get_chart_creator().graph3_series(start, end)
+    patch = Patch()
+    patch['data'][0]['x'] = dates
+    patch['data'][0]['y'] = revenue
+    return patch, [start, end] if [start, end] != date_range else no_update
+
+
+def zoom_graph_5(relayout_data, ranges):
+    """
+    Re-bin the data of graph_5 when the user zooms in or out, so that the displayed rating and revenue ranges are
+    always split into the same number of cells (i.e., a narrower range is displayed with a finer resolution), or when
+    the filters change (the displayed ranges are kept). Only the data of the trace is sent, and its size only depends on
+    the number of cells.
+
+    Arguments
+    ---------
+    relayout_data : dict
+        The changes made to the layout of graph_5 (e.g., {'xaxis.range[0]': ..., 'xaxis.range[1]': ...,
+        'yaxis.range[0]': ..., 'yaxis.range[1]': ...} after zooming in or {'xaxis.autorange': True, 'yaxis.autorange':
+        True} after resetting the axes). The range of the revenue axis is the logarithm of the revenue (it is a
+        logarithmic axis).
+    ranges : dict
+        The rating and log(revenue) ranges of the displayed heatmap (None means the range of the movies), which are kept
+        when only one of the axes changes.
+
+    Returns
+    -------
+    dash.Patch
+        The new x, y, z and customdata values of the heatmap.
+    dict
+        The new ranges of the displayed heatmap (dash.no_update if they have not changed).
+
+    """
+    new_ranges = dict(ranges)
+    if ctx.triggered_id != 'filters':
+        if relayout_data is None:
+            raise PreventUpdate
+        for axis, key in (('xaxis', 'rating_range'), ('yaxis', 'log_revenue_range')):
+            if f'{axis}.range[0]' in relayout_data:  # User has zoomed in or panned
+                new_ranges[key] = [relayout_data[f'{axis}.range[0]'], relayout_data[f'{axis}.range[1]']]
+            elif f'{axis}.range' in relayout_data:
+                new_ranges[key] = list(relayout_data[f'{axis}.range'])
+            elif relayout_data.get(f'{axis}.autorange'):  # User has reset the axes
+                new_ranges[key] = None
+        if new_ranges == ranges:  # The ranges have not changed (e.g., the figure has only been resized)
+            raise PreventUpdate
+
+    patch = Patch()
+    for key, value in get_chart_creator().revenue_rating_density(**new_ranges).items():
+        patch['data'][0][key] = value
+    return patch, new_ranges if new_ranges != ranges else no_update
 
 
-@app.callback(Output('chck1', 'options'),
-              Input('dropdown1', 'value'))
 def modify_checklist_1(dropdown_value):
     """
     Modify the options of chck1 depending on the dropdown1 value.
@@ -356,8 +970,6 @@ def modify_checklist_1(dropdown_value):
         return [{'label': 'Show Preferred Genres', 'value': 'SPG'}]
 
 
-@app.callback(Output('modifiable_row', 'children'),
-              Input('dropdown4', 'value'))
 def modify_graph4_layout_row(dropdown_value):
     """
     Change modifiable_row depending on the value of dropdown4 selected.
@@ -374,14 +986,56 @@ def modify_graph4_layout_row(dropdown_value):
 
     """
     if dropdown_value == 'type4_1':  # User has chosen Overall Revenue
-        return type4_1_row
+        return create_type4_1_row()
     else:  # User has chosen Mean Revenue
-        return type4_2_row
+        return create_type4_2_row()
 
 
-@app.callback(Output('graph_4', 'figure'),
-              Input('chck4', 'value'))
-def modify_graph_4(checklist_value):
+def drill_down_graph_4(click_data, level):
+    """
+    Display the distribution companies combined into the "Other Distributors" rectangle of the treemap when the user
+    clicks on it, or go back to the previous level when the user clicks on the root rectangle of a lower level. The
+    companies of each level are only sent when they are requested, so the size of the treemap is bounded. When the
+    filters change, the same level is displayed with the selected films (or the first one, if it no longer exists).
+
+    Arguments
+    ---------
+    click_data : dict
+        The information about the rectangle of graph_4_treemap that has been clicked.
+    level : int
+        The level of the displayed treemap (see ChartCreator.distributor_treemap).
+
+    Returns
+    -------
+    plotly.graph_objs._figure.Figure
+        The treemap of the new level.
+    int
+        The new level.
+
+    """
+    from chart_creator_module import OTHER_DISTRIBUTORS  # Already imported by the ChartCreator
+
+    if ctx.triggered_id == 'filters':
+        if level > 0 and get_chart_creator().distributor_page(level).empty:
+            level = 0
+        return get_chart_creator().distributor_treemap(level), level
+
+    if not click_data or not click_data.get('points'):
+        raise PreventUpdate
+    point = click_data['points'][0]
+    if point.get('label') == OTHER_DISTRIBUTORS and point.get('parent'):  # User has clicked on the bucket
+        level += 1
+    elif not point.get('parent') and level > 0:  # User has clicked on the root rectangle of a lower level
+        level -= 1
+    else:  # A company has been clicked (the treemap zooms into it)
+        raise PreventUpdate
+    if get_chart_creator().distributor_page(level).empty:  # E.g., the dataset has been reloaded
+        raise PreventUpdate
+
+    return get_chart_creator().distributor_treemap(level), level
+
+
+def modify_graph_4(checklist_value, displayed_figure):
     """
     Change graph_4 depending on the selected value of chck4.
 
@@ -389,18 +1043,230 @@ def modify_graph_4(checklist_value):
     ---------
     checklist_value : str
         The chosen value on chck4 (available option: show error bars).
+    displayed_figure : dict
+        The information about the figure that graph_4 is currently displaying (see describe_figure).
 
     Returns
     -------
-    plotly.graph_objs._figure.Figure
-        The figure that corresponds to the selected checklist option.
+    dict or dash.Patch
+        The serialized figure that corresponds to the selected checklist option, or the changes to the
+        displayed figure (dash.no_update if it is already displayed).
+    dict
+        The information about the figure (dash.no_update if it is already displayed).
 
     """
     if checklist_value is None or checklist_value == []:  # User has not selected the Show Error Bars option
-        return cc.fig13
+        figure_name = 'fig13'
     else:  # User has selected the Show Error Bars option
-        return cc.fig12
+        figure_name = 'fig12'
+
+    return send_figure(figure_name, displayed_figure)
+
+
+def create_app(dataset_path='prepared_dataset.xlsx', dataset_cache_dir='.dataset_cache', clientside_switching=True,
+               watch_dataset=True, preload_dataset=False, profiler_sinks=None, profile_capture_dir=None):
+    """
+    Create the Dash app. Creating the app is fast: the dataset is only loaded (and the heavy modules used to create the
+    figures, such as pandas and plotly.express, are only imported) when the first graph page is requested, and the
+    layout of each page is created when the page is visited (see navigate_pages).
+
+    Arguments
+    ---------
+    dataset_path : str
+        The path to the dataset file (prepared_dataset.xlsx). Default is 'prepared_dataset.xlsx'.
+    dataset_cache_dir : str
+        The directory of the binary cache of the cleaned dataset (see ChartCreator). The cache allows other processes to
+        skip parsing the spreadsheet. Default is '.dataset_cache'.
+    clientside_switching : bool
+        If True, all the figures of graphs 1, 2 and 4 are sent to the browser along with the page, and the browser
+        switches between them (see assets/clientside_callbacks.js). Otherwise, each change of option is a request to the
+        server. Default is True.
+    watch_dataset : bool
+        If True, a new ChartCreator is created in the background when the dataset file changes, and it replaces the
+        current one (the pages opened afterwards display the new data). Default is True.
+    preload_dataset : bool
+        If True, the dataset is loaded when creating the app instead of when the first graph page is requested (e.g.,
+        so that the workers forked by gunicorn --preload share it). Default is False.
+    profiler_sinks : list
+        The sinks (see profiling_module) that receive the wall time, CPU time and allocated bytes of each stage of the
+        ChartCreator and of each server-side callback. If one of them is a HistogramSink, its histograms are served on
+        the /metrics endpoint (in the Prometheus text format). Default is None, which means nothing is measured.
+    profile_capture_dir : str
+        If it is introduced, the requests containing the X-Profile header (or the profile query parameter) with the
+        value 'cprofile' or 'tracemalloc' are profiled, and the profiles are written to this directory (see
+        RequestProfiler). Default is None.
+
+    Returns
+    -------
+    dash.Dash
+        The app.
+
+    """
+    profiler = StageProfiler(profiler_sinks) if profiler_sinks else None
+
+    def create_chart_creator():
+        """Create the ChartCreator of the current version of the dataset"""
+        from chart_creator_module import ChartCreator  # Imported when it is first needed (it imports pandas and plotly)
+        return ChartCreator(dataset_path, dataset_cache_dir=dataset_cache_dir, profiler=profiler)
+
+    def instrument(callback):
+        """Measure every call of a server-side callback with the profiler (if there is one)"""
+        return profiler.instrument(f'callback.{callback.__name__}')(callback) if profiler else callback
+
+    # Select the style sheet and define the app
+    external_stylesheets = [dbc.themes.LUX]
+    app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
+
+    # This is necessary because there are callbacks for elements that do not initially appear on the app
+    app.config['suppress_callback_exceptions'] = True
+
+    # The state of the app is stored in the config of its Flask server, so several apps can be created
+    dataset_watcher = DatasetWatcher(dataset_path, create_chart_creator, lazy=not preload_dataset)
+    if watch_dataset:
+        dataset_watcher.start()
+    app.server.config['DATASET_WATCHER'] = dataset_watcher
+    app.server.config['CLIENTSIDE_SWITCHING'] = clientside_switching
+
+    # Expose the histograms of the profiler and allow individual requests to be profiled
+    histogram_sinks = [sink for sink in profiler_sinks or [] if isinstance(sink, HistogramSink)]
+    if histogram_sinks:
+        app.server.add_url_rule('/metrics', 'metrics', lambda: flask.Response(
+            ''.join(sink.render_prometheus() for sink in histogram_sinks), mimetype='text/plain; version=0.0.4'))
+    if profile_capture_dir:
+        RequestProfiler(profile_capture_dir).init_app(app.server)
+
+    # Define the layout of the app (the main page is created again each time the app is loaded)
+    app.layout = lambda: html.Div([
+        dcc.Location(id='url', refresh=False),
+        dcc.Store(id='filters', data={}),
+        create_filter_bar(),
+        html.Div(id='page-content', children=[create_main_page_layout()])
+    ])
+
+    # Define a series of callbacks to allow the user to interact with the page. The callbacks that display data receive
+    # the filters selected on the filter bar as their last argument (see use_filters). The page is only created when the
+    # url changes, and a change of the filters only replaces the figures that are displayed
+    app.callback(Output('page-content', 'children'),
+                 Input('url', 'pathname'),
+                 State('filters', 'data'))(instrument(use_filters(navigate_pages)))
+    app.callback(Output('filter_bar', 'style'),
+                 Output('filter_genres', 'options'),
+                 Output('filter_distributors', 'options'),
+                 Output('filter_dates', 'min_date_allowed'),
+                 Output('filter_dates', 'max_date_allowed'),
+                 Output('filter_runtime', 'min'),
+                 Output('filter_runtime', 'max'),
+                 Output('filter_runtime', 'value'),
+                 Input('url', 'pathname'),
+                 State('filter_runtime', 'value'))(instrument(populate_filter_bar))
+    app.callback(Output('filters', 'data'),
+                 Input('filter_dates', 'start_date'),
+                 Input('filter_dates', 'end_date'),
+                 Input('filter_genres', 'value'),
+                 Input('filter_distributors', 'value'),
+                 Input('filter_runtime', 'value'),
+                 State('filter_runtime', 'min'),
+                 State('filter_runtime', 'max'),
+                 prevent_initial_call=True)(instrument(update_filters))
+    app.callback(Output('graph_3', 'figure'),
+                 Output('graph_3_range', 'data'),
+                 Input('graph_3', 'relayoutData'),
+                 State('graph_3_range', 'data'),
+                 Input('filters', 'data'),
+                 prevent_initial_call=True)(instrument(use_filters(zoom_graph_3)))
+    app.callback(Output('graph_5', 'figure'),
+                 Output('graph_5_ranges', 'data'),
+                 Input('graph_5', 'relayoutData'),
+                 State('graph_5_ranges', 'data'),
+                 Input('filters', 'data'),
+                 prevent_initial_call=True)(instrument(use_filters(zoom_graph_5)))
+
+    app.callback(Output('graph_4_treemap', 'figure'),
+                 Output('graph_4_treemap_level', 'data'),
+                 Input('graph_4_treemap', 'clickData'),
+                 State('graph_4_treemap_level', 'data'),
+                 Input('filters', 'data'),
+                 prevent_initial_call=True)(instrument(use_filters(drill_down_graph_4)))
+
+    # The options of graphs 1, 2 and 4 are switched either in the browser or on the server
+    if clientside_switching:
+        app.clientside_callback(ClientsideFunction(namespace='graphs', function_name='modifyGraph1'),
+                                Output('graph_1', 'figure'),
+                                Input('dropdown1', 'value'),
+                                Input('chck1', 'value'),
+                                Input('graph_1_figures', 'data'))
+        app.callback(Output('graph_1_figures', 'data'),
+                     Input('filters', 'data'),
+                     prevent_initial_call=True)(instrument(use_filters(refilter_graph_1_figures)))
+        app.clientside_callback(ClientsideFunction(namespace='graphs', function_name='modifyGraph2'),
+                                Output('graph_2', 'figure'),
+                                Input('dropdown2', 'value'),
+                                Input('graph_2_figures', 'data'))
+        app.callback(Output('graph_2_figures', 'data'),
+                     Input('bins2', 'value'),
+                     Input('filters', 'data'),
+                     prevent_initial_call=True)(instrument(use_filters(rebin_graph_2_figures)))
+        app.clientside_callback(ClientsideFunction(namespace='graphs', function_name='modifyChecklist1'),
+                                Output('chck1', 'options'),
+                                Input('dropdown1', 'value'))
+        app.clientside_callback(ClientsideFunction(namespace='graphs', function_name='modifyGraph4LayoutRow'),
+                                Output('type4_1_layout', 'style'),
+                                Output('type4_2_layout', 'style'),
+                                Input('dropdown4', 'value'))
+        app.clientside_callback(ClientsideFunction(namespace='graphs', function_name='modifyGraph4'),
+                                Output('graph_4', 'figure'),
+                                Input('chck4', 'value'),
+                                Input('graph_4_figures', 'data'))
+        app.callback(Output('graph_4_figures', 'data'),
+                     Input('filters', 'data'),
+                     prevent_initial_call=True)(instrument(use_filters(refilter_graph_4_figures)))
+    else:
+        app.callback(Output('graph_1', 'figure'),
+                     Output('graph_1_displayed', 'data'),
+                     Input('dropdown1', 'value'),
+                     Input('chck1', 'value'),
+                     State('graph_1_displayed', 'data'),
+                     Input('filters', 'data'))(instrument(use_filters(modify_graph_1)))
+        app.callback(Output('graph_2', 'figure'),
+                     Output('graph_2_displayed', 'data'),
+                     Input('dropdown2', 'value'),
+                     Input('bins2', 'value'),
+                     State('graph_2_displayed', 'data'),
+                     Input('filters', 'data'))(instrument(use_filters(modify_graph_2)))
+        app.callback(Output('chck1', 'options'),
+                     Input('dropdown1', 'value'))(instrument(modify_checklist_1))
+        app.callback(Output('modifiable_row', 'children'),
+                     Input('dropdown4', 'value'),
+                     State('filters', 'data'))(instrument(use_filters(modify_graph4_layout_row)))
+        app.callback(Output('graph_4', 'figure'),
+                     Output('graph_4_displayed', 'data'),
+                     Input('chck4', 'value'),
+                     State('graph_4_displayed', 'data'),
+                     Input('filters', 'data'))(instrument(use_filters(modify_graph_4)))
+
+    return app
+
+
+def create_server(**kwargs):
+    """
+    Create the WSGI application of the app for production servers, e.g., gunicorn "dash_app:create_server()". With
+    gunicorn --preload "dash_app:create_server(preload_dataset=True)", the ChartCreator is created once in the master
+    process and shared by the forked workers: the columns of the dataset are memory-mapped from the dataset cache and
+    the distributors are dictionary-encoded, so they are not copied by each worker.
+
+    Arguments
+    ---------
+    **kwargs
+        The arguments of create_app.
+
+    Returns
+    -------
+    flask.app.Flask
+        The Flask server of the app.
+
+    """
+    return create_app(**kwargs).server
 
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    create_app().run(debug=True)
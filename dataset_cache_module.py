@@ -0,0 +1,232 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from genres_parser_module import decode_genres
+
+# The version of the layout of the arrays. Caches written with a different layout are considered invalid
+_FORMAT_VERSION = 3
+
+
+class DatasetCache:
+    """
+    A binary columnar cache for the cleaned dataframe that ChartCreator obtains from prepared_dataset.xlsx. Each column
+    is stored as an uncompressed .npy file, so that it can be loaded memory-mapped instead of parsing the spreadsheet
+    again. Columns containing lists (e.g., Genres) are stored as an array of integer codes, an array with the distinct
+    elements and an offsets array (the elements of row i are codes[offsets[i]:offsets[i + 1]]). Categorical columns
+    (e.g., Distributor) are stored as an array of integer codes and an array with the categories. Dictionary-encoded
+    columns of lists (e.g., Genres, see genres_parser_module.encode_genre_sets) are stored as the array of codes of
+    each row, and their categories (i.e., the distinct lists) as a column of lists.
+
+    Since the arrays are memory-mapped, the processes that load the same version of the cache (e.g., the workers of a
+    web server) share a single copy of the numerical columns and of the codes of the categorical columns in the page
+    cache of the operating system, instead of holding one copy each.
+
+    Arguments
+    ---------
+    source_path : str
+        The path to the file the cached dataframe was obtained from (prepared_dataset.xlsx).
+    cache_dir : str
+        The directory in which the cache will be stored. It is created if it does not exist.
+
+    Attributes
+    ----------
+    __source_path : str
+        The source_path introduced when creating the class.
+    __cache_dir : str
+        The cache_dir introduced when creating the class.
+    __metadata_path : str
+        The path to the metadata file. It contains the modification time, size and SHA-256 hash of the source file and
+        the name of the directory holding the arrays that were generated from it.
+
+    Methods
+    -------
+    __source_signature
+        Obtain the modification time and size of the source file.
+    __hash_source
+        Calculate the SHA-256 hash of the source file.
+    __read_metadata
+        Read the metadata file (None if it does not exist or cannot be read).
+    __write_metadata
+        Atomically replace the metadata file.
+    load
+        Load the cached dataframe if the cache is still valid for the source file.
+    store
+        Write a dataframe to the cache.
+
+    """
+
+    def __init__(self, source_path, cache_dir):
+        """Create an instance of the class"""
+        self.__source_path = source_path
+        self.__cache_dir = cache_dir
+        self.__metadata_path = os.path.join(cache_dir, 'metadata.json')
+
+    def __source_signature(self):
+        """Obtain the modification time (in nanoseconds) and the size (in bytes) of the source file"""
+        stat = os.stat(self.__source_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def __hash_source(self):
+        """Calculate the SHA-256 hash of the source file"""
+        sha256 = hashlib.sha256()
+        with open(self.__source_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+
+    def __read_metadata(self):
+        """Read the metadata file. None is returned if the file does not exist or is not valid"""
+        try:
+            with open(self.__metadata_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def __write_metadata(self, metadata):
+        """
+        Replace the metadata file. The file is written to a temporary location first and then renamed, so that other
+        processes never read a half-written file.
+
+        Arguments
+        ---------
+        metadata : dict
+            The metadata that will be written.
+
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.__cache_dir, suffix='.json')
+        with os.fdopen(file_descriptor, 'w') as file:
+            json.dump(metadata, file)
+        os.replace(temporary_path, self.__metadata_path)
+
+    def load(self):
+        """
+        Load the cached dataframe. The cache is valid if the modification time and size of the source file have not
+        changed. Otherwise, the SHA-256 hash of the source file is compared with the one of the cached file (this
+        avoids rebuilding the cache when the file has been touched or copied without changing its content).
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The cached dataframe (its numerical columns are memory-mapped). None is returned if the cache is missing or
+            is no longer valid.
+
+        """
+        metadata = self.__read_metadata()
+        if metadata is None or metadata.get('version') != _FORMAT_VERSION:
+            return None
+
+        mtime, size = self.__source_signature()
+        if [mtime, size] != [metadata['mtime'], metadata['size']]:
+            if size != metadata['size'] or self.__hash_source() != metadata['sha256']:
+                return None
+            self.__write_metadata(dict(metadata, mtime=mtime))  # Same content, so the cache remains valid
+
+        arrays_dir = os.path.join(self.__cache_dir, metadata['arrays_dir'])
+
+        def load_array(name):
+            """Load one of the arrays of the cache (memory-mapped)"""
+            return np.load(os.path.join(arrays_dir, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+
+        try:
+            index = pd.Index(load_array('index'))
+            data = {}
+            for i, (column, kind) in enumerate(metadata['columns']):
+                if kind == 'genre_sets':  # The codes are not copied, only the distinct lists are decoded
+                    genre_sets = decode_genres(load_array(f'{i}_set_codes'), load_array(f'{i}_set_offsets'),
+                                               load_array(f'{i}_categories').tolist())
+                    values = pd.Categorical.from_codes(load_array(f'{i}_codes'), categories=pd.Index(
+                        [tuple(genres) for genres in genre_sets], dtype=object, tupleize_cols=False))
+                    data[column] = pd.Series(values, index=index, copy=False)
+                elif kind == 'list':
+                    values = decode_genres(load_array(f'{i}_codes'), load_array(f'{i}_offsets'),
+                                           load_array(f'{i}_categories').tolist())
+                    data[column] = pd.Series(values, index=index, dtype=object)
+                elif kind == 'category':  # The codes are not copied either
+                    values = pd.Categorical.from_codes(load_array(f'{i}_codes'),
+                                                       categories=load_array(f'{i}_categories').tolist())
+                    data[column] = pd.Series(values, index=index, copy=False)
+                elif kind == 'str':
+                    data[column] = pd.Series(load_array(str(i)).tolist(), index=index, dtype=object)
+                else:  # The array is not copied, so the column remains memory-mapped
+                    data[column] = pd.Series(load_array(str(i)), index=index, copy=False)
+        except (OSError, ValueError):  # The arrays have been removed or are corrupted
+            return None
+
+        return pd.DataFrame(data, copy=False)
+
+    def store(self, df):
+        """
+        Write a dataframe to the cache, replacing any previous version.
+
+        Arguments
+        ---------
+        df : pandas.core.frame.DataFrame
+            The cleaned dataframe obtained from the source file.
+
+        """
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        mtime, size = self.__source_signature()
+        sha256 = self.__hash_source()
+
+        # Write the arrays to a temporary directory first, so that other processes never see a half-written cache
+        temporary_dir = tempfile.mkdtemp(dir=self.__cache_dir)
+        columns = []
+        for i, column in enumerate(df.columns):
+            series = df[column]
+            if series.dtype == object and len(series.index) and isinstance(series.iloc[0], list):
+                lengths = series.map(len).to_numpy()
+                codes, categories = pd.factorize(pd.Series([element for row in series for element in row],
+                                                           dtype=object))
+                offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+                np.cumsum(lengths, out=offsets[1:])
+                np.save(os.path.join(temporary_dir, f'{i}_codes.npy'), codes.astype(np.int32))
+                np.save(os.path.join(temporary_dir, f'{i}_offsets.npy'), offsets)
+                np.save(os.path.join(temporary_dir, f'{i}_categories.npy'), np.array(categories, dtype=str))
+                columns.append([column, 'list'])
+            elif isinstance(series.dtype, pd.CategoricalDtype) and len(series.cat.categories) and isinstance(
+                    series.cat.categories[0], tuple):
+                genre_sets = series.cat.categories
+                lengths = np.fromiter((len(genres) for genres in genre_sets), dtype=np.int64, count=len(genre_sets))
+                codes, categories = pd.factorize(pd.Series([genre for genres in genre_sets for genre in genres],
+                                                           dtype=object))
+                offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+                np.cumsum(lengths, out=offsets[1:])
+                np.save(os.path.join(temporary_dir, f'{i}_codes.npy'), series.cat.codes.to_numpy())
+                np.save(os.path.join(temporary_dir, f'{i}_set_codes.npy'), codes.astype(np.int32))
+                np.save(os.path.join(temporary_dir, f'{i}_set_offsets.npy'), offsets)
+                np.save(os.path.join(temporary_dir, f'{i}_categories.npy'), np.array(categories, dtype=str))
+                columns.append([column, 'genre_sets'])
+            elif isinstance(series.dtype, pd.CategoricalDtype):
+                np.save(os.path.join(temporary_dir, f'{i}_codes.npy'), series.cat.codes.to_numpy())
+                np.save(os.path.join(temporary_dir, f'{i}_categories.npy'),
+                        np.array(series.cat.categories.astype(str), dtype=str))
+                columns.append([column, 'category'])
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_dtype(series):
+                np.save(os.path.join(temporary_dir, f'{i}.npy'), series.to_numpy())
+                columns.append([column, 'array'])
+            else:  # Strings (and objects that can be represented as strings, e.g., the film '1917')
+                np.save(os.path.join(temporary_dir, f'{i}.npy'), series.astype(str).to_numpy(dtype=str))
+                columns.append([column, 'str'])
+        np.save(os.path.join(temporary_dir, 'index.npy'), df.index.to_numpy())
+
+        # Each version of the arrays is stored in a directory named after the hash of the source file and the layout
+        # of the arrays, so that a directory written with a previous layout is never mistaken for the current one
+        arrays_dir = f'{sha256}-v{_FORMAT_VERSION}'
+        final_dir = os.path.join(self.__cache_dir, arrays_dir)
+        try:
+            os.rename(temporary_dir, final_dir)
+        except OSError:  # Another process has already written the same version
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+        self.__write_metadata({'version': _FORMAT_VERSION, 'mtime': mtime, 'size': size, 'sha256': sha256,
+                               'arrays_dir': arrays_dir, 'columns': columns})
+
+        # Remove the arrays of previous versions (processes that have them memory-mapped keep their own copy)
+        for entry in os.listdir(self.__cache_dir):
+            path = os.path.join(self.__cache_dir, entry)
+            if entry != arrays_dir and not entry.startswith('tmp') and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
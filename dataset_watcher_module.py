@@ -0,0 +1,174 @@
+import os
+import threading
+import traceback
+
+
+class DatasetWatcher:
+    """
+    Keep an object created from a dataset file (e.g., a ChartCreator) up to date with the file. A background thread
+    polls the modification time and size of the file and, when they change, creates a new object in that thread. The
+    new object replaces the current one in a single assignment, so every caller obtains either the old object or the
+    new one (never a partially updated object), and the requests being served when the file changes are not
+    interrupted.
+
+    Arguments
+    ---------
+    dataset_path : str
+        The path to the dataset file that is watched.
+    factory : callable
+        A function without arguments that creates the object from the dataset file.
+    poll_interval : float
+        The number of seconds between two checks of the file. Default is 2.
+    lazy : bool
+        If True, the first object is created the first time it is requested (see current) instead of when creating the
+        class. Default is False.
+
+    Attributes
+    ----------
+    __dataset_path : str
+        The dataset_path introduced when creating the class.
+    __factory : callable
+        The factory introduced when creating the class.
+    __poll_interval : float
+        The poll_interval introduced when creating the class.
+    __current : object
+        The object created from the latest version of the file that could be loaded (None if it has not been created
+        yet).
+    __load_lock : threading.Lock
+        A lock that prevents several threads from creating the first object at the same time.
+    __signature : tuple
+        The modification time and size of the file when __current was created.
+    __stop_event : threading.Event
+        An event that is set to stop the background thread.
+    __thread : threading.Thread
+        The background thread (None if it has not been started).
+    __fork_hook_registered : bool
+        Whether __after_fork has been registered to be called in the child processes.
+
+    Methods
+    -------
+    __file_signature
+        Obtain the modification time and size of the dataset file.
+    __load
+        Create the first object.
+    current
+        Getter method to obtain the object created from the latest version of the file.
+    reload
+        Create a new object if the file has changed and replace the current one.
+    __watch
+        Check the file periodically until the watcher is stopped.
+    __after_fork
+        Restart the background thread in a child process (e.g., a worker of a pre-forking web server).
+    start
+        Start the background thread.
+    stop
+        Stop the background thread.
+
+    """
+
+    def __init__(self, dataset_path, factory, poll_interval=2.0, lazy=False):
+        """Create an instance of the class. Unless lazy is True, the first object is created here (i.e., in the calling
+        thread)"""
+        self.__dataset_path = dataset_path
+        self.__factory = factory
+        self.__poll_interval = poll_interval
+        self.__current, self.__signature = None, None
+        self.__load_lock = threading.Lock()
+        if not lazy:
+            self.__load()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__fork_hook_registered = False
+
+    def __file_signature(self):
+        """
+        Obtain the modification time (in nanoseconds) and size of the dataset file.
+
+        Returns
+        -------
+        tuple
+            The modification time and size (None if the file does not exist, e.g., while it is being replaced).
+
+        """
+        try:
+            stat = os.stat(self.__dataset_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def __load(self):
+        """Create the first object from the dataset file"""
+        signature = self.__file_signature()
+        self.__current, self.__signature = self.__factory(), signature
+
+    @property
+    def current(self):
+        """Getter method to obtain the object created from the latest version of the file (it is created if it does not
+        exist yet)"""
+        if self.__current is None:
+            with self.__load_lock:
+                if self.__current is None:  # Another thread may have created it while waiting for the lock
+                    self.__load()
+        return self.__current
+
+    def reload(self):
+        """
+        Create a new object if the file has changed since the current object was created, and replace the current
+        object with it. The file is only loaded once its modification time and size are the same in two consecutive
+        checks, so a file that is still being written is not loaded. If the object cannot be created (e.g., the file is
+        corrupted), the current object is kept and the file is tried again the next time it changes.
+
+        Returns
+        -------
+        bool
+            True if the current object has been replaced.
+
+        """
+        signature = self.__file_signature()
+        if self.__current is None or signature is None or signature == self.__signature:
+            return False
+
+        self.__stop_event.wait(min(self.__poll_interval, 1.0))
+        if self.__file_signature() != signature:  # The file is still being written
+            return False
+
+        try:
+            new_object = self.__factory()
+        except Exception:
+            traceback.print_exc()
+            self.__signature = signature
+            return False
+
+        self.__current, self.__signature = new_object, signature
+        return True
+
+    def __watch(self):
+        """Check the file every poll_interval seconds until the watcher is stopped"""
+        while not self.__stop_event.wait(self.__poll_interval):
+            self.reload()
+
+    def __after_fork(self):
+        """Restart the background thread in a child process, since threads are not copied when a process is forked
+        (e.g., by gunicorn --preload, after the master process has created the first object)"""
+        was_running = self.__thread is not None and not self.__stop_event.is_set()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        if was_running:
+            self.start()
+
+    def start(self):
+        """Start the background thread (a daemon thread, so it does not prevent the process from exiting)"""
+        if not self.__fork_hook_registered:
+            os.register_at_fork(after_in_child=self.__after_fork)
+            self.__fork_hook_registered = True
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__stop_event.clear()
+            self.__thread = threading.Thread(target=self.__watch, name='dataset-watcher', daemon=True)
+            self.__thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for it to finish"""
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
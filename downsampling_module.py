@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def lttb_indices(x, y, number_of_points):
+    """
+    Select the points of a series that best preserve its visual shape with the Largest-Triangle-Three-Buckets (LTTB)
+    algorithm. The first and last points are always kept. The rest of the series is split into number_of_points - 2
+    buckets and, from each bucket, the point that forms the largest triangle with the point selected in the previous
+    bucket and the average point of the next bucket is kept.
+
+    Arguments
+    ---------
+    x : numpy.ndarray
+        The x values of the series (in ascending order). Dates must be converted to numbers (e.g., int64) beforehand.
+    y : numpy.ndarray
+        The y values of the series.
+    number_of_points : int
+        The number of points to keep.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (ascending) positions of the selected points. All the positions are returned if the series does not have
+        more than number_of_points points.
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if number_of_points >= n or number_of_points < 3:
+        return np.arange(n)
+
+    # Bucket i contains the points edges[i]:edges[i + 1]. The first and last points are not in any bucket
+    edges = np.linspace(1, n - 1, number_of_points - 1).astype(np.int64)
+    selected = np.empty(number_of_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0  # The point selected in the previous bucket
+    for i in range(number_of_points - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average point of the next bucket (the last point for the last bucket)
+        next_start, next_end = (end, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        # Twice the area of the triangle formed by each point of the bucket (the factor does not change the maximum)
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """
+    Precomputed indexes of the columns of the dataset that can be filtered (release date, genres, distributor and
+    runtime), so that any combination of filters is resolved into a boolean mask of the films with vectorized bitwise
+    operations. Each genre has a bitmap (a boolean array packed into bits with np.packbits, i.e., one bit per film), so
+    selecting several genres is a bitwise OR of their bitmaps. The distributors are dictionary-encoded, so selecting
+    several distributors is a lookup of the code of each film in a boolean table. The date and runtime ranges are
+    comparisons of contiguous arrays. The masks of the different filters are combined with a bitwise AND.
+
+    Arguments
+    ---------
+    genre_bitmaps : numpy.ndarray
+        The packed bitmap of each genre (one row per genre).
+    genres : list
+        The genre of each row of genre_bitmaps.
+    distributor_codes : numpy.ndarray
+        The code of the distributor of each film.
+    distributors : list
+        The distributors, where distributors[code] is the distributor represented by code.
+    release_days : numpy.ndarray
+        The release date of each film, as the number of days since 1970-01-01.
+    runtime : numpy.ndarray
+        The runtime of each film.
+
+    Attributes
+    ----------
+    __genre_bitmaps : numpy.ndarray
+        The genre_bitmaps introduced when creating the class.
+    __genre_positions : dict
+        A dictionary that maps each genre to its row in __genre_bitmaps.
+    __distributor_codes : numpy.ndarray
+        The distributor_codes introduced when creating the class.
+    __distributor_positions : dict
+        A dictionary that maps each distributor to its code.
+    __release_days : numpy.ndarray
+        The release_days introduced when creating the class.
+    __runtime : numpy.ndarray
+        The runtime introduced when creating the class.
+
+    Methods
+    -------
+    from_df
+        Create the index from a dataframe and its genre index.
+    number_of_films
+        Getter method to obtain the number of films.
+    genres_mask
+        Obtain the packed bitmap of the films that contain any of a list of genres.
+    mask
+        Obtain a boolean mask of the films that satisfy a combination of filters.
+
+    """
+
+    def __init__(self, genre_bitmaps, genres, distributor_codes, distributors, release_days, runtime):
+        """Create an instance of the class"""
+        self.__genre_bitmaps = genre_bitmaps
+        self.__genre_positions = {genre: position for position, genre in enumerate(genres)}
+        self.__distributor_codes = np.asarray(distributor_codes)
+        self.__distributor_positions = {distributor: code for code, distributor in enumerate(distributors)}
+        self.__release_days = np.asarray(release_days, dtype=np.int64)
+        self.__runtime = np.asarray(runtime)
+
+    @classmethod
+    def from_df(cls, df, genre_index):
+        """
+        Create the index from a dataframe with the columns of prepared_dataset.xlsx and the genre index of its Genres
+        column.
+
+        Arguments
+        ---------
+        df : pandas.core.frame.DataFrame
+            The dataframe (the Distributor column is categorical).
+        genre_index : genre_index_module.GenreIndex
+            The genre index of df['Genres'].
+
+        Returns
+        -------
+        FilterIndex
+            The created index.
+
+        """
+        genres = genre_index.genres
+        genre_bitmaps = np.stack([np.packbits(genre_index.mask([genre])) for genre in genres]) if genres \
+            else np.zeros((0, (len(df.index) + 7) // 8), dtype=np.uint8)
+        distributors = df['Distributor'].astype('category')
+        release_days = df['Release Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        return cls(genre_bitmaps, genres, distributors.cat.codes.to_numpy(), distributors.cat.categories.tolist(),
+                   release_days, df['Runtime'].to_numpy())
+
+    @property
+    def number_of_films(self):
+        """Getter method to obtain the number of films"""
+        return len(self.__runtime)
+
+    def genres_mask(self, genres):
+        """
+        Obtain the packed bitmap of the films that contain at least one of the genres (the bitwise OR of their bitmaps).
+
+        Arguments
+        ---------
+        genres : list
+            The genres. Genres that do not appear on the index are ignored.
+
+        Returns
+        -------
+        numpy.ndarray
+            The packed bitmap (see np.unpackbits).
+
+        """
+        positions = [self.__genre_positions[genre] for genre in genres if genre in self.__genre_positions]
+        if not positions:
+            return np.zeros(self.__genre_bitmaps.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.__genre_bitmaps[positions], axis=0)
+
+    def mask(self, start_date=None, end_date=None, genres=None, distributors=None, runtime_range=None):
+        """
+        Obtain a boolean mask of the films that satisfy every introduced filter.
+
+        Arguments
+        ---------
+        start_date : str
+            The first release date (e.g., '2020-03-23'). Default is None, which means there is no lower limit.
+        end_date : str
+            The last release date. Default is None, which means there is no upper limit.
+        genres : list
+            The films must contain at least one of these genres. Default is None (no genre filter).
+        distributors : list
+            The films must be distributed by one of these companies. Default is None (no distributor filter).
+        runtime_range : list
+            The minimum and maximum runtime, in minutes (both included). Default is None (no runtime filter).
+
+        Returns
+        -------
+        numpy.ndarray
+            A boolean array containing True for the films that satisfy the filters (None if no filter was introduced).
+
+        """
+        masks = []
+        if genres is not None:
+            masks.append(np.unpackbits(self.genres_mask(genres), count=self.number_of_films).view(bool))
+        if distributors is not None:
+            selected = np.zeros(len(self.__distributor_positions) + 1, dtype=bool)  # The last one is a missing value
+            selected[[self.__distributor_positions[distributor] for distributor in distributors
+                      if distributor in self.__distributor_positions]] = True
+            masks.append(selected[self.__distributor_codes])
+        if start_date is not None:
+            masks.append(self.__release_days >= pd.Timestamp(start_date).to_datetime64().astype('datetime64[D]')
+                         .astype(np.int64))
+        if end_date is not None:
+            masks.append(self.__release_days <= pd.Timestamp(end_date).to_datetime64().astype('datetime64[D]')
+                         .astype(np.int64))
+        if runtime_range is not None:
+            minimum, maximum = runtime_range
+            masks.append((self.__runtime >= minimum) & (self.__runtime <= maximum))
+
+        if not masks:
+            return None
+        output = masks[0].copy()
+        for mask in masks[1:]:
+            output &= mask
+        return output
@@ -0,0 +1,488 @@
+import numpy as np
+import pandas as pd
+
+
+class GenreIndex:
+    """
+    A sparse films x genres membership matrix. Entry (i, j) is True if the i-th film contains the j-th genre. The
+    matrix is stored both by rows (CSR, the genres of each film) and by columns (CSC, the films of each genre), so that
+    the per-genre statistics are sparse matrix-vector products (i.e., O(number of film-genre pairs)) and genre filters
+    are mask lookups.
+
+    Arguments
+    ---------
+    codes : numpy.ndarray
+        The code of each genre of each film (see genres_parser_module.parse_genres). The genres of the i-th film are
+        codes[offsets[i]:offsets[i + 1]].
+    offsets : numpy.ndarray
+        The position in codes where the genres of each film start.
+    categories : list
+        The distinct genres, where categories[code] is the genre represented by code.
+    genre_sets : tuple
+        The distinct lists of genres of the films (see from_genre_sets): the code of the list of each film, the codes of
+        the genres of every list and the position where the genres of each list start. Default is None, which means
+        the lists are not known.
+
+    Attributes
+    ----------
+    __categories : list
+        The categories introduced when creating the class (i.e., the columns of the matrix).
+    __category_codes : dict
+        A dictionary that maps each genre to its code.
+    __number_of_films : int
+        The number of rows of the matrix.
+    __genre_rows : numpy.ndarray
+        The row (film) of each non-zero entry, sorted by genre (CSC indices).
+    __genre_offsets : numpy.ndarray
+        The position in __genre_rows where the films of each genre start (CSC pointers).
+    __genre_sets : tuple
+        The genre_sets introduced when creating the class (None if they were not introduced).
+
+    Methods
+    -------
+    from_lists
+        Create the index from a column containing lists of genres.
+    from_genre_sets
+        Create the index from a dictionary-encoded column of lists of genres.
+    __reduce_segments
+        Add up the values of consecutive segments of an array.
+    __reduce
+        Add up a value for each non-zero entry of the matrix, per genre.
+    set_statistics
+        Obtain the number of films and the summation and sum of squared deviations of a numerical column for each
+        distinct list of genres.
+    __combine_set_statistics
+        Combine the statistics of the distinct lists of genres into the statistics of each genre.
+    genres
+        Getter method to obtain the genres (the columns of the matrix).
+    counts
+        Obtain the number of films that contain each genre.
+    sums
+        Obtain the summation of a numerical column for each genre.
+    means
+        Obtain the mean of a numerical column for each genre.
+    stds
+        Obtain the (population) standard deviation of a numerical column for each genre.
+    statistics
+        Obtain the number of films and the summation and standard deviation of a numerical column for each genre at
+        once.
+    rows
+        Obtain the films that contain a genre.
+    mask
+        Obtain a boolean mask of the films that contain any of a list of genres.
+    to_dense
+        Obtain the membership matrix as a dense boolean array.
+
+    """
+
+    def __init__(self, codes, offsets, categories, genre_sets=None):
+        """Create an instance of the class"""
+        codes = np.asarray(codes, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        self.__categories = list(categories)
+        self.__category_codes = {genre: code for code, genre in enumerate(self.__categories)}
+        self.__number_of_films = len(offsets) - 1
+
+        # The row of each non-zero entry (CSR -> COO) and its reordering by genre (COO -> CSC)
+        film_rows = np.repeat(np.arange(self.__number_of_films, dtype=np.int64), np.diff(offsets))
+        order = np.argsort(codes, kind='stable')  # The films of each genre keep their original order
+        self.__genre_rows = film_rows[order]
+        self.__genre_offsets = np.zeros(len(self.__categories) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(self.__categories)), out=self.__genre_offsets[1:])
+        self.__genre_sets = genre_sets
+
+    @classmethod
+    def from_lists(cls, column):
+        """
+        Create the index from a column that contains a list of genres for each film.
+
+        Arguments
+        ---------
+        column : pandas.core.series.Series
+            The column containing the lists (e.g., __df['Genres'] in ChartCreator).
+
+        Returns
+        -------
+        GenreIndex
+            The created index.
+
+        """
+        lengths = np.fromiter((len(row) for row in column), dtype=np.int64, count=len(column))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        codes, categories = pd.factorize(pd.Series([genre for row in column for genre in row], dtype=object))
+        return cls(codes, offsets, categories.tolist())
+
+    @classmethod
+    def from_genre_sets(cls, column):
+        """
+        Create the index from a dictionary-encoded column of lists of genres (see
+        genres_parser_module.encode_genre_sets). The genres of each distinct list are only coded once, and the codes of
+        every film are then gathered with vectorized operations (i.e., without going through the films one by one). The
+        genres are numbered in order of first appearance, like in from_lists. The lists are kept, so that the statistics
+        of a subset of the films are calculated per list (see statistics).
+
+        Arguments
+        ---------
+        column : pandas.core.series.Series
+            The categorical column whose categories are tuples of genres (e.g., __df['Genres'] in ChartCreator).
+
+        Returns
+        -------
+        GenreIndex
+            The created index.
+
+        """
+        set_codes = column.cat.codes.to_numpy().astype(np.int64)
+        genre_sets = column.cat.categories
+        genre_codes = {}  # Maps each genre to its code
+        set_entries = [[] for _ in range(len(genre_sets))]
+        for set_code in pd.unique(set_codes[set_codes >= 0]):  # In order of first appearance
+            set_entries[set_code] = [genre_codes.setdefault(genre, len(genre_codes)) for genre in genre_sets[set_code]]
+
+        # The genres of the i-th list are set_genre_codes[set_offsets[i]:set_offsets[i + 1]]. Missing values (code -1)
+        # are the last, empty, list
+        set_offsets = np.zeros(len(set_entries) + 2, dtype=np.int64)
+        np.cumsum([len(entries) for entries in set_entries] + [0], out=set_offsets[1:])
+        set_genre_codes = np.array([code for entries in set_entries for code in entries], dtype=np.int64)
+
+        lengths = np.diff(set_offsets)[set_codes]
+        offsets = np.zeros(len(set_codes) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = np.repeat(set_offsets[set_codes] - offsets[:-1], lengths) + np.arange(offsets[-1])
+
+        # The films without genres are assigned the last (empty) list, so that every code is non-negative
+        film_sets = np.where(set_codes >= 0, set_codes, len(set_entries))
+        film_sets = film_sets.astype(np.min_scalar_type(len(set_entries) + 1))
+        return cls(set_genre_codes[positions], offsets, list(genre_codes), (film_sets, set_genre_codes, set_offsets))
+
+    @staticmethod
+    def __reduce_segments(entry_values, offsets):
+        """
+        Add up the values of consecutive segments of an array.
+
+        Arguments
+        ---------
+        entry_values : numpy.ndarray
+            The values.
+        offsets : numpy.ndarray
+            The position in entry_values where each segment starts, followed by the length of entry_values.
+
+        Returns
+        -------
+        numpy.ndarray
+            The summation of the values of each segment (0 for empty segments).
+
+        """
+        counts = np.diff(offsets)
+        # The summations are accumulated in 64 bits, so that the downcast columns (e.g., int32) do not overflow
+        entry_values = entry_values.astype(np.result_type(entry_values.dtype, np.int64), copy=False)
+        output = np.zeros(len(counts), dtype=entry_values.dtype)
+        if len(entry_values):
+            # np.add.reduceat() keeps the dtype of the values (i.e., integer summations are exact)
+            non_empty = counts > 0
+            output[non_empty] = np.add.reduceat(entry_values, offsets[:-1][non_empty])
+        return output
+
+    def __reduce(self, entry_values):
+        """
+        Add up a value for each non-zero entry of the matrix (in CSC order), per genre.
+
+        Arguments
+        ---------
+        entry_values : numpy.ndarray
+            The value of each non-zero entry.
+
+        Returns
+        -------
+        numpy.ndarray
+            The summation of the values of each genre (0 for genres without films).
+
+        """
+        return self.__reduce_segments(entry_values, self.__genre_offsets)
+
+    @property
+    def genres(self):
+        """Getter method to obtain the genres (i.e., the columns of the matrix)"""
+        return list(self.__categories)
+
+    def counts(self, mask=None):
+        """
+        Obtain the number of films containing each genre.
+
+        Arguments
+        ---------
+        mask : numpy.ndarray
+            A boolean array selecting the films that are taken into account. Default is None, which means all the films
+            are considered.
+
+        Returns
+        -------
+        numpy.ndarray
+            The number of films of each genre.
+
+        """
+        if mask is None:
+            return np.diff(self.__genre_offsets)
+        return self.__reduce(np.asarray(mask)[self.__genre_rows].astype(np.int64))
+
+    def sums(self, values, mask=None):
+        """
+        Obtain the summation of a numerical column for each genre (i.e., the product of the transposed membership
+        matrix and the column).
+
+        Arguments
+        ---------
+        values : numpy.ndarray
+            The value of the numerical column (e.g., Revenue) for each film.
+        mask : numpy.ndarray
+            A boolean array selecting the films that are taken into account. Default is None (all the films).
+
+        Returns
+        -------
+        numpy.ndarray
+            The summation of values for each genre.
+
+        """
+        entry_values = np.asarray(values)[self.__genre_rows]
+        if mask is not None:
+            entry_values = np.where(np.asarray(mask)[self.__genre_rows], entry_values, 0)
+        return self.__reduce(entry_values)
+
+    def means(self, values, mask=None):
+        """
+        Obtain the mean of a numerical column for each genre (NaN for genres without films).
+
+        Arguments
+        ---------
+        values : numpy.ndarray
+            The value of the numerical column for each film.
+        mask : numpy.ndarray
+            A boolean array selecting the films that are taken into account. Default is None (all the films).
+
+        Returns
+        -------
+        numpy.ndarray
+            The mean of values for each genre.
+
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.sums(values, mask) / self.counts(mask)
+
+    def stds(self, values, mask=None):
+        """
+        Obtain the population standard deviation (i.e., the one calculated by np.std) of a numerical column for each
+        genre (NaN for genres without films).
+
+        Arguments
+        ---------
+        values : numpy.ndarray
+            The value of the numerical column for each film.
+        mask : numpy.ndarray
+            A boolean array selecting the films that are taken into account. Default is None (all the films).
+
+        Returns
+        -------
+        numpy.ndarray
+            The standard deviation of values for each genre.
+
+        """
+        means = self.means(values, mask)
+        counts = np.diff(self.__genre_offsets)
+        squared_deviations = (np.asarray(values)[self.__genre_rows] - np.repeat(means, counts)) ** 2
+        if mask is not None:
+            squared_deviations = np.where(np.asarray(mask)[self.__genre_rows], squared_deviations, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(self.__reduce(squared_deviations) / self.counts(mask))
+
+    def set_statistics(self, values, mask=None):
+        """
+        Obtain the number of films, the summation and the sum of squared deviations from the mean of a numerical column
+        for each distinct list of genres (see from_genre_sets). The films are only grouped by the code of their list
+        (with np.bincount), which is O(number of selected films) instead of O(number of film-genre pairs).
+
+        Arguments
+        ---------
+        values : numpy.ndarray
+            The value of the numerical column for each film.
+        mask : numpy.ndarray
+            A boolean array selecting the films that are taken into account. Default is None (all the films).
+
+        Returns
+        -------
+        counts : numpy.ndarray
+            The number of (selected) films of each list.
+        sums : numpy.ndarray
+            The summation of values (as float64) for each list.
+        m2 : numpy.ndarray
+            The sum of squared deviations from the mean of values for each list.
+
+        """
+        if self.__genre_sets is None:
+            raise ValueError('The lists of genres are only known if the index is created with from_genre_sets')
+        film_sets, _, set_offsets = self.__genre_sets
+        number_of_sets = len(set_offsets) - 1
+        if mask is not None:  # Only the selected films are gathered
+            selected = np.flatnonzero(mask)
+            film_sets, values = film_sets[selected], np.asarray(values)[selected]
+        # np.bincount converts the codes to intp and the weights to float64 on every call, so both are converted once
+        film_sets, values = film_sets.astype(np.intp), np.asarray(values, dtype=np.float64)
+
+        counts = np.bincount(film_sets, minlength=number_of_sets)
+        sums = np.bincount(film_sets, weights=values, minlength=number_of_sets)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.where(counts > 0, sums / counts, 0.0)
+        m2 = np.bincount(film_sets, weights=(values - means[film_sets]) ** 2, minlength=number_of_sets)
+        return counts, sums, m2
+
+    def __combine_set_statistics(self, set_counts, set_sums, set_m2):
+        """
+        Combine the statistics of the distinct lists of genres (see set_statistics) into the statistics of each genre,
+        i.e., of the lists that contain it (Chan et al.: M2 = sum of M2_list + n_list * (mean_list - mean_genre)^2).
+
+        Arguments
+        ---------
+        set_counts : numpy.ndarray
+            The number of films of each list.
+        set_sums : numpy.ndarray
+            The summation of the numerical column for each list.
+        set_m2 : numpy.ndarray
+            The sum of squared deviations from the mean of the numerical column for each list.
+
+        Returns
+        -------
+        tuple
+            The counts, sums and stds of each genre (see statistics).
+
+        """
+        _, set_genre_codes, set_offsets = self.__genre_sets
+        entry_sets = np.repeat(np.arange(len(set_offsets) - 1), np.diff(set_offsets))  # The list of each genre code
+        entry_counts = set_counts[entry_sets]
+        number_of_genres = len(self.__categories)
+        counts = np.rint(np.bincount(set_genre_codes, weights=entry_counts, minlength=number_of_genres))
+        counts = counts.astype(np.int64)
+        sums = np.bincount(set_genre_codes, weights=set_sums[entry_sets], minlength=number_of_genres)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            set_means = np.where(set_counts > 0, set_sums / set_counts, 0.0)
+            means = np.nan_to_num(sums / counts)
+            m2 = np.bincount(set_genre_codes, weights=set_m2[entry_sets] + entry_counts * (
+                set_means[entry_sets] - means[set_genre_codes]) ** 2, minlength=number_of_genres)
+            stds = np.sqrt(m2 / counts)
+        return counts, sums, stds
+
+    def statistics(self, values, mask=None, set_totals=None):
+        """
+        Obtain the number of films containing each genre and the summation and population standard deviation of a
+        numerical column for each genre. If the distinct lists of genres are known (see from_genre_sets), the statistics
+        are calculated per list (see set_statistics) and then combined. If the statistics of every film are also
+        introduced (set_totals) and the mask selects most of the films, only the films that are not selected are
+        gathered, and their statistics are removed from the totals. Otherwise, the non-zero entries of the selected
+        films are gathered once and the three statistics are calculated from them. All of them are faster than calling
+        counts, sums and stds with a mask.
+
+        Arguments
+        ---------
+        values : numpy.ndarray
+            The value of the numerical column for each film.
+        mask : numpy.ndarray
+            A boolean array selecting the films that are taken into account. Default is None (all the films).
+        set_totals : tuple
+            The result of set_statistics(values) (i.e., without a mask), which is reused across masks. Default is None.
+
+        Returns
+        -------
+        counts : numpy.ndarray
+            The number of (selected) films of each genre.
+        sums : numpy.ndarray
+            The summation of values (as float64) for each genre.
+        stds : numpy.ndarray
+            The standard deviation of values for each genre (NaN for genres without films).
+
+        """
+        if self.__genre_sets is not None:
+            if mask is None:
+                return self.__combine_set_statistics(*(set_totals or self.set_statistics(values)))
+            if set_totals is None or 2 * np.count_nonzero(mask) <= len(mask):
+                return self.__combine_set_statistics(*self.set_statistics(values, mask))
+
+            # Inverse of the merge: M2_a = M2 - M2_b - (mean_b - mean_a)^2 * n_a * n_b / n, where a are the selected
+            # films and b the rest (like RunningStats.remove)
+            total_counts, total_sums, total_m2 = set_totals
+            removed_counts, removed_sums, removed_m2 = self.set_statistics(values, ~np.asarray(mask))
+            counts, sums = total_counts - removed_counts, total_sums - removed_sums
+            with np.errstate(divide='ignore', invalid='ignore'):
+                delta = np.nan_to_num(removed_sums / removed_counts - sums / counts)
+                correction = np.nan_to_num(delta ** 2 * counts * removed_counts / total_counts)
+            m2 = np.where(counts > 0, np.clip(total_m2 - removed_m2 - correction, 0, None), 0.0)
+            return self.__combine_set_statistics(counts, sums, m2)
+
+        rows, offsets = self.__genre_rows, self.__genre_offsets
+        if mask is not None:
+            is_selected = np.asarray(mask)[rows]
+            rows = rows[is_selected]
+            offsets = np.zeros_like(self.__genre_offsets)
+            np.cumsum(self.__reduce(is_selected.astype(np.int64)), out=offsets[1:])
+        counts = np.diff(offsets)
+
+        entry_values = np.asarray(values, dtype=np.float64)[rows]
+        sums = self.__reduce_segments(entry_values, offsets)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums / counts
+            squared_deviations = (entry_values - np.repeat(means, counts)) ** 2
+            stds = np.sqrt(self.__reduce_segments(squared_deviations, offsets) / counts)
+        return counts, sums, stds
+
+    def rows(self, genre):
+        """
+        Obtain the positions of the films that contain a genre.
+
+        Arguments
+        ---------
+        genre : str
+            The genre.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (ascending) positions of the films. It is empty if the genre does not appear on the index.
+
+        """
+        code = self.__category_codes.get(genre)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.__genre_rows[self.__genre_offsets[code]:self.__genre_offsets[code + 1]]
+
+    def mask(self, genres):
+        """
+        Obtain a boolean mask of the films that contain any of the introduced genres.
+
+        Arguments
+        ---------
+        genres : list
+            The genres.
+
+        Returns
+        -------
+        numpy.ndarray
+            A boolean array containing True for the films that contain at least one of the genres.
+
+        """
+        output = np.zeros(self.__number_of_films, dtype=bool)
+        for genre in genres:
+            output[self.rows(genre)] = True
+        return output
+
+    def to_dense(self):
+        """
+        Obtain the membership matrix as a dense (number of films x number of genres) boolean array.
+
+        Returns
+        -------
+        numpy.ndarray
+            The dense matrix.
+
+        """
+        matrix = np.zeros((self.__number_of_films, len(self.__categories)), dtype=bool)
+        genre_codes = np.repeat(np.arange(len(self.__categories)), np.diff(self.__genre_offsets))
+        matrix[self.__genre_rows, genre_codes] = True
+        return matrix
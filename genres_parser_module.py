@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import ast
+import re
+import sys
+
+# A single string literal of a list, e.g., 'Drama' or "Children's" (escaped characters are allowed)
+_STRING_LITERAL = r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*\""""
+
+# A whole cell, e.g., ['Drama', 'Romance', 'Adventure']. Nothing other than a list of string literals is accepted
+_LIST_LITERAL = re.compile(rf"\s*\[\s*(?:(?:{_STRING_LITERAL})\s*(?:,\s*(?:{_STRING_LITERAL})\s*)*,?\s*)?\]\s*")
+_TOKEN = re.compile(_STRING_LITERAL)
+
+
+def parse_genres(cells):
+    """
+    Parse the cells of the Genres column, which contain lists in string format (e.g., "['Drama', 'Romance']"). Unlike
+    eval(), only lists of string literals are accepted, so no code from the spreadsheet is ever executed. Each distinct
+    genre is interned and given an integer code.
+
+    Arguments
+    ---------
+    cells : iterable
+        The cells of the Genres column. Missing cells (i.e., values that are not strings, such as NaN) are considered
+        to be empty lists.
+
+    Returns
+    -------
+    codes : numpy.ndarray
+        The code of each genre appearing on the column (int32). The genres of the i-th cell are
+        codes[offsets[i]:offsets[i + 1]].
+    offsets : numpy.ndarray
+        The position in codes where the genres of each cell start (int64). Its length is the number of cells plus one.
+    categories : list
+        The distinct genres, where categories[code] is the genre represented by code.
+
+    Raises
+    ------
+    ValueError
+        If a cell is not a list of string literals.
+
+    """
+    genre_codes = {}  # Maps each genre to its code
+    categories = []
+    codes = []
+    offsets = [0]
+    for cell in cells:
+        if isinstance(cell, str):
+            if _LIST_LITERAL.fullmatch(cell) is None:
+                raise ValueError(f'Invalid Genres value: {cell!r}')
+
+            for token in _TOKEN.findall(cell):
+                # Only literals containing escaped characters need to be decoded
+                genre = ast.literal_eval(token) if '\\' in token else token[1:-1]
+                code = genre_codes.get(genre)
+                if code is None:  # First time the genre appears
+                    code = genre_codes[genre] = len(categories)
+                    categories.append(sys.intern(genre))
+                codes.append(code)
+        offsets.append(len(codes))
+
+    return np.array(codes, dtype=np.int32), np.array(offsets, dtype=np.int64), categories
+
+
+def decode_genres(codes, offsets, categories):
+    """
+    Convert the compact representation returned by parse_genres() back into one list of genres per cell. The genres
+    are the interned strings in categories, so they are shared (not copied) between the lists.
+
+    Arguments
+    ---------
+    codes : numpy.ndarray
+        The code of each genre appearing on the column.
+    offsets : numpy.ndarray
+        The position in codes where the genres of each cell start.
+    categories : list
+        The distinct genres, where categories[code] is the genre represented by code.
+
+    Returns
+    -------
+    list
+        A list containing the list of genres of each cell.
+
+    """
+    genres = [categories[code] for code in np.asarray(codes).tolist()]
+    offsets = np.asarray(offsets).tolist()
+    return [genres[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def encode_genre_sets(genre_lists):
+    """
+    Dictionary-encode a column containing a list of genres for each film: each distinct list is stored once, as a tuple
+    of genres, and each film only stores the integer code of its list (like a categorical column). The lists are
+    numbered in order of first appearance.
+
+    Arguments
+    ---------
+    genre_lists : iterable
+        The genres of each film (lists or tuples).
+
+    Returns
+    -------
+    pandas.Categorical
+        The encoded column. Its categories are the distinct tuples of genres.
+
+    """
+    genre_set_codes = {}  # Maps each tuple of genres to its code
+    codes = np.fromiter((genre_set_codes.setdefault(tuple(genres), len(genre_set_codes)) for genres in genre_lists),
+                        dtype=np.int64)
+    # The tuples must not be converted into a MultiIndex
+    categories = pd.Index(list(genre_set_codes), dtype=object, tupleize_cols=False)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def parse_genre_sets(cells):
+    """
+    Parse the cells of the Genres column (see parse_genres) into a dictionary-encoded column (see encode_genre_sets).
+    Each distinct cell is only parsed once, so the cost of parsing depends on the number of distinct cells rather than
+    on the number of films.
+
+    Arguments
+    ---------
+    cells : iterable
+        The cells of the Genres column. Missing cells are considered to be empty lists.
+
+    Returns
+    -------
+    pandas.Categorical
+        The encoded column. Its categories are the distinct tuples of genres (of interned strings).
+
+    Raises
+    ------
+    ValueError
+        If a cell is not a list of string literals.
+
+    """
+    cell_codes, distinct_cells = pd.factorize(pd.Series(cells, dtype=object))
+    genre_lists = decode_genres(*parse_genres(distinct_cells))
+    if (cell_codes == -1).any():
+        genre_lists.append([])  # Missing cells have the code -1, so their (empty) list must be the last one
+    genre_sets = encode_genre_sets(genre_lists)  # Different cells may contain the same genres (e.g., whitespace)
+    return pd.Categorical.from_codes(genre_sets.codes[cell_codes], categories=genre_sets.categories)
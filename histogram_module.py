@@ -0,0 +1,130 @@
+import math
+import numpy as np
+
+
+def nice_bin_width(minimum, maximum, number_of_bins):
+    """
+    Obtain a round bin width (1, 2, 2.5 or 5 times a power of 10) that splits a range into approximately a number of
+    bins, like the automatic bins of plotly histograms.
+
+    Arguments
+    ---------
+    minimum : float
+        The minimum value of the range.
+    maximum : float
+        The maximum value of the range.
+    number_of_bins : int
+        The approximate number of bins.
+
+    Returns
+    -------
+    float
+        The bin width (the smallest round width that does not produce more than number_of_bins bins).
+
+    """
+    raw_width = (maximum - minimum) / max(number_of_bins, 1)
+    if raw_width <= 0:
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(raw_width))
+    for multiplier in (1, 2, 2.5, 5, 10):
+        if multiplier * magnitude >= raw_width:
+            return multiplier * magnitude
+    return 10 * magnitude
+
+
+def bin_statistics(values, weights=None, number_of_bins=8, bin_width=None):
+    """
+    Split a numerical column into bins of the same width and calculate the number of values in each bin and the
+    summation and mean of another column (the weights) over each bin, in a single pass. Each bin contains the values
+    in [start, end), like the bins of plotly histograms.
+
+    Arguments
+    ---------
+    values : numpy.ndarray
+        The values that are binned (e.g., the runtime of each movie).
+    weights : numpy.ndarray
+        The values that are added up in each bin (e.g., the revenue of each movie). Default is None, which means only
+        the counts are calculated.
+    number_of_bins : int
+        The approximate number of bins (the width is rounded, see nice_bin_width). Default is 8.
+    bin_width : float
+        The width of the bins. If it is introduced, number_of_bins is ignored. Default is None.
+
+    Returns
+    -------
+    dict
+        The edges of the bins ('edges', one more than the number of bins) and the number of values ('count'), summation
+        of the weights ('sum') and mean of the weights ('mean', NaN for empty bins) of each bin.
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return {'edges': np.array([0.0, 1.0]), 'count': np.zeros(1, dtype=np.int64), 'sum': np.zeros(1),
+                'mean': np.full(1, np.nan)}
+
+    minimum, maximum = values.min(), values.max()
+    if bin_width is None:
+        bin_width = nice_bin_width(minimum, maximum, number_of_bins)
+    start = math.floor(minimum / bin_width) * bin_width
+    number_of_bins = int((maximum - start) // bin_width) + 1  # The maximum falls in the last bin
+    edges = start + bin_width * np.arange(number_of_bins + 1)
+
+    positions = np.minimum(((values - start) // bin_width).astype(np.int64), number_of_bins - 1)
+    output = {'edges': edges, 'count': np.bincount(positions, minlength=number_of_bins)}
+    if weights is not None:
+        output['sum'] = np.bincount(positions, weights=np.asarray(weights, dtype=np.float64), minlength=number_of_bins)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            output['mean'] = output['sum'] / output['count']
+    return output
+
+
+def bin_counts_2d(x, y, x_range=None, y_range=None, number_of_bins=(40, 40)):
+    """
+    Split the plane of two numerical columns into a grid of cells of the same size and count the number of points in
+    each cell, in a single pass (the cell of each point is obtained with integer arithmetic and the cells are counted
+    with np.bincount over the flattened grid). Each cell contains the points in [start, end) along each axis, except
+    the last cell of each axis, which also contains its end (like np.histogram2d). The points outside the ranges are
+    not counted.
+
+    Arguments
+    ---------
+    x : numpy.ndarray
+        The values along the horizontal axis (e.g., the rating of each movie).
+    y : numpy.ndarray
+        The values along the vertical axis (e.g., the logarithm of the revenue of each movie).
+    x_range : tuple
+        The minimum and maximum values of the grid along the horizontal axis. Default is None, which means the minimum
+        and maximum of x.
+    y_range : tuple
+        The minimum and maximum values of the grid along the vertical axis. Default is None, which means the minimum and
+        maximum of y.
+    number_of_bins : tuple
+        The number of cells along the horizontal and vertical axes. Default is (40, 40).
+
+    Returns
+    -------
+    dict
+        The edges of the cells along each axis ('x_edges' and 'y_edges', one more than the number of cells) and the
+        number of points of each cell ('count', an array with one row per cell along the vertical axis).
+
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    number_of_x_bins, number_of_y_bins = number_of_bins
+    edges = []
+    for values, value_range, bins in ((x, x_range, number_of_x_bins), (y, y_range, number_of_y_bins)):
+        if value_range is None:
+            value_range = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+        minimum, maximum = float(value_range[0]), float(value_range[1])
+        if maximum <= minimum:  # A single value is placed in the middle of a cell of width 1
+            minimum, maximum = minimum - 0.5, minimum + 0.5
+        edges.append(np.linspace(minimum, maximum, bins + 1))
+    x_edges, y_edges = edges
+
+    inside = (x >= x_edges[0]) & (x <= x_edges[-1]) & (y >= y_edges[0]) & (y <= y_edges[-1])
+    x, y = x[inside], y[inside]
+    x_positions = np.minimum(((x - x_edges[0]) / (x_edges[-1] - x_edges[0]) * number_of_x_bins).astype(np.int64),
+                             number_of_x_bins - 1)
+    y_positions = np.minimum(((y - y_edges[0]) / (y_edges[-1] - y_edges[0]) * number_of_y_bins).astype(np.int64),
+                             number_of_y_bins - 1)
+    count = np.bincount(y_positions * number_of_x_bins + x_positions, minlength=number_of_x_bins * number_of_y_bins)
+    return {'x_edges': x_edges, 'y_edges': y_edges, 'count': count.reshape(number_of_y_bins, number_of_x_bins)}
@@ -0,0 +1,95 @@
+import argparse
+import collections
+import re
+import statistics
+import subprocess
+import sys
+
+# A line of the output of python -X importtime, e.g., 'import time:       412 |       1303 |   dash.html'
+_IMPORT_TIME_LINE = re.compile(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\S+)')
+
+# Modules that must not be imported when importing dash_app (they are imported when the first figure is created)
+_DEFERRED_MODULES = ['pandas', 'plotly.express', 'openpyxl', 'chart_creator_module']
+
+
+def measure_import_time(module, statement=None):
+    """
+    Import a module in a new Python interpreter with python -X importtime and parse the time spent importing each
+    module.
+
+    Arguments
+    ---------
+    module : str
+        The name of the module to be imported (e.g., 'dash_app').
+    statement : str
+        Additional Python code that is executed after importing the module (e.g., 'dash_app.create_app()'). Default is
+        None.
+
+    Returns
+    -------
+    list
+        A (module name, self time, cumulative time) tuple for each imported module (the times are in microseconds).
+
+    """
+    code = f'import {module}' + (f'; {statement}' if statement else '')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                            check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            self_time, cumulative_time, name = match.groups()
+            imports.append((name, int(self_time), int(cumulative_time)))
+    return imports
+
+
+def group_by_package(imports):
+    """
+    Add up the self time of the imported modules of each top-level package (e.g., dash.html and dash.dcc are added to
+    dash).
+
+    Arguments
+    ---------
+    imports : list
+        The imported modules, as returned by measure_import_time.
+
+    Returns
+    -------
+    collections.Counter
+        The total self time (in microseconds) of each top-level package.
+
+    """
+    packages = collections.Counter()
+    for name, self_time, _ in imports:
+        packages[name.split('.')[0]] += self_time
+    return packages
+
+
+def main():
+    """Measure the import time of a module several times and print the breakdown of the median run"""
+    parser = argparse.ArgumentParser(description='Measure the time spent importing a module (python -X importtime).')
+    parser.add_argument('module', nargs='?', default='dash_app', help='the module to be imported (default: dash_app)')
+    parser.add_argument('--statement', default=None,
+                        help="code executed after the import, e.g., 'dash_app.create_app()'")
+    parser.add_argument('--repeat', type=int, default=5, help='the number of measurements (default: 5)')
+    parser.add_argument('--top', type=int, default=15, help='the number of packages displayed (default: 15)')
+    arguments = parser.parse_args()
+
+    runs = [measure_import_time(arguments.module, arguments.statement) for _ in range(arguments.repeat)]
+    totals = [sum(self_time for _, self_time, _ in imports) for imports in runs]
+    median_run = runs[totals.index(sorted(totals)[(len(totals) - 1) // 2])]
+
+    print(f'Import time of {arguments.module}: median {statistics.median(totals) / 1e3:.1f} ms, '
+          f'min {min(totals) / 1e3:.1f} ms, max {max(totals) / 1e3:.1f} ms ({arguments.repeat} runs)')
+    print(f'{"package":<30}{"self time (ms)":>16}{"share":>9}')
+    median_total = sum(self_time for _, self_time, _ in median_run)
+    for package, self_time in group_by_package(median_run).most_common(arguments.top):
+        print(f'{package:<30}{self_time / 1e3:>16.1f}{self_time / median_total:>9.1%}')
+
+    imported = {name for name, _, _ in median_run}
+    for module in _DEFERRED_MODULES:
+        print(f'{module} imported: {"yes" if module in imported else "no"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+
+def iter_excel_chunks(path, chunk_size):
+    """
+    Read the first worksheet of an .xlsx file in chunks of rows, with openpyxl in read-only mode (the rows are streamed
+    from the file, so the whole workbook is never loaded into memory). The first row contains the column names, and the
+    columns without a name are called 'Unnamed: <position>', like pandas.read_excel does.
+
+    Arguments
+    ---------
+    path : str
+        The path to the file.
+    chunk_size : int
+        The maximum number of rows of each chunk.
+
+    Yields
+    ------
+    pandas.core.frame.DataFrame
+        The rows of each chunk. The index is the position of each row in the worksheet (without the header), so it
+        continues from one chunk to the next.
+
+    """
+    import openpyxl  # Only needed to read spreadsheets
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [name if name is not None else f'Unnamed: {position}' for position, name in enumerate(header)]
+
+        start, batch = 0, []
+        for row in rows:
+            if all(value is None for value in row):  # Empty rows (e.g., formatted cells below the data) are skipped
+                continue
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield pd.DataFrame.from_records(batch, columns=columns, index=pd.RangeIndex(start, start + len(batch)))
+                start, batch = start + len(batch), []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns, index=pd.RangeIndex(start, start + len(batch)))
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, chunk_size):
+    """
+    Read a CSV file (with the columns of prepared_dataset.xlsx) in chunks of rows.
+
+    Arguments
+    ---------
+    path : str
+        The path to the file.
+    chunk_size : int
+        The maximum number of rows of each chunk.
+
+    Yields
+    ------
+    pandas.core.frame.DataFrame
+        The rows of each chunk (the index continues from one chunk to the next).
+
+    """
+    with pd.read_csv(path, parse_dates=['Release Date'], chunksize=chunk_size) as reader:
+        yield from reader
+
+
+def iter_dataset_chunks(path, chunk_size):
+    """
+    Read a dataset file in chunks of rows: CSV files (.csv extension) with iter_csv_chunks and spreadsheets with
+    iter_excel_chunks.
+
+    Arguments
+    ---------
+    path : str
+        The path to the file.
+    chunk_size : int
+        The maximum number of rows of each chunk.
+
+    Returns
+    -------
+    iterator
+        The chunks (pandas dataframes).
+
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be a positive integer, not {chunk_size!r}')
+    return iter_csv_chunks(path, chunk_size) if path.endswith('.csv') else iter_excel_chunks(path, chunk_size)
+
+
+def downcast_numeric_columns(df):
+    """
+    Convert the numerical columns of a dataframe into the smallest dtypes that represent every value exactly: the
+    integer columns into the smallest signed integer dtype that fits their range (e.g., int16 for the runtime) and the
+    float columns into float32 when no value changes. Columns that are not numerical are not modified.
+
+    Arguments
+    ---------
+    df : pandas.core.frame.DataFrame
+        The dataframe (e.g., a chunk of the dataset).
+
+    Returns
+    -------
+    pandas.core.frame.DataFrame
+        The dataframe with the downcast columns.
+
+    """
+    dtypes = {}
+    for column, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):  # Signed, so that differences of values do not wrap around
+            dtypes[column] = pd.to_numeric(df[column], downcast='integer').dtype
+        elif pd.api.types.is_float_dtype(dtype):
+            values = df[column].to_numpy()
+            if np.array_equal(values.astype(np.float32), values, equal_nan=True):
+                dtypes[column] = np.float32
+    return df.astype(dtypes)
+
+
+class FilmDeduplicator:
+    """
+    Find the rows of a stream of chunks whose film has already appeared (in the same chunk or in a previous one), so
+    that only the first appearance of each film is kept, like DataFrame.drop_duplicates(subset=['Film']). Only a 64-bit
+    hash of each film is kept (in a sorted array), so its memory does not depend on the length of the titles. Two
+    different films are only mistaken for each other if their hashes collide (the probability is about 3 in a million
+    for 10 million films).
+
+    Attributes
+    ----------
+    __seen : numpy.ndarray
+        The sorted hashes of the films that have appeared.
+
+    Methods
+    -------
+    number_of_films
+        Getter method to obtain the number of different films that have appeared.
+    first_appearances
+        Obtain a boolean mask of the rows of a chunk whose film appears for the first time, and remember the films.
+
+    """
+
+    def __init__(self):
+        """Create an instance of the class"""
+        self.__seen = np.empty(0, dtype=np.uint64)
+
+    @property
+    def number_of_films(self):
+        """Getter method to obtain the number of different films that have appeared"""
+        return len(self.__seen)
+
+    def first_appearances(self, films):
+        """
+        Obtain a boolean mask of the films (the rows of a chunk) that appear for the first time, and remember them.
+
+        Arguments
+        ---------
+        films : pandas.core.series.Series
+            The films of the chunk.
+
+        Returns
+        -------
+        numpy.ndarray
+            A boolean array containing True for the first appearance of each film that had not appeared before.
+
+        """
+        hashes = pd.util.hash_array(films.to_numpy(dtype=object))
+        is_first = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self.__seen):
+            positions = np.minimum(np.searchsorted(self.__seen, hashes), len(self.__seen) - 1)
+            is_first &= self.__seen[positions] != hashes
+
+        # Both arrays are sorted, so the stable sort (timsort) merges them in linear time
+        self.__seen = np.sort(np.concatenate([self.__seen, np.sort(hashes[is_first])]), kind='stable')
+        return is_first
@@ -0,0 +1,393 @@
+import bisect
+import contextlib
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+# Held while a request is being captured by RequestProfiler. Only one capture can run at a time in the process: since
+# Python 3.12 cProfile cannot be enabled while another profiler is active, and tracemalloc traces the whole process
+_CAPTURE_LOCK = threading.Lock()
+
+
+class LoggingSink:
+    """
+    A sink of StageProfiler that writes each measurement to a logger.
+
+    Arguments
+    ---------
+    logger : logging.Logger
+        The logger. Default is None, which means the 'profiling' logger is used.
+    level : int
+        The level of the log records. Default is logging.INFO.
+
+    Attributes
+    ----------
+    __logger : logging.Logger
+        The logger the measurements are written to.
+    __level : int
+        The level introduced when creating the class.
+
+    Methods
+    -------
+    record
+        Write a measurement to the logger.
+
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        """Create an instance of the class"""
+        self.__logger = logger if logger is not None else logging.getLogger('profiling')
+        self.__level = level
+
+    def record(self, stage, measurement):
+        """
+        Write a measurement to the logger.
+
+        Arguments
+        ---------
+        stage : str
+            The name of the stage (e.g., 'ChartCreator.__create_graph2_figs').
+        measurement : dict
+            The wall time and CPU time (in seconds) and the allocated bytes (None if they were not measured).
+
+        """
+        allocated = measurement['allocated_bytes']
+        self.__logger.log(self.__level, '%s: wall %.4f s, cpu %.4f s, allocated %s', stage, measurement['wall_time'],
+                          measurement['cpu_time'], 'n/a' if allocated is None else f'{allocated} B')
+
+
+class HistogramSink:
+    """
+    A sink of StageProfiler that keeps, in memory, a histogram of each measured quantity (wall time, CPU time and
+    allocated bytes) for each stage. The histograms can be exported in the Prometheus text format (see
+    render_prometheus).
+
+    Arguments
+    ---------
+    time_buckets : list
+        The (ascending) upper bounds of the buckets of the time histograms, in seconds.
+    bytes_buckets : list
+        The (ascending) upper bounds of the buckets of the allocated bytes histograms.
+
+    Attributes
+    ----------
+    __buckets : dict
+        The upper bounds of the buckets of each quantity.
+    __histograms : dict
+        The count of each bucket, the summation and the number of measurements of each (stage, quantity) pair.
+    __lock : threading.Lock
+        A lock that prevents several threads from updating the histograms at the same time.
+
+    Methods
+    -------
+    record
+        Add a measurement to the histograms.
+    snapshot
+        Obtain a copy of the histograms.
+    render_prometheus
+        Export the histograms in the Prometheus text format.
+
+    """
+
+    def __init__(self, time_buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+                 bytes_buckets=(2 ** 10, 2 ** 14, 2 ** 17, 2 ** 20, 2 ** 23, 2 ** 26, 2 ** 29)):
+        """Create an instance of the class"""
+        self.__buckets = {'wall_time': list(time_buckets), 'cpu_time': list(time_buckets),
+                          'allocated_bytes': list(bytes_buckets)}
+        self.__histograms = {}
+        self.__lock = threading.Lock()
+
+    def record(self, stage, measurement):
+        """
+        Add a measurement to the histograms of its stage (the quantities that were not measured are skipped).
+
+        Arguments
+        ---------
+        stage : str
+            The name of the stage.
+        measurement : dict
+            The wall time and CPU time (in seconds) and the allocated bytes (None if they were not measured).
+
+        """
+        with self.__lock:
+            for quantity, value in measurement.items():
+                if value is None:
+                    continue
+                buckets = self.__buckets[quantity]
+                histogram = self.__histograms.setdefault((stage, quantity),
+                                                         {'buckets': [0] * (len(buckets) + 1), 'sum': 0, 'count': 0})
+                histogram['buckets'][bisect.bisect_left(buckets, value)] += 1  # The last bucket is +Inf
+                histogram['sum'] += value
+                histogram['count'] += 1
+
+    def snapshot(self):
+        """
+        Obtain a copy of the histograms.
+
+        Returns
+        -------
+        dict
+            The upper bounds of the buckets, the (non-cumulative) count of each bucket, the summation and the number of
+            measurements of each (stage, quantity) pair.
+
+        """
+        with self.__lock:
+            return {key: dict(histogram, buckets=list(histogram['buckets']), bounds=self.__buckets[key[1]])
+                    for key, histogram in self.__histograms.items()}
+
+    def render_prometheus(self, prefix='dashboard'):
+        """
+        Export the histograms in the Prometheus text exposition format (e.g., for a /metrics endpoint).
+
+        Arguments
+        ---------
+        prefix : str
+            The prefix of the metric names. Default is 'dashboard'.
+
+        Returns
+        -------
+        str
+            The metrics (one histogram per quantity, with a stage label).
+
+        """
+        units = {'wall_time': 'wall_time_seconds', 'cpu_time': 'cpu_time_seconds',
+                 'allocated_bytes': 'allocated_bytes'}
+        lines = []
+        histograms = self.snapshot()
+        for quantity, unit in units.items():
+            name = f'{prefix}_stage_{unit}'
+            lines += [f'# HELP {name} The {quantity.replace("_", " ")} of each instrumented stage.',
+                      f'# TYPE {name} histogram']
+            for (stage, histogram_quantity), histogram in sorted(histograms.items()):
+                if histogram_quantity != quantity:
+                    continue
+                label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(histogram['bounds'] + ['+Inf'], histogram['buckets']):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{label}"}} {histogram["sum"]}')
+                lines.append(f'{name}_count{{stage="{label}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+class StageProfiler:
+    """
+    Measure the wall time, CPU time (of the calling thread) and allocated bytes of named stages (e.g., the methods of
+    ChartCreator that create the figures, or the callbacks of the Dash app) and send each measurement to a set of
+    sinks (e.g., LoggingSink, HistogramSink). The allocated bytes are only measured while tracemalloc is tracing
+    (e.g., when a request is captured by RequestProfiler), since tracing slows down the whole process.
+
+    Arguments
+    ---------
+    sinks : list
+        The sinks. Each sink has a record(stage, measurement) method.
+
+    Attributes
+    ----------
+    __sinks : list
+        The sinks introduced when creating the class.
+
+    Methods
+    -------
+    profile
+        Context manager that measures the code run inside it as a stage.
+    instrument
+        Decorator that measures every call of a function as a stage.
+
+    """
+
+    def __init__(self, sinks):
+        """Create an instance of the class"""
+        self.__sinks = list(sinks)
+
+    @contextlib.contextmanager
+    def profile(self, stage):
+        """
+        Measure the code run inside the context manager as a stage. The measurement is recorded even if the code
+        raises an exception.
+
+        Arguments
+        ---------
+        stage : str
+            The name of the stage.
+
+        """
+        tracing = tracemalloc.is_tracing()
+        start_allocated = tracemalloc.get_traced_memory()[0] if tracing else None
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            measurement = {'wall_time': time.perf_counter() - start_wall, 'cpu_time': time.thread_time() - start_cpu,
+                           'allocated_bytes': None}
+            if tracing and tracemalloc.is_tracing():  # Net allocation (memory that is still allocated at the end)
+                measurement['allocated_bytes'] = max(tracemalloc.get_traced_memory()[0] - start_allocated, 0)
+            for sink in self.__sinks:
+                sink.record(stage, measurement)
+
+    def instrument(self, stage):
+        """
+        Decorator that measures every call of a function as a stage.
+
+        Arguments
+        ---------
+        stage : str
+            The name of the stage.
+
+        Returns
+        -------
+        callable
+            The decorator.
+
+        """
+        def decorator(function):
+            """Wrap a function so that its calls are measured"""
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                """Call the wrapped function inside profile()"""
+                with self.profile(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+class RequestProfiler:
+    """
+    Capture a cProfile or tracemalloc profile of individual requests of a Flask server. A request is captured when it
+    contains the X-Profile header (or the profile query parameter) with the value 'cprofile' or 'tracemalloc'. The
+    cProfile statistics are written as a .prof file (which can be read with pstats or snakeviz) and a text summary, and
+    the tracemalloc statistics as a text file with the lines that allocated the most memory.
+
+    Capturing should only be enabled in trusted environments, since any client can request it. Only one request is
+    captured at a time in the process: a request asking for a capture while another one is being captured is served
+    without it (and a note is logged). tracemalloc traces the whole process, so the memory allocated by concurrent
+    requests is also included.
+
+    Arguments
+    ---------
+    output_dir : str
+        The directory in which the profiles are written. It is created if it does not exist.
+    number_of_lines : int
+        The number of functions (cProfile) or lines (tracemalloc) included in the text summaries. Default is 30.
+
+    Attributes
+    ----------
+    __output_dir : str
+        The output_dir introduced when creating the class.
+    __number_of_lines : int
+        The number_of_lines introduced when creating the class.
+    __active : threading.local
+        The profile being captured by each thread (i.e., each request).
+
+    Methods
+    -------
+    init_app
+        Register the hooks that start and stop the captures on a Flask server.
+    __start
+        Start capturing the current request if it asks for it and no other request is being captured.
+    __stop
+        Stop capturing the current request and write the profile.
+    __write_capture
+        Stop a capture and write its profile.
+
+    """
+
+    def __init__(self, output_dir, number_of_lines=30):
+        """Create an instance of the class"""
+        self.__output_dir = output_dir
+        self.__number_of_lines = number_of_lines
+        self.__active = threading.local()
+
+    def init_app(self, server):
+        """
+        Register the hooks that start and stop the captures on a Flask server.
+
+        Arguments
+        ---------
+        server : flask.app.Flask
+            The server (e.g., the server of a Dash app).
+
+        """
+        server.before_request(self.__start)
+        server.teardown_request(self.__stop)
+
+    def __start(self):
+        """Start capturing the current request if it contains the X-Profile header or the profile query parameter"""
+        import flask  # Only needed by the servers, so this module can be used without Flask
+
+        mode = flask.request.headers.get('X-Profile') or flask.request.args.get('profile')
+        self.__active.capture = None
+        if mode not in ('cprofile', 'tracemalloc'):
+            return
+        if not _CAPTURE_LOCK.acquire(blocking=False):
+            logging.getLogger('profiling').info('The %s capture of %s was skipped, since another request is being '
+                                                'captured', mode, flask.request.path)
+            return
+
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # Another profiler (outside RequestProfiler) is active in the process
+                _CAPTURE_LOCK.release()
+                logging.getLogger('profiling').info('The cprofile capture of %s was skipped, since another profiler is '
+                                                    'active', flask.request.path)
+                return
+            self.__active.capture = (mode, profiler, flask.request.path)
+        elif mode == 'tracemalloc':
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            self.__active.capture = (mode, (started, tracemalloc.take_snapshot()), flask.request.path)
+
+    def __stop(self, exception=None):
+        """Stop capturing the current request (if it is being captured) and write its profile"""
+        capture = getattr(self.__active, 'capture', None)
+        if capture is None:
+            return
+        self.__active.capture = None
+        try:
+            self.__write_capture(*capture)
+        finally:
+            _CAPTURE_LOCK.release()
+
+    def __write_capture(self, mode, state, path):
+        """
+        Stop a capture and write its profile to __output_dir.
+
+        Arguments
+        ---------
+        mode : str
+            The kind of capture ('cprofile' or 'tracemalloc').
+        state : cProfile.Profile or tuple
+            The profiler (cProfile), or whether tracing was started by the capture and the snapshot taken when it
+            started (tracemalloc).
+        path : str
+            The path of the captured request.
+
+        """
+        os.makedirs(self.__output_dir, exist_ok=True)
+        file_name = os.path.join(self.__output_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-'
+                                                    f'{threading.get_ident()}-{path.strip("/").replace("/", "_")}')
+
+        if mode == 'cprofile':
+            state.disable()
+            state.dump_stats(f'{file_name}.prof')
+            summary = io.StringIO()
+            pstats.Stats(state, stream=summary).sort_stats('cumulative').print_stats(self.__number_of_lines)
+            with open(f'{file_name}.cprofile.txt', 'w') as file:
+                file.write(summary.getvalue())
+        else:
+            started, start_snapshot = state
+            statistics = tracemalloc.take_snapshot().compare_to(start_snapshot, 'lineno')
+            if started:
+                tracemalloc.stop()
+            with open(f'{file_name}.tracemalloc.txt', 'w') as file:
+                file.write('\n'.join(str(statistic) for statistic in statistics[:self.__number_of_lines]) + '\n')
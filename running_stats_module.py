@@ -0,0 +1,251 @@
+import pandas as pd
+import numpy as np
+
+
+class RunningStats:
+    """
+    The running statistics (number of movies, summation, mean and sum of squared deviations) of some numerical variables
+    for each element of a categorical column (e.g., Genres, Distributor). Batches of movies can be added or removed
+    without going through the rest of the movies: the statistics of the batch are merged with the running statistics
+    with the parallel version of Welford's algorithm (Chan et al.).
+
+    Arguments
+    ---------
+    column : str
+        The name of the categorical column (it may contain lists, e.g., Genres).
+    list_of_variables : list
+        The names of the numerical columns (e.g., Revenue).
+    counts : pandas.core.series.Series
+        The number of movies of each element, indexed by element.
+    sums : pandas.core.frame.DataFrame
+        The summation of each variable (columns) for each element (index).
+    squared_deviations : pandas.core.frame.DataFrame
+        The sum of squared deviations from the mean (M2 = n * SD^2) of each variable for each element.
+
+    Attributes
+    ----------
+    __column : str
+        The column introduced when creating the class.
+    __variables : list
+        The list_of_variables introduced when creating the class.
+    __counts : pandas.core.series.Series
+        The number of movies of each element.
+    __sums : pandas.core.frame.DataFrame
+        The summation of each variable for each element.
+    __m2 : pandas.core.frame.DataFrame
+        The sum of squared deviations from the mean of each variable for each element.
+
+    Methods
+    -------
+    empty
+        Create running statistics without any movie.
+    from_specialized_df
+        Create the running statistics from a dataframe produced by ChartCreator.__create_specialized_df.
+    __batch_stats
+        Calculate the statistics of a batch of movies.
+    add
+        Add a batch of movies to the running statistics.
+    remove
+        Remove a batch of movies from the running statistics.
+    to_specialized_df
+        Produce a dataframe with the same columns as the ones produced by ChartCreator.__create_specialized_df (except
+        for the standard error).
+
+    """
+
+    def __init__(self, column, list_of_variables, counts, sums, squared_deviations):
+        """Create an instance of the class"""
+        self.__column = column
+        self.__variables = list(list_of_variables)
+        self.__counts = counts
+        self.__sums = sums
+        self.__m2 = squared_deviations
+
+    @classmethod
+    def empty(cls, column, list_of_variables):
+        """
+        Create running statistics without any movie (e.g., to add the chunks of a dataset as they are read).
+
+        Arguments
+        ---------
+        column : str
+            The name of the categorical column.
+        list_of_variables : list
+            The names of the numerical columns.
+
+        Returns
+        -------
+        RunningStats
+            The created running statistics.
+
+        """
+        return cls(column, list_of_variables, pd.Series(dtype=np.int64),
+                   pd.DataFrame({variable: pd.Series(dtype=np.int64) for variable in list_of_variables}),
+                   pd.DataFrame({variable: pd.Series(dtype=np.float64) for variable in list_of_variables}))
+
+    @classmethod
+    def from_specialized_df(cls, specialized_df, column, list_of_variables):
+        """
+        Create the running statistics from a dataframe produced by ChartCreator.__create_specialized_df.
+
+        Arguments
+        ---------
+        specialized_df : pandas.core.frame.DataFrame
+            The dataframe containing the summation, mean, standard deviation and number of movies of each element.
+        column : str
+            The name of the categorical column.
+        list_of_variables : list
+            The names of the numerical columns.
+
+        Returns
+        -------
+        RunningStats
+            The created running statistics.
+
+        """
+        df = specialized_df.set_index(column)
+        counts = df['Number of Movies']
+        sums = df[list_of_variables]
+        squared_deviations = pd.DataFrame({variable: df[f'SD {variable}'] ** 2 * counts
+                                           for variable in list_of_variables})
+        return cls(column, list_of_variables, counts, sums, squared_deviations)
+
+    def __batch_stats(self, rows):
+        """
+        Calculate the number of movies, summation and sum of squared deviations of each element in a batch of movies.
+
+        Arguments
+        ---------
+        rows : pandas.core.frame.DataFrame
+            The movies of the batch.
+
+        Returns
+        -------
+        counts : pandas.core.series.Series
+            The number of movies of each element in the batch.
+        sums : pandas.core.frame.DataFrame
+            The summation of each variable for each element in the batch.
+        squared_deviations : pandas.core.frame.DataFrame
+            The sum of squared deviations from the mean of each variable for each element in the batch.
+
+        """
+        long_df = rows[[self.__column] + self.__variables]
+        if len(long_df.index) and isinstance(long_df[self.__column].iloc[0], (list, tuple)):  # E.g., Genres
+            long_df = long_df.astype({self.__column: object}).explode(self.__column).dropna(subset=[self.__column])
+
+        grouped = long_df.groupby(self.__column, sort=False)[self.__variables]
+        counts = grouped.size()
+        squared_deviations = grouped.var(ddof=0).mul(counts, axis=0)
+        return counts, grouped.sum(), squared_deviations
+
+    def add(self, rows):
+        """
+        Add a batch of movies to the running statistics. Elements that did not appear before are added at the end.
+
+        Arguments
+        ---------
+        rows : pandas.core.frame.DataFrame
+            The movies to be added.
+
+        """
+        batch_counts, batch_sums, batch_m2 = self.__batch_stats(rows)
+        elements = self.__counts.index.append(batch_counts.index.difference(self.__counts.index, sort=False))
+        counts_a = self.__counts.reindex(elements, fill_value=0)
+        counts_b = batch_counts.reindex(elements, fill_value=0)
+        sums_a = self.__sums.reindex(elements, fill_value=0)
+        sums_b = batch_sums.reindex(elements, fill_value=0)
+        counts = counts_a + counts_b
+
+        # Chan et al.: M2 = M2_a + M2_b + (mean_b - mean_a)^2 * n_a * n_b / n (the term is 0 if n_a or n_b is 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = sums_b.div(counts_b, axis=0) - sums_a.div(counts_a, axis=0)
+        correction = (delta ** 2).mul(counts_a * counts_b / counts, axis=0).fillna(0)
+        self.__m2 = self.__m2.reindex(elements, fill_value=0) + batch_m2.reindex(elements, fill_value=0) + correction
+        self.__sums = sums_a + sums_b
+        self.__counts = counts
+
+    def remove(self, rows):
+        """
+        Remove a batch of movies (which must have been added before) from the running statistics. Elements without
+        movies are removed.
+
+        Arguments
+        ---------
+        rows : pandas.core.frame.DataFrame
+            The movies to be removed.
+
+        """
+        batch_counts, batch_sums, batch_m2 = self.__batch_stats(rows)
+        batch_counts = batch_counts.reindex(self.__counts.index, fill_value=0)
+        batch_sums = batch_sums.reindex(self.__counts.index, fill_value=0)
+        counts = self.__counts - batch_counts
+        sums = self.__sums - batch_sums
+
+        # Inverse of the merge: M2_a = M2 - M2_b - (mean_b - mean_a)^2 * n_a * n_b / n, where a are the remaining movies
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = batch_sums.div(batch_counts, axis=0) - sums.div(counts, axis=0)
+        correction = (delta ** 2).mul(counts * batch_counts / self.__counts, axis=0).fillna(0)
+        m2 = (self.__m2 - batch_m2.reindex(self.__counts.index, fill_value=0) - correction).clip(lower=0)
+
+        remaining = counts > 0
+        self.__counts, self.__sums, self.__m2 = counts[remaining], sums[remaining], m2[remaining]
+
+    def to_specialized_df(self):
+        """
+        Produce a dataframe with the summation, mean, standard deviation (population) and number of movies of each
+        element, in the format of the dataframes produced by ChartCreator.__create_specialized_df.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            The dataframe that was created (one row per element).
+
+        """
+        output_df = pd.DataFrame({self.__column: self.__counts.index.tolist()})
+        for variable in self.__variables:
+            output_df[variable] = self.__sums[variable].to_numpy()
+            output_df[f'Mean {variable}'] = self.__sums[variable].to_numpy() / self.__counts.to_numpy()
+            output_df[f'SD {variable}'] = np.sqrt(self.__m2[variable].to_numpy() / self.__counts.to_numpy())
+        output_df['Number of Movies'] = self.__counts.to_numpy()
+        return output_df
+
+
+def combine_statistics(counts, sums, standard_deviations):
+    """
+    Combine the statistics of several disjoint groups of movies (e.g., the distribution companies that are rolled into
+    an "Other" bucket) into the statistics of the union of the groups. The sums of squared deviations are merged with
+    the same formula as RunningStats: M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2).
+
+    Arguments
+    ---------
+    counts : numpy.ndarray
+        The number of movies of each group.
+    sums : numpy.ndarray
+        The summation of the variable for each group.
+    standard_deviations : numpy.ndarray
+        The (population) standard deviation of the variable for each group.
+
+    Returns
+    -------
+    count : int
+        The number of movies of the union.
+    total : float
+        The summation of the variable for the union.
+    mean : float
+        The mean of the variable for the union (NaN if there are no movies).
+    standard_deviation : float
+        The (population) standard deviation of the variable for the union (NaN if there are no movies).
+
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    sums = np.asarray(sums, dtype=np.float64)
+    count = counts.sum()
+    total = sums.sum()
+    if count == 0:
+        return 0, total, np.nan, np.nan
+
+    mean = total / count
+    group_means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    m2 = (counts * np.asarray(standard_deviations, dtype=np.float64) ** 2).sum() + (
+        counts * (group_means - mean) ** 2).sum()
+    return int(count), total, mean, np.sqrt(max(m2, 0.0) / count)
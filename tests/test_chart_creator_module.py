@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from chart_creator_module import ChartCreator
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), os.pardir, 'prepared_dataset.xlsx')
+
+
+def test_csv_without_index_column(tmp_path):
+    """A CSV file exported without the index column is loaded like the spreadsheet"""
+    csv_path = str(tmp_path / 'movies.csv')
+    pd.read_excel(DATASET_PATH).drop(columns=['Unnamed: 0']).to_csv(csv_path, index=False)
+
+    from_csv, from_excel = ChartCreator(csv_path, chunk_size=100), ChartCreator(DATASET_PATH)
+    for by in ('Genres', 'Distributor'):
+        pdt.assert_frame_equal(from_csv.stats(by, agg=('sum', 'mean', 'std', 'count')),
+                               from_excel.stats(by, agg=('sum', 'mean', 'std', 'count')))
+
+
+def assert_same_statistics(chart_creator, expected_chart_creator):
+    """Check that two instances have the same statistics for each genre and distributor"""
+    for by in ('Genres', 'Distributor'):
+        pdt.assert_frame_equal(
+            chart_creator.stats(by, agg=('sum', 'mean', 'std', 'count'), sort=None).sort_values(by, ignore_index=True),
+            expected_chart_creator.stats(by, agg=('sum', 'mean', 'std', 'count'), sort=None).sort_values(
+                by, ignore_index=True), check_exact=False, rtol=1e-9)
+
+
+def test_append_and_update_match_rebuild(tmp_path):
+    """The statistics after append and update are those of a dataset containing the modified movies from the start"""
+    movies = pd.read_excel(DATASET_PATH).drop(columns=['Unnamed: 0'])
+    new_movies = [
+        {'Film': 'A Film Without Genres', 'Distributor': 'Universal', 'Rating': 6.5, 'Runtime': 95, 'Genres': None,
+         'Revenue': 1500000, 'Release Date': pd.Timestamp('2021-03-05')},
+        {'Film': 'A New Drama', 'Distributor': 'A New Distributor', 'Rating': 7.5, 'Runtime': 120,
+         'Genres': ['Drama', 'History'], 'Revenue': 2500000, 'Release Date': pd.Timestamp('2021-04-09')},
+    ]
+    updated_movies = movies.iloc[[0, 5]].copy()
+    updated_movies['Revenue'] *= 2
+    updated_movies['Genres'] = [float('nan'), "['Comedy']"]
+
+    chart_creator = ChartCreator(DATASET_PATH)
+    chart_creator.stats('Genres')  # The statistics are calculated before the movies are modified
+    chart_creator.append(new_movies)
+    chart_creator.update(updated_movies)
+
+    expected_movies = pd.concat([movies, pd.DataFrame(new_movies)], ignore_index=True)
+    expected_movies.loc[[0, 5], ['Revenue', 'Genres']] = updated_movies[['Revenue', 'Genres']].to_numpy()
+    expected_movies['Genres'] = [str(cell) if isinstance(cell, list) else cell for cell in expected_movies['Genres']]
+    csv_path = str(tmp_path / 'movies.csv')
+    expected_movies.to_csv(csv_path, index=False)
+    assert_same_statistics(chart_creator, ChartCreator(csv_path))
+
+
+def test_webgl_threshold_uses_whole_series():
+    """The area trace uses WebGL when the whole series is longer than the threshold, even if it is downsampled"""
+    assert ChartCreator(DATASET_PATH, graph3_max_points=50, webgl_threshold=100).fig10.data[0].type == 'scattergl'
+    assert ChartCreator(DATASET_PATH, graph3_max_points=50).fig10.data[0].type == 'scatter'
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_build_figures_matches_on_demand(max_workers):
+    """The figures built by build_figures have the same versions (ETags) as the figures built when they are accessed"""
+    names = [f'fig{number}' for number in range(1, 15)]
+    on_demand = ChartCreator(DATASET_PATH)
+    prebuilt = ChartCreator(DATASET_PATH)
+    prebuilt.build_figures(max_workers=max_workers)
+    assert [prebuilt.figure_json(name)[1] for name in names] == [on_demand.figure_json(name)[1] for name in names]
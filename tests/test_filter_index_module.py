@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index_module import FilterIndex
+from genre_index_module import GenreIndex
+
+GENRES = ['Action', 'Comedy', 'Drama', 'History', 'Horror', 'Romance']
+DISTRIBUTORS = ['Curzon', 'Paramount', 'Universal', 'Warner Bros']
+
+
+@pytest.fixture(scope='module')
+def df():
+    """A dataset whose number of films is not a multiple of 8 (the size of the packed bitmaps), with missing values"""
+    rng = np.random.default_rng(0)
+    number_of_films = 1001
+    distributors = rng.choice(DISTRIBUTORS, size=number_of_films).astype(object)
+    distributors[rng.random(number_of_films) < 0.05] = None
+    return pd.DataFrame({
+        'Genres': [list(rng.choice(GENRES, size=rng.integers(0, 3), replace=False)) for _ in range(number_of_films)],
+        'Distributor': pd.Categorical(distributors),
+        'Release Date': pd.Timestamp('2018-01-01') + pd.to_timedelta(rng.integers(0, 1500, number_of_films), 'D'),
+        'Runtime': rng.integers(60, 200, size=number_of_films),
+    })
+
+
+def pandas_mask(df, start_date=None, end_date=None, genres=None, distributors=None, runtime_range=None):
+    """Obtain the films that satisfy the filters with pandas boolean filters"""
+    mask = pd.Series(True, index=df.index)
+    if genres is not None:
+        mask &= df['Genres'].map(lambda film_genres: any(genre in genres for genre in film_genres))
+    if distributors is not None:
+        mask &= df['Distributor'].isin(distributors)
+    if start_date is not None:
+        mask &= df['Release Date'] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= df['Release Date'] <= pd.Timestamp(end_date)
+    if runtime_range is not None:
+        mask &= df['Runtime'].between(*runtime_range)
+    return mask.to_numpy()
+
+
+@pytest.mark.parametrize('filters', [
+    {'genres': ['Drama']},
+    {'genres': ['Drama', 'Horror', 'Unknown']},
+    {'distributors': ['Paramount', 'Curzon']},
+    {'start_date': '2019-06-01'},
+    {'end_date': '2019-06-01'},
+    {'start_date': '2019-01-01', 'end_date': '2019-12-31'},
+    {'runtime_range': [90, 120]},
+    {'genres': ['Comedy', 'Romance'], 'distributors': ['Universal'], 'start_date': '2018-06-01',
+     'end_date': '2020-06-01', 'runtime_range': [80, 150]},
+    # Empty selections
+    {'genres': []},
+    {'genres': ['Unknown']},
+    {'distributors': []},
+    {'start_date': '2019-01-01', 'end_date': '2018-12-31'},
+    {'genres': ['Drama'], 'runtime_range': [300, 400]},
+    # Selections of every film (that has a value)
+    {'genres': GENRES},
+    {'distributors': DISTRIBUTORS},
+    {'start_date': '2000-01-01', 'end_date': '2030-01-01', 'runtime_range': [0, 1000]},
+])
+def test_mask_matches_pandas(df, filters):
+    filter_index = FilterIndex.from_df(df, GenreIndex.from_lists(df['Genres']))
+    mask = filter_index.mask(**filters)
+    assert mask.dtype == bool and len(mask) == len(df.index)
+    np.testing.assert_array_equal(mask, pandas_mask(df, **filters))
+
+
+def test_mask_selects_everything(df):
+    filter_index = FilterIndex.from_df(df, GenreIndex.from_lists(df['Genres']))
+    assert filter_index.mask() is None  # No filter
+    assert filter_index.mask(start_date='2000-01-01', runtime_range=[0, 1000]).all()
+
+
+def test_genres_mask_is_packed(df):
+    filter_index = FilterIndex.from_df(df, GenreIndex.from_lists(df['Genres']))
+    bitmap = filter_index.genres_mask(['History', 'Action'])
+    assert bitmap.dtype == np.uint8 and len(bitmap) == (len(df.index) + 7) // 8
+    np.testing.assert_array_equal(np.unpackbits(bitmap, count=len(df.index)).view(bool),
+                                  pandas_mask(df, genres=['History', 'Action']))
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from genre_index_module import GenreIndex
+from genres_parser_module import encode_genre_sets
+
+GENRES = ['Action', 'Adventure', 'Comedy', 'Drama', 'History', 'Horror', 'Romance', 'Thriller']
+
+
+@pytest.fixture(scope='module')
+def films():
+    """A column of lists of genres (some of them missing) and a revenue for each film"""
+    rng = np.random.default_rng(0)
+    number_of_films = 3000
+    genre_lists = [list(rng.choice(GENRES, size=rng.integers(0, 4), replace=False)) for _ in range(number_of_films)]
+    genre_sets = encode_genre_sets(genre_lists)
+    codes = np.where(rng.random(number_of_films) < 0.05, -1, genre_sets.codes)  # Missing genres
+    column = pd.Series(pd.Categorical.from_codes(codes, categories=genre_sets.categories))
+    genre_lists = [genres if code >= 0 else [] for genres, code in zip(genre_lists, codes)]
+    revenue = rng.integers(0, 10 ** 9, size=number_of_films)
+    return genre_lists, column, revenue
+
+
+def groupby_statistics(genre_lists, revenue, mask, genres):
+    """Calculate the statistics of each genre of the selected films with pandas"""
+    df = pd.DataFrame({'Genres': genre_lists, 'Revenue': revenue})[mask]
+    grouped = df.explode('Genres').dropna(subset=['Genres']).groupby('Genres')['Revenue']
+    counts = grouped.size().reindex(genres, fill_value=0)
+    sums = grouped.sum().reindex(genres, fill_value=0)
+    stds = grouped.std(ddof=0).reindex(genres)
+    return counts.to_numpy(), sums.to_numpy(dtype=np.float64), stds.to_numpy()
+
+
+def assert_statistics_equal(statistics, expected):
+    counts, sums, stds = statistics
+    expected_counts, expected_sums, expected_stds = expected
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(sums, expected_sums, rtol=1e-12)
+    np.testing.assert_allclose(stds, expected_stds, rtol=1e-7, atol=1e-3)
+
+
+@pytest.mark.parametrize('fraction', [None, 0.0, 0.1, 0.5, 0.9, 1.0])
+def test_statistics_match_groupby(films, fraction):
+    """Every path of statistics (film-genre pairs, lists of genres and inverse merge) agrees with a pandas groupby"""
+    genre_lists, column, revenue = films
+    mask = None if fraction is None else np.random.default_rng(1).random(len(revenue)) < fraction
+    from_lists, from_genre_sets = GenreIndex.from_lists(pd.Series(genre_lists)), GenreIndex.from_genre_sets(column)
+    assert from_lists.genres == from_genre_sets.genres
+
+    expected = groupby_statistics(genre_lists, revenue, slice(None) if mask is None else mask, from_lists.genres)
+    assert_statistics_equal(from_lists.statistics(revenue, mask), expected)
+    assert_statistics_equal(from_genre_sets.statistics(revenue, mask), expected)
+    # The films that are not selected are removed from the totals when most of the films are selected
+    set_totals = from_genre_sets.set_statistics(revenue)
+    assert_statistics_equal(from_genre_sets.statistics(revenue, mask, set_totals), expected)
+
+
+def test_set_statistics_match_groupby(films):
+    genre_lists, column, revenue = films
+    mask = np.random.default_rng(2).random(len(revenue)) < 0.3
+    counts, sums, m2 = GenreIndex.from_genre_sets(column).set_statistics(revenue, mask)
+
+    # The films without genres are counted in the last (empty) list
+    set_codes = np.where(column.cat.codes < 0, len(column.cat.categories), column.cat.codes)
+    grouped = pd.Series(revenue[mask]).groupby(set_codes[mask])
+    expected_counts = grouped.size().reindex(range(len(counts)), fill_value=0)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_allclose(sums, grouped.sum().reindex(range(len(counts)), fill_value=0), rtol=1e-12)
+    expected_m2 = (grouped.var(ddof=0) * grouped.size()).reindex(range(len(counts)), fill_value=0)
+    np.testing.assert_allclose(m2, expected_m2, rtol=1e-9)
+
+
+def test_set_statistics_require_genre_sets(films):
+    genre_lists, _, revenue = films
+    with pytest.raises(ValueError):
+        GenreIndex.from_lists(pd.Series(genre_lists)).set_statistics(revenue)
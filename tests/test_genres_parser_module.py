@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from genres_parser_module import decode_genres, parse_genre_sets, parse_genres
+
+
+@pytest.mark.parametrize('cell, expected', [
+    ("['Drama', 'Romance', 'Adventure']", ['Drama', 'Romance', 'Adventure']),
+    ('["Drama", \'Family\']', ['Drama', 'Family']),
+    (" [ 'Drama' ,'Romance', ] ", ['Drama', 'Romance']),
+    ("['Children\\'s']", ["Children's"]),
+    ('["Drama, Romance"]', ['Drama, Romance']),
+    ('[]', []),
+])
+def test_parse_valid_lists(cell, expected):
+    assert decode_genres(*parse_genres([cell])) == [expected]
+
+
+@pytest.mark.parametrize('cell', [None, float('nan'), pd.NA])
+def test_parse_missing_cells(cell):
+    assert decode_genres(*parse_genres([cell])) == [[]]
+
+
+@pytest.mark.parametrize('cell', [
+    "__import__('os').system('echo unsafe')",
+    "['Drama'] + ['Romance']",
+    "['Drama', open('file').read()]",
+    "[print('Drama')]",
+    "['Drama' 'Romance']",
+    "['Drama', 1]",
+    "['Drama]",
+    "['Drama', 'Romance'",
+    "'Drama'",
+    "[['Drama']]",
+    '',
+])
+def test_parse_rejects_other_strings(cell):
+    with pytest.raises(ValueError):
+        parse_genres([cell])
+
+
+def test_parse_codes_and_offsets():
+    codes, offsets, categories = parse_genres(["['Drama', 'Romance']", float('nan'), "['Romance']"])
+    assert categories == ['Drama', 'Romance']
+    assert codes.tolist() == [0, 1, 1]
+    assert offsets.tolist() == [0, 2, 2, 3]
+
+
+def test_parse_genre_sets():
+    """Each distinct list is stored once, and missing cells are empty lists"""
+    genre_sets = parse_genre_sets(["['Drama', 'Romance']", None, "['Drama','Romance']", '[]', "['Action']"])
+    assert list(genre_sets) == [('Drama', 'Romance'), (), ('Drama', 'Romance'), (), ('Action',)]
+    assert len(genre_sets.categories) == 3
+
+
+def test_parse_genre_sets_rejects_invalid_cells():
+    with pytest.raises(ValueError):
+        parse_genre_sets(["['Drama']", "['Drama'] * 2"])
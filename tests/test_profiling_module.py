@@ -0,0 +1,43 @@
+import logging
+import os
+import threading
+
+import flask
+
+from profiling_module import RequestProfiler
+
+
+def test_concurrent_cprofile_requests(tmp_path, caplog):
+    """Two requests profiled at the same time are both served, and only one of them is captured"""
+    server = flask.Flask(__name__)
+    RequestProfiler(str(tmp_path)).init_app(server)
+    # Both requests have to be inside the view at the same time, i.e., after both captures have been started
+    both_started = threading.Barrier(2, timeout=10)
+
+    @server.route('/slow')
+    def slow():
+        both_started.wait()
+        return 'done'
+
+    status_codes = []
+
+    def request():
+        with server.test_client() as client:
+            status_codes.append(client.get('/slow', headers={'X-Profile': 'cprofile'}).status_code)
+
+    with caplog.at_level(logging.INFO, logger='profiling'):
+        threads = [threading.Thread(target=request) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert status_codes == [200, 200]
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.prof')]) == 1
+    assert any('was skipped' in record.getMessage() for record in caplog.records)
+
+    # The capture lock is released once the request is captured, so the next request is captured again
+    both_started = threading.Barrier(1)
+    with server.test_client() as client:
+        assert client.get('/slow', headers={'X-Profile': 'cprofile'}).status_code == 200
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.prof')]) == 2